@@ -1,13 +1,27 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import os
 import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 import logging
 
-from nlp_module import detect_intent
+import metrics
+from audio_store import EVICTED, get_audio_store
+from nlp_module import detect_multi_intent, detect_intents
 from stt_module import speech_to_text
-from tts_module import text_to_speech
+from tts_module import (
+    PRERENDERED_AUDIO_DIR,
+    get_prerendered_audio,
+    get_stream,
+    iter_chunk_audio,
+    register_stream,
+    split_sentences,
+    strip_id3,
+    get_synthesis_job,
+    submit_synthesis
+)
 from banking_api import (
     check_balance, 
     transfer_funds, 
@@ -21,7 +35,14 @@ from banking_api import (
 )
 from security_module import verify_voice_id, generate_otp, verify_otp
 from knowledge_base import get_response as get_knowledge_response
-from language_support import detect_language, get_response_template, normalize_hinglish_to_english
+from language_support import (
+    AnalyzedText,
+    detect_language,
+    normalize_devanagari_to_english,
+    normalize_hinglish_to_english
+)
+from response_renderer import render as render_response
+from phrase_audio import splice_response
 from conversation_context import get_conversation_context
 
 app = Flask(__name__)
@@ -41,6 +62,16 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['AUDIO_FOLDER'] = AUDIO_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '10000'))
+# How long an audio request waits for its background synthesis before answering 202
+TTS_WAIT_SECONDS = float(os.getenv('TTS_WAIT_SECONDS', '15'))
+
+# Compound requests: read-only clauses run concurrently on this pool;
+# intents that change account state run one at a time, in utterance order
+WRITE_INTENTS = frozenset(['transfer_funds', 'set_reminder'])
+_intent_executor = ThreadPoolExecutor(max_workers=int(os.getenv('MULTI_INTENT_WORKERS', '4')),
+                                      thread_name_prefix='intent')
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -48,6 +79,12 @@ def health_check():
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Runtime counters (caches, escalations, etc.) for monitoring"""
+    return jsonify(metrics.snapshot())
+
+
 @app.route('/api/stt', methods=['POST'])
 def speech_to_text_endpoint():
     """Convert speech to text"""
@@ -77,6 +114,148 @@ def speech_to_text_endpoint():
         return jsonify({"error": str(e)}), 500
 
 
+def prepare_text(user_text: str):
+    """
+    Detect the input language and normalize the text for NLP
+    Returns (detected_lang, processed_text); processed_text is an AnalyzedText
+    so intent detection reuses the lowercasing/tokenizing done here.
+    """
+    analyzed = AnalyzedText(user_text)
+    detected_lang = detect_language(analyzed)
+    
+    # Normalize text for processing (NLP patterns are in English)
+    processed_text = analyzed
+    if detected_lang == 'hinglish':
+        processed_text = AnalyzedText(normalize_hinglish_to_english(analyzed), folded=True)
+        logger.debug(f"Normalized Hinglish text: {processed_text}")
+    elif analyzed.script == 'devanagari':
+        # Hindi/Marathi: translate onto the English intent vocabulary
+        processed_text = AnalyzedText(normalize_devanagari_to_english(analyzed), folded=True)
+        logger.debug(f"Translated Devanagari text: {processed_text}")
+    
+    return detected_lang, processed_text
+
+
+def synthesize_response(response_text: str, response_lang: str) -> str:
+    """
+    Audio URL for a response in the response language
+    Fixed responses use their prerendered audio, and balance / transfer /
+    transaction-count responses are spliced from phrase clips. Responses of
+    several sentences get a streaming URL and are synthesized sentence by
+    sentence when it is fetched, so playback starts after the first sentence
+    instead of the whole text. Anything else is queued for background
+    synthesis, so the text response never waits for TTS.
+    """
+    # Use appropriate language for TTS based on requested response language
+    lang_code = 'hi' if response_lang == 'hi' else ('mr' if response_lang == 'mr' else 'en')
+    prerendered = get_prerendered_audio(response_text, lang_code)
+    if prerendered:
+        return f"/api/audio/prerendered/{prerendered}"
+    spliced = splice_response(response_text, lang_code, app.config['AUDIO_FOLDER'])
+    if spliced:
+        return f"/api/audio/{spliced}"
+    if len(split_sentences(response_text)) > 1:
+        stream_id = register_stream(response_text, app.config['AUDIO_FOLDER'], lang=lang_code)
+        return f"/api/audio/stream/{stream_id}"
+    
+    return f"/api/audio/{submit_synthesis(response_text, app.config['AUDIO_FOLDER'], lang=lang_code)}"
+
+
+def handle_intent(intent: str, entities: dict, user_id: int, context, detected_lang: str, response_lang: str,
+                  query: str = ''):
+    """
+    Execute one intent and build its response
+    `query` is the (normalized) text of the request; an unrecognised query is
+    answered from the best-matching knowledge base entry when there is one.
+    Returns (response_text, data_payload); banking API errors propagate to the caller.
+    """
+    response_text = ""
+    data_payload = {}
+    
+    if intent == 'check_balance':
+        account_type = entities.get('account_type', 'savings')
+        result = check_balance(user_id, account_type)
+        if result['success']:
+            # Use the requested response language for templates
+            response_text = render_response('balance', response_lang, account_type=account_type, balance=result['balance'])
+            data_payload = result
+        else:
+            response_text = render_response('error', response_lang)
+    
+    elif intent == 'transfer_funds':
+        amount = entities.get('amount')
+        recipient = entities.get('recipient')
+        
+        if not amount or not recipient:
+            response_text = render_response('clarification', response_lang)
+        else:
+            result = transfer_funds(user_id, recipient, amount)
+            if result['success']:
+                response_text = render_response('transfer_success', response_lang, amount=amount, recipient=recipient)
+                data_payload = result
+                context.clear_pending_entities()  # Clear after successful operation
+            else:
+                response_text = render_response('error', response_lang)
+    
+    elif intent == 'transaction_history':
+        limit = entities.get('limit', 5)
+        result = get_transaction_history(user_id, limit)
+        if result['success']:
+            transactions = result['transactions']
+            if transactions:
+                response_text = render_response('transactions', response_lang, count=len(transactions))
+            else:
+                response_text = render_response('no_transactions', response_lang)
+            # Keep structured data for frontend table rendering
+            data_payload = result
+        else:
+            response_text = render_response('error', response_lang)
+    
+    elif intent == 'loan_details':
+        result = get_loan_details(user_id)
+        if result['success']:
+            loans = result['loans']
+            if loans:
+                loan = loans[0]  # Get first loan
+                response_text = render_response('loan_details', response_lang, amount=loan['amount'],
+                                                interest_rate=loan['interest_rate'], due_date=loan['due_date'])
+            else:
+                response_text = render_response('no_loans', response_lang)
+            data_payload = result
+        else:
+            response_text = render_response('error', response_lang)
+    
+    elif intent == 'set_reminder':
+        message = entities.get('message')
+        due_date = entities.get('due_date')
+        
+        if not message:
+            response_text = render_response('clarification', response_lang)
+        else:
+            result = set_reminder(user_id, message, due_date)
+            if result['success']:
+                if due_date:
+                    response_text = render_response('reminder_set_due', response_lang, message=message, due_date=due_date)
+                else:
+                    response_text = render_response('reminder_set', response_lang, message=message)
+                data_payload = result
+            else:
+                response_text = render_response('error', response_lang)
+    
+    else:
+        # Check knowledge base for other banking queries
+        kb_response = get_knowledge_response(intent, response_lang, query=query)
+        if kb_response['success']:
+            response_text = kb_response['response']
+            data_payload = {'tips': kb_response['tips']}
+            if 'matched_intent' in kb_response:
+                data_payload['matched_intent'] = kb_response['matched_intent']
+        else:
+            response_text = kb_response['response']  # Default help message
+    
+    return response_text, data_payload
+
+
 @app.route('/api/process', methods=['POST'])
 def process_command():
     """Main endpoint to process user commands with multilingual and context support"""
@@ -93,8 +272,8 @@ def process_command():
         # Get conversation context
         context = get_conversation_context(user_id)
         
-        # Detect language (incoming) and allow response language override
-        detected_lang = detect_language(user_text)
+        # Detect language (incoming) and normalize text for NLP
+        detected_lang, processed_text = prepare_text(user_text)
         context.language = detected_lang
         logger.info(f"Detected language: {detected_lang}")
 
@@ -102,20 +281,11 @@ def process_command():
         response_lang = data.get('response_language') or detected_lang
         logger.info(f"Response language requested: {response_lang}")
         
-        # Normalize text for processing (NLP patterns are in English)
-        processed_text = user_text
-        if detected_lang == 'hinglish':
-            processed_text = normalize_hinglish_to_english(user_text)
-            logger.info(f"Normalized Hinglish text: {processed_text}")
-        elif detected_lang in ['hi', 'mr']:
-            # For Hindi/Marathi, try to extract key English words or use translation
-            # For now, pass as-is since patterns can match Devanagari script
-            # The intent detection will work with the patterns we added
-            processed_text = user_text
-            logger.info(f"Processing {detected_lang} text: {processed_text}")
-        
-        # Detect intent and extract entities
-        intent_result = detect_intent(processed_text)
+        # Detect intent and extract entities (one per clause for compound requests)
+        intent_results = detect_multi_intent(processed_text, lang=detected_lang)
+        if len(intent_results) > 1:
+            return process_multi_intent(intent_results, user_text, user_id, context, detected_lang, response_lang)
+        intent_result = intent_results[0]
         intent = intent_result['intent']
         entities = intent_result['entities']
         
@@ -129,27 +299,20 @@ def process_command():
         if needs_clarification:
             # Get localized clarification message using requested response language
             if response_lang != 'en':
-                clarification_msg = get_response_template('clarification', response_lang) or clarification_msg
+                clarification_msg = render_response('clarification', response_lang) or clarification_msg
             
             # Add user message to context
             context.add_message('user', user_text, intent, entities)
             context.add_message('assistant', clarification_msg, intent, entities)
             
             # Generate audio response
-            audio_filename = f"response_{datetime.now().timestamp()}.mp3"
-            audio_path = os.path.join(app.config['AUDIO_FOLDER'], audio_filename)
-            try:
-                # Use appropriate language for TTS based on response language
-                lang_code = 'hi' if response_lang == 'hi' else ('mr' if response_lang == 'mr' else 'en')
-                text_to_speech(clarification_msg, audio_path, lang=lang_code)
-            except:
-                text_to_speech(clarification_msg, audio_path)  # Fallback to default
+            audio_url = synthesize_response(clarification_msg, response_lang)
             
             return jsonify({
                 "text": clarification_msg,
                 "intent": intent,
                 "needs_clarification": True,
-                "audio_url": f"/api/audio/{audio_filename}",
+                "audio_url": audio_url,
                 "data": {}
             })
         
@@ -158,104 +321,8 @@ def process_command():
         data_payload = {}
         
         try:
-            if intent == 'check_balance':
-                account_type = entities.get('account_type', 'savings')
-                result = check_balance(user_id, account_type)
-                if result['success']:
-                    # Use the requested response language for templates
-                    template = get_response_template('balance', response_lang)
-                    if template:
-                        response_text = template.format(account_type=account_type, balance=result['balance'])
-                    else:
-                        response_text = f"Your {account_type} account balance is ₹{result['balance']:,.2f}."
-                    data_payload = result
-                else:
-                    error_template = get_response_template('error', response_lang)
-                    response_text = error_template or result.get('message', 'Unable to fetch balance.')
-            
-            elif intent == 'transfer_funds':
-                amount = entities.get('amount')
-                recipient = entities.get('recipient')
-                
-                if not amount or not recipient:
-                    clarification_template = get_response_template('clarification', response_lang)
-                    response_text = clarification_template or "Please specify the amount and recipient for the transfer."
-                else:
-                    result = transfer_funds(user_id, recipient, amount)
-                    if result['success']:
-                        template = get_response_template('transfer_success', response_lang)
-                        if template:
-                            response_text = template.format(amount=amount, recipient=recipient)
-                        else:
-                            response_text = f"Successfully transferred ₹{amount:,.2f} to {recipient}. Transaction ID: {result['transaction_id']}."
-                        data_payload = result
-                        context.clear_pending_entities()  # Clear after successful operation
-                    else:
-                        error_template = get_response_template('error', response_lang)
-                        response_text = error_template or result.get('message', 'Transfer failed.')
-            
-            elif intent == 'transaction_history':
-                limit = entities.get('limit', 5)
-                result = get_transaction_history(user_id, limit)
-                if result['success']:
-                    transactions = result['transactions']
-                    if transactions:
-                        template = get_response_template('transactions', response_lang)
-                        if template:
-                            response_text = template.format(count=len(transactions))
-                        else:
-                            response_text = f"Here are your last {len(transactions)} transactions."
-                        # Keep structured data for frontend table rendering
-                        data_payload = result
-                    else:
-                        template = get_response_template('no_transactions', response_lang)
-                        response_text = template or "You have no recent transactions."
-                        data_payload = result
-                else:
-                    error_template = get_response_template('error', response_lang)
-                    response_text = error_template or result.get('message', 'Unable to fetch transaction history.')
-                    data_payload = {}
-            
-            elif intent == 'loan_details':
-                result = get_loan_details(user_id)
-                if result['success']:
-                    loans = result['loans']
-                    if loans:
-                        loan = loans[0]  # Get first loan
-                        response_text = f"Your loan amount is ₹{loan['amount']:,.2f} with an interest rate of {loan['interest_rate']}% per annum. Due date: {loan['due_date']}."
-                    else:
-                        response_text = "You have no active loans."
-                    data_payload = result
-                else:
-                    error_template = get_response_template('error', response_lang)
-                    response_text = error_template or result.get('message', 'Unable to fetch loan details.')
-            
-            elif intent == 'set_reminder':
-                message = entities.get('message')
-                due_date = entities.get('due_date')
-                
-                if not message:
-                    clarification_template = get_response_template('clarification', detected_lang)
-                    response_text = clarification_template or "Please specify what you'd like to be reminded about."
-                else:
-                    result = set_reminder(user_id, message, due_date)
-                    if result['success']:
-                        response_text = f"Reminder set: {message}"
-                        if due_date:
-                            response_text += f" on {due_date}"
-                        data_payload = result
-                    else:
-                        error_template = get_response_template('error', response_lang)
-                        response_text = error_template or result.get('message', 'Unable to set reminder.')
-            
-            else:
-                # Check knowledge base for other banking queries
-                kb_response = get_knowledge_response(intent, response_lang)
-                if kb_response['success']:
-                    response_text = kb_response['response']
-                    data_payload = {'tips': kb_response['tips']}
-                else:
-                    response_text = kb_response['response']  # Default help message
+            response_text, data_payload = handle_intent(intent, entities, user_id, context, detected_lang, response_lang,
+                                                        query=intent_result['clause'])
             
             # Add messages to conversation context
             context.add_message('user', user_text, intent, entities)
@@ -263,25 +330,16 @@ def process_command():
             
         except Exception as e:
             logger.error(f"Error processing intent {intent}: {str(e)}")
-            error_template = get_response_template('error', response_lang)
-            response_text = error_template or f"Sorry, I encountered an error: {str(e)}. Please try again."
+            response_text = render_response('error', response_lang) or f"Sorry, I encountered an error: {str(e)}. Please try again."
         
         # Generate audio response with appropriate language
-        audio_filename = f"response_{datetime.now().timestamp()}.mp3"
-        audio_path = os.path.join(app.config['AUDIO_FOLDER'], audio_filename)
-        try:
-            # Use appropriate language for TTS based on requested response language
-            lang_code = 'hi' if response_lang == 'hi' else ('mr' if response_lang == 'mr' else 'en')
-            text_to_speech(response_text, audio_path, lang=lang_code)
-        except Exception as e:
-            logger.warning(f"TTS error, using default: {str(e)}")
-            text_to_speech(response_text, audio_path)  # Fallback to default
+        audio_url = synthesize_response(response_text, response_lang)
         
         return jsonify({
             "text": response_text,
             "intent": intent,
             "language": response_lang,
-            "audio_url": f"/api/audio/{audio_filename}",
+            "audio_url": audio_url,
             "data": data_payload
         })
     
@@ -290,13 +348,218 @@ def process_command():
         return jsonify({"error": str(e)}), 500
 
 
+def _handle_clause(intent: str, entities: dict, user_id: int, context, detected_lang: str, response_lang: str,
+                   clause: str = ''):
+    """handle_intent for one clause of a compound request; errors become that clause's response"""
+    try:
+        return handle_intent(intent, entities, user_id, context, detected_lang, response_lang, query=clause)
+    except Exception as e:
+        logger.error(f"Error processing intent {intent}: {str(e)}")
+        return render_response('error', response_lang) or f"Sorry, I encountered an error: {str(e)}. Please try again.", {}
+
+
+def process_multi_intent(intent_results, user_text: str, user_id: int, context, detected_lang: str, response_lang: str):
+    """
+    Answer a compound request ("check my balance and show my last 3 transactions")
+    
+    Consecutive read-only clauses run concurrently; a write clause (transfer,
+    reminder) waits for the reads before it and runs alone, so every clause
+    sees the account state its position in the sentence implies. The answers
+    are joined into one response with one TTS clip.
+    """
+    clauses = []
+    for intent_result in intent_results:
+        intent = intent_result['intent']
+        entities = context.enhance_entities_from_context(intent, intent_result['entities'])
+        clauses.append((intent_result['clause'], intent, entities))
+    logger.info(f"Detected intents: {[(intent, entities) for _, intent, entities in clauses]}")
+    
+    outcomes = [None] * len(clauses)
+    in_flight = {}
+    needs_clarification = False
+    for index, (clause, intent, entities) in enumerate(clauses):
+        if intent not in WRITE_INTENTS:
+            in_flight[index] = _intent_executor.submit(
+                _handle_clause, intent, entities, user_id, context, detected_lang, response_lang, clause)
+            continue
+        for pending_index, future in in_flight.items():
+            outcomes[pending_index] = future.result()
+        in_flight = {}
+        clarify, clarification_msg = context.needs_clarification(intent, entities)
+        if clarify:
+            needs_clarification = True
+            if response_lang != 'en':
+                clarification_msg = render_response('clarification', response_lang) or clarification_msg
+            outcomes[index] = (clarification_msg, {})
+        else:
+            outcomes[index] = _handle_clause(intent, entities, user_id, context, detected_lang, response_lang, clause)
+    for pending_index, future in in_flight.items():
+        outcomes[pending_index] = future.result()
+    metrics.increment('process.multi_intent_requests')
+    metrics.increment('process.multi_intent_clauses', len(clauses))
+    
+    response_text = ' '.join(text for text, _ in outcomes if text)
+    data_payload = {}
+    for _, payload in outcomes:
+        data_payload.update(payload)
+    
+    context.add_message('user', user_text, clauses[0][1], clauses[0][2])
+    for (_, intent, entities), (text, _) in zip(clauses, outcomes):
+        context.add_message('assistant', text, intent, entities)
+    
+    audio_url = synthesize_response(response_text, response_lang)
+    
+    return jsonify({
+        "text": response_text,
+        "intent": clauses[0][1],
+        "intents": [intent for _, intent, _ in clauses],
+        "language": response_lang,
+        "needs_clarification": needs_clarification,
+        "audio_url": audio_url,
+        "data": data_payload,
+        "results": [
+            {"clause": clause, "intent": intent, "entities": entities, "text": text, "data": payload}
+            for (clause, intent, entities), (text, payload) in zip(clauses, outcomes)
+        ]
+    })
+
+
+@app.route('/api/process_batch', methods=['POST'])
+def process_batch():
+    """
+    Bulk intent + entity detection for offline analytics (transcripts, IVR logs)
+    
+    Body: {"texts": [...], "tts": false}
+    No banking actions are executed and no conversation context is touched.
+    With "tts": true, items whose intent has a knowledge-base answer also get
+    that answer and its audio, synthesized once per (intent, language).
+    """
+    try:
+        data = request.json or {}
+        texts = data.get('texts')
+        if not isinstance(texts, list) or not texts:
+            return jsonify({"error": "Provide a non-empty 'texts' list"}), 400
+        if len(texts) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"At most {MAX_BATCH_SIZE} texts per batch"}), 413
+        
+        start = time.perf_counter()
+        prepared = [prepare_text(str(text)) for text in texts]
+        intent_results = detect_intents(
+            [processed_text for _, processed_text in prepared],
+            langs=[detected_lang for detected_lang, _ in prepared]
+        )
+        
+        results = []
+        audio_urls = {}
+        for text, (detected_lang, _), intent_result in zip(texts, prepared, intent_results):
+            item = {
+                "text": text,
+                "language": detected_lang,
+                "intent": intent_result['intent'],
+                "entities": intent_result['entities'],
+                "confidence": intent_result['confidence']
+            }
+            if data.get('tts'):
+                kb_response = get_knowledge_response(intent_result['intent'], detected_lang)
+                if kb_response['success']:
+                    item["response"] = kb_response['response']
+                    key = (intent_result['intent'], detected_lang)
+                    if key not in audio_urls:
+                        audio_urls[key] = _synthesize_batch_audio(kb_response['response'], detected_lang)
+                    item["audio_url"] = audio_urls[key]
+            results.append(item)
+        
+        return jsonify({
+            "count": len(results),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            "results": results
+        })
+    
+    except Exception as e:
+        logger.error(f"Batch Process Error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+def _synthesize_batch_audio(text: str, lang: str):
+    """Queue one batch response for synthesis; returns its URL or None if TTS fails"""
+    lang_code = lang if lang in ('hi', 'mr') else 'en'
+    prerendered = get_prerendered_audio(text, lang_code)
+    if prerendered:
+        return f"/api/audio/prerendered/{prerendered}"
+    try:
+        return f"/api/audio/{submit_synthesis(text, app.config['AUDIO_FOLDER'], lang=lang_code)}"
+    except Exception as e:
+        logger.warning(f"Batch TTS error: {str(e)}")
+        return None
+
+
 @app.route('/api/audio/<filename>', methods=['GET'])
 def get_audio(filename):
-    """Serve audio files"""
+    """
+    Serve audio files from the audio store; 410 once a file has been evicted
+    Audio still being synthesized is waited for (up to TTS_WAIT_SECONDS, or
+    ?wait=<seconds>); if it is not ready by then the answer is 202 with Retry-After.
+    """
+    try:
+        store = get_audio_store(app.config['AUDIO_FOLDER'])
+        audio_path = store.lookup(filename)
+        job = get_synthesis_job(filename, app.config['AUDIO_FOLDER']) if audio_path is None else None
+        if job is not None:
+            wait = min(request.args.get('wait', TTS_WAIT_SECONDS, type=float), TTS_WAIT_SECONDS)
+            try:
+                # The job may have written a different file (e.g. after falling back to English)
+                audio_path = store.lookup(job.result(timeout=max(wait, 0)))
+            except FutureTimeoutError:
+                return jsonify({"status": "pending"}), 202, {'Retry-After': '1'}
+            except Exception as e:
+                return jsonify({"error": f"Speech synthesis failed: {str(e)}"}), 502
+        if audio_path:
+            try:
+                return send_file(audio_path, mimetype='audio/mpeg')
+            except FileNotFoundError:
+                pass  # Evicted between lookup and open
+        if audio_path or store.status(filename) == EVICTED:
+            return jsonify({"error": "Audio file has expired"}), 410
+        return jsonify({"error": "Audio file not found"}), 404
+    except Exception as e:
+        logger.error(f"Audio Error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/audio/stream/<stream_id>', methods=['GET'])
+def stream_audio(stream_id):
+    """Stream a response's audio sentence by sentence as each chunk is synthesized"""
+    audio_folder = app.config['AUDIO_FOLDER']
+    stream = get_stream(stream_id, audio_folder)
+    if stream is None:
+        return jsonify({"error": "Audio stream has expired"}), 410
+    text, lang = stream
+    store = get_audio_store(audio_folder)
+    metrics.increment('tts.streams')
+
+    def generate():
+        try:
+            for filename in iter_chunk_audio(text, audio_folder, lang=lang):
+                path = store.lookup(filename)
+                if path is None:
+                    logger.warning(f"Audio chunk evicted before streaming: {filename}")
+                    continue
+                with open(path, 'rb') as f:
+                    yield strip_id3(f.read())
+        except Exception as e:
+            # Headers are already sent; end the stream early rather than fail the whole response
+            logger.error(f"Audio stream error: {str(e)}")
+
+    return Response(stream_with_context(generate()), mimetype='audio/mpeg')
+
+
+@app.route('/api/audio/prerendered/<filename>', methods=['GET'])
+def get_prerendered_audio_file(filename):
+    """Serve prerendered audio; the name is a content hash, so clients may cache it indefinitely"""
     try:
-        audio_path = os.path.join(app.config['AUDIO_FOLDER'], filename)
+        audio_path = os.path.join(PRERENDERED_AUDIO_DIR, filename)
         if os.path.exists(audio_path):
-            return send_file(audio_path, mimetype='audio/mpeg')
+            return send_file(audio_path, mimetype='audio/mpeg', max_age=365 * 24 * 3600)
         else:
             return jsonify({"error": "Audio file not found"}), 404
     except Exception as e:
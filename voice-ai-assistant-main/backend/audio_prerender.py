@@ -0,0 +1,122 @@
+"""
+Pre-synthesized Audio for TalkToBank
+Knowledge base answers, the default help text, clarification questions and
+the response templates without fields are fixed text, so their audio never
+changes. This job synthesizes each of them once per language into
+PRERENDERED_AUDIO_DIR, named by tts_module.audio_content_key(text, lang);
+/api/process then serves those files instead of calling the TTS service.
+
+Files are keyed by content, so after publishing new knowledge base content
+(kb_store.py publish) the changed answers fall back to live TTS until this
+job is run again; nothing ever serves audio for outdated text.
+
+Usage:
+    python audio_prerender.py build [--lang en hi mr] [--force] [--prune]
+    python audio_prerender.py status
+"""
+import os
+import logging
+from typing import List, Tuple
+
+from tts_module import PRERENDERED_AUDIO_DIR, audio_content_key, text_to_speech
+
+logger = logging.getLogger(__name__)
+
+PRERENDER_LANGUAGES = ['en', 'hi', 'mr']
+
+
+def static_responses(languages: List[str]) -> List[Tuple[str, str]]:
+    """Every fixed (text, lang) pair /api/process can answer with, without duplicates"""
+    from conversation_context import CLARIFICATION_QUESTIONS
+    from kb_store import get_store
+    from knowledge_base import get_response
+    from response_renderer import get_compiled_template
+    from language_support import RESPONSE_TEMPLATES
+
+    responses = []
+    store = get_store()
+    for lang in languages:
+        for intent in store.intents('en'):
+            responses.append((get_response(intent, lang)['response'], lang))
+        responses.append((get_response('unknown', lang)['response'], lang))
+        for key in RESPONSE_TEMPLATES.get('en', {}):
+            compiled = get_compiled_template(key, lang)
+            if compiled is not None and not compiled.fields:
+                responses.append((compiled.render({}), lang))
+    # Clarification questions are asked in English (other languages use the 'clarification' template)
+    if 'en' in languages:
+        responses.extend((question, 'en') for question in CLARIFICATION_QUESTIONS.values())
+    return list(dict.fromkeys(responses))
+
+
+def prerendered_path(text: str, lang: str, audio_dir: str = PRERENDERED_AUDIO_DIR) -> str:
+    return os.path.join(audio_dir, audio_content_key(text, lang) + '.mp3')
+
+
+def build(languages: List[str], audio_dir: str = PRERENDERED_AUDIO_DIR, force: bool = False) -> dict:
+    """Synthesize every static response that has no audio yet (all of them with `force`)"""
+    os.makedirs(audio_dir, exist_ok=True)
+    counts = {'synthesized': 0, 'kept': 0, 'failed': 0}
+    for text, lang in static_responses(languages):
+        path = prerendered_path(text, lang, audio_dir)
+        if os.path.exists(path) and not force:
+            counts['kept'] += 1
+            continue
+        # Synthesize next to the target and rename, so the server never serves a partial file
+        temp_path = f"{path}.tmp.mp3"
+        try:
+            text_to_speech(text, temp_path, lang=lang)
+            os.replace(temp_path, path)
+            counts['synthesized'] += 1
+            print(f"  [{lang}] {text[:60]!r}")
+        except Exception as e:
+            logger.error(f"Prerender failed for [{lang}] {text[:40]!r}: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            counts['failed'] += 1
+    return counts
+
+
+def prune(languages: List[str], audio_dir: str = PRERENDERED_AUDIO_DIR) -> int:
+    """Delete audio whose text is no longer a static response; returns the number of files removed"""
+    if not os.path.isdir(audio_dir):
+        return 0
+    current = {os.path.basename(prerendered_path(text, lang, audio_dir)) for text, lang in static_responses(languages)}
+    removed = 0
+    for name in os.listdir(audio_dir):
+        if name.endswith('.mp3') and name not in current:
+            os.remove(os.path.join(audio_dir, name))
+            removed += 1
+    return removed
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-synthesize audio for fixed responses")
+    parser.add_argument('--audio-dir', default=PRERENDERED_AUDIO_DIR, help='output directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='synthesize missing audio')
+    build_parser.add_argument('--lang', nargs='+', default=PRERENDER_LANGUAGES, choices=PRERENDER_LANGUAGES)
+    build_parser.add_argument('--force', action='store_true', help='re-synthesize every response')
+    build_parser.add_argument('--prune', action='store_true', help='delete audio for text that is no longer used')
+
+    subparsers.add_parser('status', help='prerendered / missing responses per language')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        counts = build(args.lang, args.audio_dir, force=args.force)
+        print(f"Synthesized {counts['synthesized']}, kept {counts['kept']}, failed {counts['failed']}: {args.audio_dir}")
+        if args.prune:
+            print(f"Pruned {prune(PRERENDER_LANGUAGES, args.audio_dir)} unused files")
+
+    for lang in PRERENDER_LANGUAGES:
+        responses = static_responses([lang])
+        ready = sum(os.path.exists(prerendered_path(text, lang, args.audio_dir)) for text, _ in responses)
+        print(f"{lang}: {ready}/{len(responses)} prerendered")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+Audio Store for TalkToBank
+Owns every synthesized file under AUDIO_FOLDER so the directory cannot grow
+without bound on a long-running node:
+
+- files live in sharded subdirectories (<root>/<2 hex chars>/<name>), so no
+  single directory holds more than a fraction of them
+- least recently used files are evicted once the store exceeds its byte
+  budget (AUDIO_STORE_MAX_MB), and files not served for AUDIO_TTL_SECONDS
+  are expired (0 disables the TTL)
+- a background sweeper thread enforces both every AUDIO_SWEEP_SECONDS, off
+  the request path
+- names of evicted files are remembered for a while, so their URLs answer
+  410 Gone instead of a generic 404
+
+The directory, not the in-memory index, is the source of truth, so several
+worker processes can share one store: lookup() finds files other workers
+wrote, hits refresh the file's mtime so every worker sees recent use, and
+each sweep re-indexes the whole directory, which keeps the byte budget
+node-wide rather than per process.
+
+Files written flat into the root by older versions are adopted in place and
+age out like everything else.
+"""
+import os
+import stat
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+AUDIO_STORE_MAX_BYTES = int(float(os.getenv('AUDIO_STORE_MAX_MB', '256')) * 1024 * 1024)
+AUDIO_TTL_SECONDS = float(os.getenv('AUDIO_TTL_SECONDS', '0'))
+AUDIO_SWEEP_SECONDS = float(os.getenv('AUDIO_SWEEP_SECONDS', '60'))
+
+SHARD_CHARS = 2
+# How many evicted names are remembered for 410 responses
+MAX_TOMBSTONES = 10000
+# A hit refreshes the file's mtime at most this often (the shared "last used" time)
+ACCESS_TOUCH_SECONDS = 60.0
+
+PRESENT, EVICTED, MISSING = 'present', 'evicted', 'missing'
+
+
+def shard_for(filename: str) -> str:
+    """Subdirectory of a file: leading hex chars of a hash of its name, so shards fill evenly"""
+    return hashlib.md5(filename.encode('utf-8')).hexdigest()[:SHARD_CHARS]
+
+
+class AudioStore:
+    """Byte-budgeted, LRU-ordered audio files in sharded subdirectories of one root"""
+
+    def __init__(self, root: str, max_bytes: int = AUDIO_STORE_MAX_BYTES, ttl_seconds: float = AUDIO_TTL_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # filename -> [path, size, last access], least recently used first
+        self._files: 'OrderedDict[str, list]' = OrderedDict()
+        self._tombstones: 'OrderedDict[str, None]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.evictions = 0
+        self.expirations = 0
+        os.makedirs(root, exist_ok=True)
+        self._refresh()
+
+    def _disk_files(self) -> List[tuple]:
+        """(mtime, name, path, size) of every audio file under the root"""
+        found = []
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and len(entry.name) == SHARD_CHARS:
+                for child in os.scandir(entry.path):
+                    if child.name.endswith('.mp3') and child.is_file():
+                        info = child.stat()
+                        found.append((info.st_mtime, child.name, child.path, info.st_size))
+            elif entry.name.endswith('.mp3') and entry.is_file():
+                info = entry.stat()
+                found.append((info.st_mtime, entry.name, entry.path, info.st_size))
+        return found
+
+    def _refresh(self):
+        """
+        Re-index from disk, least recently used first: files other workers
+        wrote are adopted, files they deleted are forgotten (and answer 410)
+        """
+        started = time.time()
+        found = self._disk_files()
+        with self._lock:
+            previous = self._files
+            records = []
+            for mtime, name, path, size in found:
+                last_used = max(mtime, previous[name][2]) if name in previous else mtime
+                records.append((last_used, name, path, size))
+            on_disk = {name for _, name, _, _ in found}
+            for name, (path, size, last_used) in previous.items():
+                if name in on_disk:
+                    continue
+                if last_used >= started:
+                    # put() while the directory was being scanned
+                    records.append((last_used, name, path, size))
+                else:
+                    self._tombstones[name] = None
+            self._files = OrderedDict((name, [path, size, last_used]) for last_used, name, path, size in sorted(records))
+            self._bytes = sum(record[1] for record in self._files.values())
+            while len(self._tombstones) > MAX_TOMBSTONES:
+                self._tombstones.popitem(last=False)
+
+    def path_for(self, filename: str) -> str:
+        """Where a new file of this name is written"""
+        return os.path.join(self.root, shard_for(filename), filename)
+
+    def temp_path(self, filename: str) -> str:
+        """Scratch path in the file's shard, for writing it before put()"""
+        path = self.path_for(filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"{path}.{threading.get_ident()}.tmp"
+
+    def lookup(self, filename: str) -> Optional[str]:
+        """
+        Path of a stored file, marked as just used; None if it is not on disk
+        Checks the disk rather than trusting the index, so a file written by
+        another worker is found (and adopted) and one deleted by another
+        worker is not served.
+        """
+        if not filename or os.path.basename(filename) != filename or filename in ('.', '..'):
+            return None
+        with self._lock:
+            record = self._files.get(filename)
+        path = record[0] if record is not None else self.path_for(filename)
+        try:
+            info = os.stat(path)
+        except OSError:
+            info = None
+        if info is None or not stat.S_ISREG(info.st_mode):
+            if record is not None:
+                with self._lock:
+                    if self._files.get(filename) is record:
+                        del self._files[filename]
+                        self._bytes -= record[1]
+                        self._tombstones[filename] = None
+            return None
+
+        now = time.time()
+        with self._lock:
+            current = self._files.get(filename)
+            if current is None:
+                self._files[filename] = [path, info.st_size, now]
+                self._bytes += info.st_size
+                self._tombstones.pop(filename, None)
+            else:
+                current[2] = now
+                self._files.move_to_end(filename)
+        if now - info.st_mtime > ACCESS_TOUCH_SECONDS:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return path
+
+    def status(self, filename: str) -> str:
+        """PRESENT, EVICTED (recently deleted by the store) or MISSING"""
+        with self._lock:
+            if filename in self._files:
+                return PRESENT
+            return EVICTED if filename in self._tombstones else MISSING
+
+    def put(self, filename: str, source_path: str) -> str:
+        """Move a finished file (ideally from temp_path()) into the store; returns its path"""
+        path = self.path_for(filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            previous = self._files.pop(filename, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._files[filename] = [path, size, time.time()]
+            self._bytes += size
+            self._tombstones.pop(filename, None)
+            # Over budget: drop the least recently used, never the file just added
+            victims = self._evict_locked(lambda: self._bytes > self.max_bytes and len(self._files) > 1)
+        self._remove(victims)
+        return path
+
+    def _evict_locked(self, should_evict) -> List[str]:
+        victims = []
+        while self._files and should_evict():
+            name, (path, size, _) = self._files.popitem(last=False)
+            self._bytes -= size
+            self._tombstones[name] = None
+            victims.append(path)
+        while len(self._tombstones) > MAX_TOMBSTONES:
+            self._tombstones.popitem(last=False)
+        return victims
+
+    def _remove(self, paths: List[str], expired: bool = False):
+        """Delete evicted files outside the lock"""
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if paths:
+            with self._lock:
+                if expired:
+                    self.expirations += len(paths)
+                else:
+                    self.evictions += len(paths)
+            metrics.increment('audio_store.expired' if expired else 'audio_store.evicted', len(paths))
+
+    def sweep(self) -> int:
+        """
+        Re-index the directory, expire files idle longer than the TTL, then
+        enforce the byte budget over every worker's files; returns files removed
+        """
+        self._refresh()
+        removed = 0
+        if self.ttl_seconds > 0:
+            cutoff = time.time() - self.ttl_seconds
+            with self._lock:
+                expired = self._evict_locked(lambda: next(iter(self._files.values()))[2] < cutoff)
+            self._remove(expired, expired=True)
+            removed += len(expired)
+        with self._lock:
+            victims = self._evict_locked(lambda: self._bytes > self.max_bytes)
+        self._remove(victims)
+        return removed + len(victims)
+
+    def start_sweeper(self, interval: float = AUDIO_SWEEP_SECONDS):
+        """Run sweep() every `interval` seconds on a daemon thread (once per store)"""
+        if self._sweeper is not None or interval <= 0:
+            return
+        self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,),
+                                         name="audio-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.info(f"Audio store sweep removed {removed} files from {self.root}")
+            except Exception as e:
+                logger.error(f"Audio store sweep failed: {str(e)}")
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'files': len(self._files),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'tombstones': len(self._tombstones),
+            }
+
+
+_stores: Dict[str, AudioStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_audio_store(root: str) -> AudioStore:
+    """The store for a directory (one per directory per process), with its sweeper running"""
+    key = os.path.abspath(root)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = _stores[key] = AudioStore(root)
+                store.start_sweeper()
+    return store
+
+
+def get_audio_store_stats() -> Dict[str, Any]:
+    """Size and eviction counts of every store for /api/metrics"""
+    return {root: store.get_stats() for root, store in list(_stores.items())}
+
+
+metrics.register_provider('audio_store', get_audio_store_stats)
@@ -0,0 +1,166 @@
+"""
+Micro-benchmark: per-utterance entity extraction latency
+Compares the old multi-regex extract_entities (one re.search per slot
+pattern, patterns compiled through the re cache on every call) against the
+single-pass tokenizer in entity_extractor, and lists utterances where the
+two disagree so the intended behaviour changes stay visible.
+
+Usage: python benchmarks/bench_entity_extractor.py [--count 5000] [--show-diffs]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entity_extractor import extract_entities
+
+SEED_UTTERANCES = [
+    ("check my balance", 'check_balance'),
+    ("check my savings account balance", 'check_balance'),
+    ("what is my current account balance", 'check_balance'),
+    ("transfer 500 to rohan", 'transfer_funds'),
+    ("send ₹1,000 to priya sharma", 'transfer_funds'),
+    ("send 5k to amit", 'transfer_funds'),
+    ("transfer 2 lakh to neha", 'transfer_funds'),
+    ("transfer 1.5 crore to vikram", 'transfer_funds'),
+    ("rohan ko 2000 bhejo", 'transfer_funds'),
+    ("₹५०० ट्रांसफर करो", 'transfer_funds'),
+    ("show my last 5 transactions", 'transaction_history'),
+    ("show me 10 payments", 'transaction_history'),
+    ("recent 3 statements", 'transaction_history'),
+    ("remind me to pay emi next monday", 'set_reminder'),
+    ("remind me to pay rent on 5th", 'set_reminder'),
+    ("set a reminder to renew insurance by friday", 'set_reminder'),
+    ("remind me to pay only the credit card bill tomorrow", 'set_reminder'),
+    ("what's my loan interest rate", 'loan_inquiry'),
+    ("how do i open a new account", 'account_opening'),
+    ("i want to report a fraud", 'fraud_report'),
+]
+
+FILLERS = ["", "please ", "can you ", "hey ", "quickly "]
+
+
+def build_corpus(count: int, seed: int = 42) -> list:
+    """Build a deterministic corpus of (utterance, intent) pairs"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        utterance, intent = rng.choice(SEED_UTTERANCES)
+        corpus.append((rng.choice(FILLERS) + utterance, intent))
+    return corpus
+
+
+def legacy_extract_entities(text: str, detected_intent: str) -> dict:
+    """The pre-optimization algorithm, kept verbatim for comparison"""
+    text = text.lower().strip()
+    entities = {}
+
+    amount_match = re.search(r'₹?\s*(\d+(?:,\d+)*(?:\.\d+)?)', text)
+    if amount_match:
+        amount_str = amount_match.group(1).replace(',', '')
+        try:
+            entities['amount'] = float(amount_str)
+        except ValueError:
+            pass
+
+    recipient_patterns = [
+        r'\bto\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
+        r'\bsend\s+(?:₹?\d+\s+)?to\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
+    ]
+    for pattern in recipient_patterns:
+        recipient_match = re.search(pattern, text, re.IGNORECASE)
+        if recipient_match:
+            entities['recipient'] = recipient_match.group(1).title()
+            break
+
+    limit_patterns = [
+        r'\b(?:last|recent)\s+(?:my\s+)?(\d+)\s+(?:transaction|payment|statement)',
+        r'\b(?:last|recent)\s+(\d+)',
+        r'\b(\d+)\s+(?:transaction|payment|statement)',
+        r'\bshow\s+(?:me\s+)?(?:my\s+)?(?:last\s+)?(\d+)\s+(?:transaction|payment)',
+    ]
+    for pattern in limit_patterns:
+        limit_match = re.search(pattern, text, re.IGNORECASE)
+        if limit_match:
+            try:
+                entities['limit'] = int(limit_match.group(1))
+                break
+            except (ValueError, IndexError):
+                pass
+
+    if 'savings' in text:
+        entities['account_type'] = 'savings'
+    elif 'current' in text or 'checking' in text:
+        entities['account_type'] = 'current'
+
+    if detected_intent == 'set_reminder':
+        reminder_patterns = [
+            r'remind\s+me\s+to\s+(.+?)(?:\s+(?:on|by|next|tomorrow)|\s*$)',
+            r'reminder\s+(?:to\s+)?(.+?)(?:\s+(?:on|by|next|tomorrow)|\s*$)',
+        ]
+        for pattern in reminder_patterns:
+            reminder_match = re.search(pattern, text, re.IGNORECASE)
+            if reminder_match:
+                entities['message'] = reminder_match.group(1).strip()
+                break
+
+        date_patterns = [
+            r'(?:on|by)\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
+            r'(?:on|by)\s+(\d{1,2}(?:st|nd|rd|th)?)',
+            r'(tomorrow|next\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday))',
+        ]
+        for pattern in date_patterns:
+            date_match = re.search(pattern, text, re.IGNORECASE)
+            if date_match:
+                entities['due_date'] = date_match.group(1)
+                break
+
+    return entities
+
+
+def time_per_utterance(fn, corpus: list, repeat: int = 3) -> float:
+    """Best-of-N mean latency in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text, intent in corpus:
+            fn(text, intent)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+    return best / len(corpus) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=5000, help='number of utterances')
+    parser.add_argument('--show-diffs', action='store_true', help='print seed utterances whose entities changed')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.count)
+
+    diffs = []
+    for text, intent in SEED_UTTERANCES:
+        legacy = legacy_extract_entities(text, intent)
+        current = extract_entities(text, intent)
+        if legacy != current:
+            diffs.append((text, legacy, current))
+
+    legacy_us = time_per_utterance(legacy_extract_entities, corpus)
+    single_pass_us = time_per_utterance(extract_entities, corpus)
+
+    print(f"Utterances:          {len(corpus)}")
+    print(f"Legacy extractor:    {legacy_us:8.2f} us/utterance")
+    print(f"Single-pass:         {single_pass_us:8.2f} us/utterance")
+    print(f"Speedup:             {legacy_us / single_pass_us:8.2f}x")
+    print(f"Changed outputs:     {len(diffs)}/{len(SEED_UTTERANCES)} seed utterances")
+    if args.show_diffs:
+        for text, legacy, current in diffs:
+            print(f"  {text!r}\n    legacy: {legacy}\n    now:    {current}")
+
+
+if __name__ == '__main__':
+    main()
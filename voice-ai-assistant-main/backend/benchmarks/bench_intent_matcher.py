@@ -0,0 +1,134 @@
+"""
+Micro-benchmark: per-utterance intent matching latency
+Compares the old per-call dict rebuild + sequential re.search loop against
+nlp_module's precompiled per-intent regexes, for the first matching intent
+(match_intent) and for every matching intent (match_intents, what intent
+detection uses). A single regex with one lookahead branch per intent is
+timed too; it agrees with match_intent but is slower, so it isn't used.
+
+Usage: python benchmarks/bench_intent_matcher.py [--count 5000]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp_module import INTENT_PATTERNS, match_intent, match_intents
+
+SEED_UTTERANCES = [
+    "check my balance",
+    "hello there",
+    "good morning",
+    "what can you do",
+    "thanks a lot",
+    "transfer 500 to rohan",
+    "send ₹1000 to priya",
+    "show my last 5 transactions",
+    "what's my loan interest rate?",
+    "remind me to pay emi next monday",
+    "what is my credit card limit",
+    "tell me about fixed deposit rates",
+    "how do i open new account",
+    "block my debit card",
+    "request cheque book",
+    "how to get form 26as",
+    "do i need life insurance",
+    "what is my upi id",
+    "what is the ifsc code",
+    "pay electricity bill",
+    "download statement for last month",
+    "i need financial advice",
+    "what is the minimum balance",
+    "nearest branch location",
+    "current forex rates",
+    "i want to report a fraud",
+    "मेरे पिछले लेनदेन दिखाएं",
+    "माझे शेवटचे व्यवहार दाखवा",
+    "how is the weather today",
+    "play some music",
+]
+
+FILLERS = ["", "please ", "can you ", "hey ", "quickly "]
+
+
+def build_corpus(count: int, seed: int = 42) -> list:
+    """Build a deterministic corpus of lowercased utterances"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        utterance = rng.choice(FILLERS) + rng.choice(SEED_UTTERANCES)
+        corpus.append(utterance.lower().strip())
+    return corpus
+
+
+def legacy_match_intent(text: str) -> str:
+    """The pre-optimization algorithm: rebuild the pattern table, then search pattern by pattern"""
+    patterns = {intent: list(pattern_list) for intent, pattern_list in INTENT_PATTERNS.items()}
+    for intent, pattern_list in patterns.items():
+        for pattern in pattern_list:
+            if re.search(pattern, text):
+                return intent
+    return 'unknown'
+
+
+def legacy_match_intents(text: str) -> list:
+    """Every matching intent, the same pattern-by-pattern way"""
+    return [intent for intent, pattern_list in INTENT_PATTERNS.items()
+            if any(re.search(pattern, text) for pattern in pattern_list)]
+
+
+def compile_lookahead_matcher(intent_patterns: dict) -> re.Pattern:
+    """One anchored regex: a lookahead branch per intent, tried in priority order"""
+    branches = []
+    for intent, pattern_list in intent_patterns.items():
+        alternation = '|'.join(f'(?:{pattern})' for pattern in pattern_list)
+        branches.append(f'(?=[\\s\\S]*?(?:{alternation}))(?P<{intent}>)')
+    return re.compile(r'\A(?:' + '|'.join(branches) + ')')
+
+
+LOOKAHEAD_MATCHER = compile_lookahead_matcher(INTENT_PATTERNS)
+
+
+def lookahead_match_intent(text: str) -> str:
+    match = LOOKAHEAD_MATCHER.match(text)
+    return match.lastgroup if match else 'unknown'
+
+
+def time_per_utterance(fn, corpus: list, repeat: int = 3) -> float:
+    """Best-of-N mean latency in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+    return best / len(corpus) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=5000, help='number of utterances')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.count)
+
+    mismatches = [text for text in corpus
+                  if not legacy_match_intent(text) == match_intent(text) == lookahead_match_intent(text)
+                  or legacy_match_intents(text) != match_intents(text)]
+    if mismatches:
+        print(f"Priority mismatch on {len(mismatches)} utterances, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+
+    print(f"Utterances:        {len(corpus)}")
+    for label, fn in (('Legacy first', legacy_match_intent), ('Lookahead first', lookahead_match_intent),
+                      ('Compiled first', match_intent), ('Legacy all', legacy_match_intents),
+                      ('Compiled all', match_intents)):
+        print(f"{label + ':':19}{time_per_utterance(fn, corpus):8.2f} us/utterance")
+
+if __name__ == '__main__':
+    main()
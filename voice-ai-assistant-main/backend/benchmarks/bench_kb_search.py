@@ -0,0 +1,81 @@
+"""
+Micro-benchmark: knowledge base search latency as the KB grows
+Builds synthetic knowledge bases of increasing size from the lines of the
+real BANKING_KNOWLEDGE answers, then times index construction and query
+latency for the BM25 keyword index and the hashed n-gram vector index
+(one matrix-vector product + top-k per query).
+
+Usage: python benchmarks/bench_kb_search.py [--sizes 20 100 1000 10000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_base import BANKING_KNOWLEDGE
+from kb_index import NUMPY_AVAILABLE, BM25Index, NgramVectorIndex
+
+QUERIES = [
+    "how do i stop a cheque i gave", "bounced cheque penalty", "my card got stolen",
+    "minimum balance charges", "is my deposit taxed", "cover for hospital bills",
+    "locker facility", "how to add a nominee", "send money abroad for studies",
+    "what is the rtgs timing", "emergency fund size", "what's the weather like today",
+]
+
+
+def build_knowledge(size: int, seed: int = 11) -> dict:
+    """`size` entries, each a shuffle of lines drawn from the real answers"""
+    rng = random.Random(seed)
+    lines = [line for entry in BANKING_KNOWLEDGE.values() for line in entry['response'].splitlines() if line.strip()]
+    tips = [tip for entry in BANKING_KNOWLEDGE.values() for tip in entry.get('quick_tips', [])]
+    knowledge = {}
+    for i in range(size):
+        knowledge[f"topic_{i}"] = {
+            'response': '\n'.join(rng.sample(lines, 12)),
+            'quick_tips': rng.sample(tips, 3),
+        }
+    return knowledge
+
+
+def time_queries(index, repeat: int) -> float:
+    """Best-of-N mean query latency in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in QUERIES:
+            index.search(query, top_k=3)
+        best = min(best, (time.perf_counter() - start) / len(QUERIES) * 1e6)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100, 1000, 10000], help='KB sizes to test')
+    parser.add_argument('--repeat', type=int, default=5, help='timing rounds (best is reported)')
+    args = parser.parse_args()
+
+    print(f"{'entries':>8}  {'bm25 build':>11}  {'bm25 query':>11}  {'vec build':>10}  {'vec query':>10}  {'matrix':>9}")
+    for size in args.sizes:
+        knowledge = BANKING_KNOWLEDGE if size == len(BANKING_KNOWLEDGE) else build_knowledge(size)
+
+        start = time.perf_counter()
+        keyword_index = BM25Index.from_knowledge(knowledge)
+        bm25_build = time.perf_counter() - start
+        bm25_query = time_queries(keyword_index, args.repeat)
+
+        if NUMPY_AVAILABLE:
+            start = time.perf_counter()
+            vector_index = NgramVectorIndex.from_knowledge(knowledge)
+            vector_build = time.perf_counter() - start
+            vector_query = time_queries(vector_index, args.repeat)
+            print(f"{size:>8}  {bm25_build * 1000:>9.1f}ms  {bm25_query:>9.1f}us  {vector_build * 1000:>8.1f}ms  "
+                  f"{vector_query:>8.1f}us  {vector_index.nbytes / 2 ** 20:>7.1f}MB")
+        else:
+            print(f"{size:>8}  {bm25_build * 1000:>9.1f}ms  {bm25_query:>9.1f}us  {'(NumPy not installed)':>33}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+NLP accuracy and latency benchmark over the labelled corpus
+Runs every utterance of benchmarks/data/nlp_corpus.json through the same
+steps as /api/process (detect_language -> normalize to English (Hinglish
+lexicon or Devanagari translation) -> detect_intent) and reports:
+- language detection and intent accuracy, overall and per language
+- the most frequent (expected -> predicted) intent confusions
+- p50/p99 latency of each stage
+- English utterances the Hinglish lexicon would rewrite (English words such
+  as "do" or "me" that are also Hinglish entries); any is a regression and
+  makes the run exit non-zero
+Results are written as JSON (to the system temp directory unless --output
+says otherwise, so runs never land in the source tree) and can be diffed
+between releases.
+
+Intent latency is measured cold (intent cache cleared before every call).
+Unset OPENAI_API_KEY for reproducible, offline numbers; the results record
+whether the LLM was reachable.
+
+Usage: python benchmarks/bench_nlp.py [--repeat 20] [--output results.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_support import AnalyzedText, detect_language, normalize_devanagari_to_english, normalize_hinglish_to_english
+import llm_client
+from nlp_module import detect_intent, clear_intent_cache
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(BENCH_DIR, 'data', 'nlp_corpus.json')
+DEFAULT_OUTPUT = os.path.join(tempfile.gettempdir(), 'nlp_benchmark.json')
+LANGUAGES = ['en', 'hinglish', 'hi', 'mr']
+
+
+def load_corpus(path: str = CORPUS_PATH) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def timed(fn, *args, **kwargs):
+    """Call fn, returning (result, elapsed microseconds)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1e6
+
+
+def latency_summary(samples: list) -> dict:
+    return {
+        'p50_us': round(percentile(samples, 50), 2),
+        'p99_us': round(percentile(samples, 99), 2),
+        'mean_us': round(sum(samples) / len(samples), 2),
+    }
+
+
+def accuracy(correct: int, total: int) -> float:
+    return round(correct / total, 4) if total else 0.0
+
+
+def normalize(text: str, lang: str) -> str:
+    """English form intent detection sees, as in app.prepare_text"""
+    if lang == 'hinglish':
+        return normalize_hinglish_to_english(text)
+    if AnalyzedText(text).script == 'devanagari':
+        return normalize_devanagari_to_english(text)
+    return text
+
+
+def run(corpus: dict, repeat: int, top_confusions: int) -> dict:
+    utterances = corpus['utterances']
+    latencies = defaultdict(list)
+    lang_correct = Counter()
+    intent_correct = Counter()
+    totals = Counter()
+    confusions = Counter()
+    language_confusions = Counter()
+    english_rewritten = []
+    
+    for item in utterances:
+        text, expected_lang, expected_intent = item['text'], item['lang'], item['intent']
+        
+        # Same steps as app.prepare_text + detect_intent
+        detected_lang, elapsed = timed(detect_language, text)
+        latencies['detect_language'].append(elapsed)
+        processed, elapsed = timed(normalize, text, detected_lang)
+        latencies['normalize'].append(elapsed)
+        clear_intent_cache()
+        result, elapsed = timed(detect_intent, processed, lang=detected_lang)
+        latencies['detect_intent'].append(elapsed)
+        
+        totals[expected_lang] += 1
+        if expected_lang == 'en' and normalize_hinglish_to_english(text) != ' '.join(text.lower().split()):
+            english_rewritten.append({'text': text, 'normalized': normalize_hinglish_to_english(text)})
+        if detected_lang == expected_lang:
+            lang_correct[expected_lang] += 1
+        else:
+            language_confusions[(expected_lang, detected_lang)] += 1
+        if result['intent'] == expected_intent:
+            intent_correct[expected_lang] += 1
+        else:
+            confusions[(expected_intent, result['intent'])] += 1
+        
+        # Extra timing rounds (results already scored above)
+        for _ in range(repeat - 1):
+            latencies['detect_language'].append(timed(detect_language, text)[1])
+            latencies['normalize'].append(timed(normalize, text, detected_lang)[1])
+            clear_intent_cache()
+            latencies['detect_intent'].append(timed(detect_intent, processed, lang=detected_lang)[1])
+    clear_intent_cache()
+    
+    total = sum(totals.values())
+    return {
+        'corpus_version': corpus.get('version'),
+        'corpus_size': total,
+        'llm_enabled': llm_client.is_available('chat'),
+        'language_detection': {
+            'accuracy': accuracy(sum(lang_correct.values()), total),
+            'per_language': {lang: accuracy(lang_correct[lang], totals[lang]) for lang in LANGUAGES},
+            'confusions': [
+                {'expected': expected, 'predicted': predicted, 'count': count}
+                for (expected, predicted), count in sorted(language_confusions.items(), key=lambda kv: (-kv[1], kv[0]))
+            ],
+        },
+        'intent': {
+            'accuracy': accuracy(sum(intent_correct.values()), total),
+            'per_language': {lang: accuracy(intent_correct[lang], totals[lang]) for lang in LANGUAGES},
+            'top_confusions': [
+                {'expected': expected, 'predicted': predicted, 'count': count}
+                for (expected, predicted), count in sorted(confusions.items(), key=lambda kv: (-kv[1], kv[0]))[:top_confusions]
+            ],
+        },
+        'latency': {stage: latency_summary(samples) for stage, samples in latencies.items()},
+        'english_rewritten': english_rewritten,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', default=CORPUS_PATH, help='labelled corpus JSON')
+    parser.add_argument('--repeat', type=int, default=20, help='timing rounds per utterance')
+    parser.add_argument('--top', type=int, default=15, help='confusion pairs to report')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the JSON results')
+    args = parser.parse_args()
+    
+    report = run(load_corpus(args.corpus), max(1, args.repeat), args.top)
+    
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    
+    print(f"Corpus v{report['corpus_version']}: {report['corpus_size']} utterances (LLM {'on' if report['llm_enabled'] else 'off'})")
+    print(f"{'':32}{'overall':>9}" + ''.join(f"{lang:>10}" for lang in LANGUAGES))
+    for name in ('language_detection', 'intent'):
+        section = report[name]
+        print(f"{name + ' accuracy':32}{section['accuracy']:9.3f}"
+              + ''.join(f"{section['per_language'][lang]:10.3f}" for lang in LANGUAGES))
+    print("\nTop intent confusions (expected -> predicted):")
+    for pair in report['intent']['top_confusions']:
+        print(f"  {pair['count']:3d}  {pair['expected']} -> {pair['predicted']}")
+    print("\nLatency:")
+    for stage, summary in report['latency'].items():
+        print(f"  {stage:32} p50 {summary['p50_us']:9.2f} us   p99 {summary['p99_us']:9.2f} us")
+    print(f"\nWrote {args.output}")
+    
+    if report['english_rewritten']:
+        print("\nEnglish utterances rewritten by the Hinglish lexicon:")
+        for item in report['english_rewritten']:
+            print(f"  {item['text']!r} -> {item['normalized']!r}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: per-response template rendering latency
+Compares get_response_template + str.format (format string parsed on every
+call, Western digit grouping) against the precompiled response_renderer
+with cached lakh/crore formatting, over every template and language.
+
+Usage: python benchmarks/bench_response_renderer.py [--count 20000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_support import RESPONSE_TEMPLATES, get_response_template
+from response_renderer import get_compiled_template, render
+
+SAMPLE_VALUES = {
+    'account_type': 'savings',
+    'balance': 25430.5,
+    'amount': 150000.0,
+    'recipient': 'Rohan',
+    'count': 5,
+    'interest_rate': 8.5,
+    'due_date': '2026-11-05',
+    'message': 'pay rent',
+}
+
+
+def legacy_render(key: str, lang: str, **values) -> str:
+    return get_response_template(key, lang).format(**values)
+
+
+def build_workload(count: int, seed: int = 7) -> list:
+    """(key, lang, values) triples; amounts repeat the way real balances do"""
+    rng = random.Random(seed)
+    keys = [(lang, key) for lang, templates in RESPONSE_TEMPLATES.items() for key in templates]
+    amounts = [round(rng.uniform(100, 5e6), 2) for _ in range(200)]
+    workload = []
+    for _ in range(count):
+        lang, key = rng.choice(keys)
+        values = {field: SAMPLE_VALUES[field] for field in get_compiled_template(key, lang).fields}
+        for field in ('balance', 'amount'):
+            if field in values:
+                values[field] = rng.choice(amounts)
+        workload.append((key, lang, values))
+    return workload
+
+
+def time_renderer(fn, workload: list, repeat: int) -> float:
+    """Best-of-N mean latency in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for key, lang, values in workload:
+            fn(key, lang, **values)
+        best = min(best, (time.perf_counter() - start) / len(workload) * 1e6)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=20000, help='responses per timing round')
+    parser.add_argument('--repeat', type=int, default=5, help='timing rounds (best is reported)')
+    args = parser.parse_args()
+
+    workload = build_workload(args.count)
+    legacy = time_renderer(legacy_render, workload, args.repeat)
+    compiled = time_renderer(render, workload, args.repeat)
+
+    print(f"{len(workload)} responses over {sum(len(t) for t in RESPONSE_TEMPLATES.values())} templates")
+    print(f"  str.format + template lookup   {legacy:8.2f} us/response")
+    print(f"  precompiled renderer           {compiled:8.2f} us/response   ({legacy / compiled:.1f}x)")
+    print()
+    print("Example:", legacy_render('balance', 'en', account_type='savings', balance=1234567.5))
+    print("     ->", render('balance', 'en', account_type='savings', balance=1234567.5))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Micro-benchmark: shared AnalyzedText pass vs per-stage string processing
+The shared path (app.prepare_text) builds one AnalyzedText per utterance
+and every stage consumes it: language detection, the Hinglish or
+Devanagari translation (whose output is analyzed without being folded or
+script-scanned again), the intent cache key and entity extraction.
+
+It is compared with two per-stage baselines, where each stage takes a
+plain string and lowercases/tokenizes it again:
+
+- per-stage: today's stages, each handed the raw string (what sharing saves)
+- pre-series: the same, but with the substring-scanning detect_language
+  that predates AnalyzedText (cheaper for Devanagari, and less accurate)
+
+The string stages alone (language, normalization, cache key, entities)
+are timed per language; then the full paths are timed warm (intent cache
+populated, the common case for repeated phrasings) and cold (cache cleared
+before every utterance). Variants run interleaved, round by round, so
+machine noise hits them alike.
+
+Usage: python benchmarks/bench_text_analysis.py [--repeat 15]
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_support import (AnalyzedText, detect_language, normalize_devanagari_to_english,
+                              normalize_hinglish_to_english)
+from entity_extractor import extract_entities
+from nlp_module import detect_multi_intent, clear_intent_cache, normalize_utterance
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'nlp_corpus.json')
+
+
+def legacy_detect_language(text: str) -> str:
+    """The pre-AnalyzedText detect_language, kept verbatim for comparison"""
+    text_lower = text.lower()
+    if re.search(r'[अ-ह]', text):
+        hindi_indicators = ['क्या', 'कैसे', 'कितना', 'बैलेंस', 'ट्रांसफर', 'लेनदेन', 'खाता', 'मेरा', 'आपका', 'दिखाएं', 'बताओ']
+        marathi_indicators = ['काय', 'कसे', 'किती', 'शिल्लक', 'हस्तांतरण', 'व्यवहार', 'खाते', 'माझे', 'तुमचे', 'दाखवा', 'सांगा', 'माझी', 'तुमची']
+        hindi_count = sum(1 for word in hindi_indicators if word in text_lower)
+        marathi_count = sum(1 for word in marathi_indicators if word in text_lower)
+        if marathi_count > 0:
+            if marathi_count >= hindi_count:
+                return 'mr'
+        if hindi_count > 0:
+            return 'hi'
+        return 'hi'
+    hinglish_patterns = [
+        r'\b(kyunki|kyun|kya|kaise|kitna)\b',
+        r'\b(mere|tumhara|apka|hoga|kar|do|lo)\b',
+    ]
+    for pattern in hinglish_patterns:
+        if re.search(pattern, text_lower):
+            return 'hinglish'
+    return 'en'
+
+
+def pre_series_prepare_text(text: str):
+    """app.prepare_text on plain strings, with the pre-AnalyzedText language detector"""
+    lang = legacy_detect_language(text)
+    if lang == 'hinglish':
+        return lang, normalize_hinglish_to_english(text)
+    if lang in ('hi', 'mr'):
+        return lang, normalize_devanagari_to_english(text)
+    return lang, text
+
+
+def per_stage_prepare_text(text: str):
+    """app.prepare_text on plain strings: every stage lowercases and scans for itself"""
+    lang = detect_language(text)
+    if lang == 'hinglish':
+        return lang, normalize_hinglish_to_english(text)
+    if lang in ('hi', 'mr'):
+        return lang, normalize_devanagari_to_english(text)
+    return lang, text
+
+
+def shared_prepare_text(text: str):
+    """What app.prepare_text does now"""
+    analyzed = AnalyzedText(text)
+    lang = detect_language(analyzed)
+    if lang == 'hinglish':
+        return lang, AnalyzedText(normalize_hinglish_to_english(analyzed), folded=True)
+    if analyzed.script == 'devanagari':
+        return lang, AnalyzedText(normalize_devanagari_to_english(analyzed), folded=True)
+    return lang, analyzed
+
+
+def string_text_stages(prepare):
+    """Only the string work around intent lookup: language, normalization, cache key, entities"""
+    def stages(text: str):
+        lang, processed = prepare(text)
+        return lang, extract_entities(normalize_utterance(processed), 'check_balance')
+    return stages
+
+
+def shared_text_stages(text: str):
+    lang, processed = shared_prepare_text(text)
+    normalize_utterance(processed)
+    return lang, extract_entities(processed.lower, 'check_balance', tokens=processed.tokens)
+
+
+def full_pipeline(prepare):
+    """prepare_text + process_command"""
+    def pipeline(text: str):
+        lang, processed = prepare(text)
+        return lang, detect_multi_intent(processed, lang=lang)[0]['intent']
+    return pipeline
+
+
+VARIANTS = ('pre-series', 'per-stage', 'shared')
+TEXT_STAGES = {
+    'pre-series': string_text_stages(pre_series_prepare_text),
+    'per-stage': string_text_stages(per_stage_prepare_text),
+    'shared': shared_text_stages,
+}
+PIPELINES = {
+    'pre-series': full_pipeline(pre_series_prepare_text),
+    'per-stage': full_pipeline(per_stage_prepare_text),
+    'shared': full_pipeline(shared_prepare_text),
+}
+
+
+def time_per_utterance(fns: dict, corpus: list, repeat: int, cold: bool) -> dict:
+    """Best-of-N mean latency in microseconds per variant, variants alternating every round"""
+    best = {name: float('inf') for name in fns}
+    for _ in range(repeat):
+        for name, fn in fns.items():
+            if not cold:
+                for text in corpus:
+                    fn(text)
+            elapsed = 0.0
+            for text in corpus:
+                if cold:
+                    clear_intent_cache()
+                start = time.perf_counter()
+                fn(text)
+                elapsed += time.perf_counter() - start
+            best[name] = min(best[name], elapsed)
+    return {name: total / len(corpus) * 1e6 for name, total in best.items()}
+
+
+def report(label: str, timings: dict):
+    shared = timings['shared']
+    print(f"{label:16}" + ''.join(f"{timings[name]:10.2f}" for name in VARIANTS)
+          + ''.join(f"{(1 - shared / timings[name]) * 100:+13.1f}%" for name in VARIANTS[:2]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=15, help='timing rounds (best is reported)')
+    args = parser.parse_args()
+    
+    with open(CORPUS_PATH, encoding='utf-8') as f:
+        utterances = json.load(f)['utterances']
+    corpus = [item['text'] for item in utterances]
+    
+    clear_intent_cache()
+    mismatches = [text for text in corpus if PIPELINES['per-stage'](text) != PIPELINES['shared'](text)]
+    print(f"Utterances: {len(corpus)}   (per-stage/shared lang or intent differences: {len(mismatches)})")
+    for text in mismatches:
+        print(f"  {text!r}: per-stage {PIPELINES['per-stage'](text)}, shared {PIPELINES['shared'](text)}")
+    
+    print(f"\n{'us/utterance':16}" + ''.join(f"{name:>10}" for name in VARIANTS)
+          + ''.join(f"{'vs ' + name:>14}" for name in VARIANTS[:2]))
+    for lang in ('en', 'hinglish', 'hi', 'mr'):
+        subset = [item['text'] for item in utterances if item['lang'] == lang]
+        report(f"text {lang}", time_per_utterance(TEXT_STAGES, subset, args.repeat, False))
+    report('text all', time_per_utterance(TEXT_STAGES, corpus, args.repeat, False))
+    report('warm cache', time_per_utterance(PIPELINES, corpus, args.repeat, False))
+    report('cold cache', time_per_utterance(PIPELINES, corpus, max(1, args.repeat // 3), True))
+    clear_intent_cache()
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,13 @@ logger = logging.getLogger(__name__)
 # In-memory conversation storage (in production, use Redis or database)
 conversation_sessions = {}
 
+# Follow-up question for each missing entity
+CLARIFICATION_QUESTIONS = {
+    'amount': "How much would you like to transfer?",
+    'recipient': "Who would you like to transfer money to?",
+    'message': "What would you like to be reminded about?",
+}
+
 
 class ConversationContext:
     """Manages conversation context for a user session"""
@@ -63,13 +70,13 @@ class ConversationContext:
         """
         if intent == 'transfer_funds':
             if not entities.get('amount'):
-                return True, "How much would you like to transfer?"
+                return True, CLARIFICATION_QUESTIONS['amount']
             if not entities.get('recipient'):
-                return True, "Who would you like to transfer money to?"
+                return True, CLARIFICATION_QUESTIONS['recipient']
         
         elif intent == 'set_reminder':
             if not entities.get('message'):
-                return True, "What would you like to be reminded about?"
+                return True, CLARIFICATION_QUESTIONS['message']
         
         elif intent == 'transaction_history':
             # This is optional, so no clarification needed
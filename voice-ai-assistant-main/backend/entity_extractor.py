@@ -0,0 +1,228 @@
+"""
+Single-pass Entity Extractor for TalkToBank
+Tokenizes an utterance once and fills every slot (amount, recipient, limit,
+account type, reminder message, due date) in one walk over the tokens,
+instead of a dozen independent regex scans.
+
+Understands Indian number forms ("5k", "2 lakh", "1.5 crore", "₹5,00,000")
+and Devanagari digits ("५००").
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Devanagari digits -> ASCII, applied once before tokenizing
+_DEVANAGARI_DIGITS = str.maketrans('०१२३४५६७८९', '0123456789')
+# str.translate with a dict table is slow on non-ASCII text; most utterances have no such digit
+_DEVANAGARI_DIGIT_RE = re.compile('[०-९]')
+
+# One tokenizer pass: numbers (with an optional attached unit or ordinal suffix) and words;
+# Devanagari gets its own run so vowel signs stay inside the word
+_TOKEN_RE = re.compile(
+    r'\d+(?:,\d+)*(?:\.\d+)?[a-z]*'
+    r'|[a-z]+|[^\W\d_\u0900-\u097F]+|[\u0900-\u097F]+'
+)
+_NUMBER_RE = re.compile(r'([\d,]+(?:\.\d+)?)([a-z]*)')
+
+# Number words that scale the preceding number
+NUMBER_UNITS = {
+    'k': 1e3, 'thousand': 1e3, 'hazar': 1e3, 'hazaar': 1e3, 'हजार': 1e3, 'हज़ार': 1e3,
+    'lakh': 1e5, 'lakhs': 1e5, 'lac': 1e5, 'lacs': 1e5, 'लाख': 1e5,
+    'cr': 1e7, 'crore': 1e7, 'crores': 1e7, 'करोड़': 1e7, 'करोड': 1e7, 'कोटी': 1e7,
+}
+ORDINAL_SUFFIXES = frozenset(['st', 'nd', 'rd', 'th'])
+
+WEEKDAYS = frozenset(['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'])
+SAVINGS_WORDS = frozenset(['savings', 'saving', 'बचत'])
+CURRENT_WORDS = frozenset(['current', 'checking', 'चालू'])
+LIMIT_NOUN_PREFIXES = ('transaction', 'payment', 'statement')
+# Words that end a reminder message
+REMINDER_STOP_WORDS = frozenset(['on', 'by', 'next', 'tomorrow'])
+# Words after "to" (or before "ko") that are never a payee name
+RECIPIENT_STOP_WORDS = frozenset([
+    'pay', 'be', 'do', 'the', 'my', 'me', 'know', 'see', 'check', 'get', 'set', 'make', 'buy',
+    'send', 'transfer', 'give', 'take', 'open', 'close', 'block', 'account', 'bank', 'please',
+    'now', 'today', 'tomorrow', 'for', 'from', 'and', 'with', 'on', 'by', 'at', 'in', 'of',
+    'savings', 'current', 'rupees', 'rs', 'inr', 'him', 'her', 'them', 'it', 'this', 'that',
+])
+RECIPIENT_POSTPOSITIONS = frozenset(['ko', 'को', 'la', 'ला', 'कडे'])
+
+# Every word the slot walk reacts to; anything else is skipped with one set lookup
+_KEYWORDS = (SAVINGS_WORDS | CURRENT_WORDS | RECIPIENT_POSTPOSITIONS | WEEKDAYS
+             | {'to', 'remind', 'reminder', 'tomorrow'})
+
+
+def fold_text(text: str) -> str:
+    """Lowercase, strip and map Devanagari digits to ASCII (the form tokenize() expects)"""
+    text = text.lower().strip()
+    if not text.isascii() and _DEVANAGARI_DIGIT_RE.search(text):
+        text = text.translate(_DEVANAGARI_DIGITS)
+    return text
+
+
+def tokenize(text: str) -> List[str]:
+    """Split folded text into number and word tokens"""
+    return _TOKEN_RE.findall(text)
+
+
+def parse_number(token: str) -> Tuple[float, str]:
+    """
+    Value and suffix of a number token
+    "5k" -> (5000.0, 'k'), "1,50,000" -> (150000.0, ''), "5th" -> (5.0, 'th')
+    """
+    digits, suffix = _NUMBER_RE.match(token).groups()
+    value = float(digits.replace(',', ''))
+    if suffix in NUMBER_UNITS:
+        value *= NUMBER_UNITS[suffix]
+    return value, suffix
+
+
+def _is_name_word(token: Optional[str]) -> bool:
+    return (token is not None and len(token) > 1 and not token[0].isdigit()
+            and token not in RECIPIENT_STOP_WORDS and token not in NUMBER_UNITS)
+
+
+def _is_latin_name_word(token: Optional[str]) -> bool:
+    return _is_name_word(token) and token.isascii()
+
+
+def _token_span(text: str, tokens: List[str], first: int, last: int) -> Tuple[int, int]:
+    """Character span of tokens[first..last] (tokens are ordered substrings of text)"""
+    position = 0
+    for index in range(first):
+        position = text.find(tokens[index], position) + len(tokens[index])
+    start = text.find(tokens[first], position)
+    position = start
+    for index in range(first, last + 1):
+        position = text.find(tokens[index], position) + len(tokens[index])
+    return start, position
+
+
+def extract_entities(text: str, detected_intent: str, tokens: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Extract amount, recipient, limit, account type and reminder details in one pass
+    Pass `tokens` (from tokenize(fold_text(...))) with already-folded `text`
+    to skip re-tokenizing.
+    """
+    if tokens is None:
+        text = fold_text(text)
+        tokens = tokenize(text)
+    count = len(tokens)
+    want_reminder = detected_intent == 'set_reminder'
+
+    amount = None
+    recipient = None
+    postposition_recipient = None
+    limit = None
+    loose_limit = None
+    account_type = None
+    message_tokens = None
+    # Due date candidates by priority: on/by weekday, on/by day-of-month, tomorrow/next weekday
+    due_dates: List[Optional[str]] = [None, None, None]
+
+    for i, token in enumerate(tokens):
+        if token[0].isdigit():
+            value, suffix = parse_number(token)
+            following = tokens[i + 1] if i + 1 < count else None
+            if not suffix and following in NUMBER_UNITS:
+                # "2 lakh": the unit is the next word
+                value *= NUMBER_UNITS[following]
+                following = tokens[i + 2] if i + 2 < count else None
+            previous = tokens[i - 1] if i else None
+            if amount is None and suffix not in ORDINAL_SUFFIXES:
+                amount = value
+            if limit is None and not suffix and value == int(value):
+                # "last 5", "recent 3", "last my 5 transactions", "5 payments"
+                anchor = tokens[i - 2] if previous == 'my' and i >= 2 else previous
+                noun_follows = following is not None and following.startswith(LIMIT_NOUN_PREFIXES)
+                if anchor in ('last', 'recent') and (noun_follows or anchor is previous):
+                    limit = int(value)
+                elif noun_follows and loose_limit is None:
+                    loose_limit = int(value)
+            if want_reminder and previous in ('on', 'by') and due_dates[1] is None \
+                    and (not suffix or suffix in ORDINAL_SUFFIXES) and value < 32 and value == int(value):
+                due_dates[1] = token
+            continue
+
+        if token not in _KEYWORDS:
+            continue
+
+        if token == 'to':
+            following = tokens[i + 1] if i + 1 < count else None
+            if recipient is None and _is_latin_name_word(following):
+                second = tokens[i + 2] if i + 2 < count else None
+                if _is_latin_name_word(second):
+                    recipient = f"{following} {second}".title()
+                else:
+                    recipient = following.title()
+        elif token in RECIPIENT_POSTPOSITIONS:
+            if postposition_recipient is None and i and _is_name_word(tokens[i - 1]):
+                postposition_recipient = tokens[i - 1].title()
+        elif token in SAVINGS_WORDS:
+            if account_type is None:
+                account_type = 'savings'
+        elif token in CURRENT_WORDS:
+            if account_type is None:
+                account_type = 'current'
+        elif want_reminder:
+            if token == 'remind' or token == 'reminder':
+                if message_tokens is None:
+                    start = None
+                    if token == 'remind' and tokens[i + 1:i + 3] == ['me', 'to']:
+                        start = i + 3
+                    elif token == 'reminder':
+                        start = i + 2 if i + 1 < count and tokens[i + 1] == 'to' else i + 1
+                    if start is not None:
+                        end = start
+                        while end < count and tokens[end] not in REMINDER_STOP_WORDS:
+                            end += 1
+                        if end > start:
+                            message_tokens = (start, end - 1)
+            elif token == 'tomorrow':
+                if due_dates[2] is None:
+                    due_dates[2] = token
+            elif token in WEEKDAYS:
+                previous = tokens[i - 1] if i else None
+                if previous in ('on', 'by') and due_dates[0] is None:
+                    due_dates[0] = token
+                elif previous == 'next' and due_dates[2] is None:
+                    due_dates[2] = f"next {token}"
+
+    entities: Dict[str, Any] = {}
+    if amount is not None:
+        entities['amount'] = amount
+    if recipient is None:
+        recipient = postposition_recipient
+    if recipient is not None:
+        entities['recipient'] = recipient
+    if limit is None:
+        limit = loose_limit
+    if limit is not None:
+        entities['limit'] = limit
+    if account_type is not None:
+        entities['account_type'] = account_type
+    if want_reminder:
+        if message_tokens is not None:
+            start, end = _token_span(text, tokens, *message_tokens)
+            entities['message'] = text[start:end]
+        due_date = next((candidate for candidate in due_dates if candidate is not None), None)
+        if due_date is not None:
+            entities['due_date'] = due_date
+    return entities
+
+
+if __name__ == '__main__':
+    # Test entity extraction
+    test_queries = [
+        ("transfer 500 to rohan", 'transfer_funds'),
+        ("send 5k to priya sharma", 'transfer_funds'),
+        ("rohan ko 2 lakh bhejo", 'transfer_funds'),
+        ("transfer ₹1,50,000 to amit", 'transfer_funds'),
+        ("१.५ करोड़ ट्रांसफर करो", 'transfer_funds'),
+        ("show my last 3 transactions", 'transaction_history'),
+        ("check my current account balance", 'check_balance'),
+        ("remind me to pay rent on 5th", 'set_reminder'),
+        ("remind me to pay emi next monday", 'set_reminder'),
+    ]
+
+    for query, intent in test_queries:
+        print(f"{query!r} ({intent}): {extract_entities(query, intent)}")
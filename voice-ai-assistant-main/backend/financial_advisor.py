@@ -8,15 +8,10 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List
 import json
 
-logger = logging.getLogger(__name__)
+# OpenAI access (deadlines, retries, circuit breaker) for advanced features
+import llm_client
 
-# Try to import OpenAI for advanced features
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-    openai.api_key = os.getenv('OPENAI_API_KEY', '')
-except ImportError:
-    OPENAI_AVAILABLE = False
+logger = logging.getLogger(__name__)
 
 
 def calculate_financial_health_score(user_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -278,7 +273,7 @@ def get_ai_financial_advice(query: str, user_data: Dict[str, Any]) -> str:
     Falls back to rule-based if OpenAI not available
     """
     
-    if OPENAI_AVAILABLE and openai.api_key:
+    if llm_client.is_available('chat'):
         try:
             # Create context from user data
             context = f"""
@@ -293,8 +288,7 @@ User Query: {query}
 Provide practical, actionable financial advice in 2-3 sentences. Be specific and helpful.
 """
             
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
+            return llm_client.chat_completion(
                 messages=[
                     {"role": "system", "content": "You are an expert financial advisor providing personalized advice."},
                     {"role": "user", "content": context}
@@ -302,8 +296,6 @@ Provide practical, actionable financial advice in 2-3 sentences. Be specific and
                 temperature=0.7,
                 max_tokens=200
             )
-            
-            return response.choices[0].message.content.strip()
         
         except Exception as e:
             logger.error(f"AI advice error: {str(e)}")
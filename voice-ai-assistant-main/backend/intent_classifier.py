@@ -0,0 +1,434 @@
+"""
+Offline Intent Classifier for TalkToBank
+Hashed character/word n-gram features + a NumPy softmax-regression model.
+
+The model is trained offline from a corpus bootstrapped out of the regex
+patterns in nlp_module and the intent keys of knowledge_base, serialized to
+models/intent_classifier.npz, and loaded once at startup. Inference is a
+handful of hash computations plus one small row-gather and sum, so it runs
+locally in well under a millisecond.
+
+Usage:
+    python intent_classifier.py train [--output PATH] [--seed N]
+    python intent_classifier.py predict "check my balance"
+"""
+import os
+import re
+import zlib
+import random
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logger.warning("NumPy not available. Offline intent classifier disabled.")
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'intent_classifier.npz')
+MODEL_PATH = os.getenv('INTENT_CLASSIFIER_MODEL', DEFAULT_MODEL_PATH)
+
+# Must be a power of two; features are hashed into this many buckets
+N_FEATURES = 2 ** 13
+CHAR_NGRAM_SIZES = (3, 4, 5)
+
+_TOKEN_RE = re.compile(r'[\w\u0900-\u097F]+|₹')
+
+
+# ==================== FEATURES ====================
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping Devanagari words (with their vowel signs) intact"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def extract_features(text: str, n_features: int = N_FEATURES) -> List[int]:
+    """
+    Hash word unigrams, word bigrams and per-word character n-grams into bucket ids
+
+    crc32 is used instead of hash() so bucket ids are stable across processes.
+    """
+    mask = n_features - 1
+    tokens = tokenize(text)
+    names = []
+    for i, token in enumerate(tokens):
+        names.append('w:' + token)
+        if i:
+            names.append('b:' + tokens[i - 1] + ' ' + token)
+        padded = '<' + token + '>'
+        for size in CHAR_NGRAM_SIZES:
+            for start in range(len(padded) - size + 1):
+                names.append('c:' + padded[start:start + size])
+    return sorted({zlib.crc32(name.encode('utf-8')) & mask for name in names})
+
+
+# ==================== MODEL ====================
+
+class IntentClassifier:
+    """Multinomial logistic regression over hashed n-gram features with temperature calibration"""
+
+    def __init__(self, weights, bias, labels: List[str], temperature: float = 1.0):
+        self.weights = weights
+        self.bias = bias
+        self.labels = list(labels)
+        self.label_index = {label: i for i, label in enumerate(self.labels)}
+        self.temperature = float(temperature)
+        self.n_features = weights.shape[0]
+
+    def _logits(self, indices: List[int]):
+        if not indices:
+            return self.bias.copy()
+        scale = 1.0 / np.sqrt(len(indices))
+        return self.weights[indices].sum(axis=0) * scale + self.bias
+
+    def predict_proba(self, text: str):
+        """Calibrated class probabilities for one utterance"""
+        logits = self._logits(extract_features(text, self.n_features)) / self.temperature
+        logits -= logits.max()
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    def predict_proba_batch(self, texts: List[str]):
+        """
+        Calibrated class probabilities for many utterances, shape (len(texts), n_intents)
+        One gather over all feature ids plus a segmented sum, instead of a loop of predict_proba
+        """
+        feature_lists = [extract_features(text, self.n_features) for text in texts]
+        lengths = np.array([len(features) for features in feature_lists])
+        logits = np.tile(self.bias.astype(np.float64), (len(texts), 1))
+        nonempty = lengths > 0
+        if nonempty.any():
+            indices = np.concatenate([features for features in feature_lists if features])
+            offsets = np.concatenate(([0], np.cumsum(lengths[nonempty])[:-1]))
+            sums = np.add.reduceat(self.weights[indices], offsets, axis=0)
+            logits[nonempty] += sums / np.sqrt(lengths[nonempty])[:, None]
+        logits /= self.temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely intent and its calibrated confidence"""
+        proba = self.predict_proba(text)
+        best = int(proba.argmax())
+        return self.labels[best], float(proba[best])
+
+    def save(self, path: str):
+        """Serialize the model to a compressed .npz file"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float32),
+            bias=self.bias.astype(np.float32),
+            labels=np.array(self.labels),
+            temperature=np.array(self.temperature, dtype=np.float32),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'IntentClassifier':
+        """Load a model written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                weights=data['weights'],
+                bias=data['bias'],
+                labels=[str(label) for label in data['labels']],
+                temperature=float(data['temperature']),
+            )
+
+
+_default_classifier: Optional[IntentClassifier] = None
+_default_loaded = False
+
+
+def get_default_classifier() -> Optional[IntentClassifier]:
+    """
+    The serialized model at MODEL_PATH, loaded once per process
+    Returns None if NumPy is missing or no model has been trained yet.
+    """
+    global _default_classifier, _default_loaded
+    if _default_loaded:
+        return _default_classifier
+    _default_loaded = True
+    if not NUMPY_AVAILABLE:
+        return None
+    if not os.path.exists(MODEL_PATH):
+        logger.warning(f"Intent classifier model not found at {MODEL_PATH}. Run: python intent_classifier.py train")
+        return None
+    try:
+        _default_classifier = IntentClassifier.load(MODEL_PATH)
+        logger.info(f"Loaded intent classifier ({len(_default_classifier.labels)} intents) from {MODEL_PATH}")
+    except Exception as e:
+        logger.error(f"Failed to load intent classifier: {str(e)}")
+    return _default_classifier
+
+
+# ==================== TRAINING CORPUS ====================
+
+# Phrases wrapped around generated samples so the model sees realistic context
+CONTEXT_PREFIXES = ['', '', '', 'please ', 'can you ', 'i want to ', 'hey ', 'tell me ', 'i need to ']
+CONTEXT_SUFFIXES = ['', '', '', ' please', ' now', ' today', ' for me', '?']
+# Filler used where a pattern allows arbitrary text (.*)
+FILLER_WORDS = ['', 'my', 'the', 'me my', 'is my', 'the total', 'account']
+
+# Out-of-domain utterances for the 'unknown' class
+UNKNOWN_UTTERANCES = [
+    "what's the weather like today", "play some music", "tell me a joke",
+    "who won the cricket match", "book a movie ticket", "what time is it",
+    "order a pizza", "how tall is mount everest", "translate this sentence",
+    "set an alarm for six", "what is the capital of france", "sing a song",
+    "open youtube", "call my mom", "how do you cook rice", "news headlines",
+    "who are you", "what is your name", "i am bored", "recommend a good book",
+    "how old is the universe", "turn on the lights", "navigate to the airport",
+    "what's trending on twitter", "random words here", "asdf qwerty",
+    "the quick brown fox", "ok", "yes", "no", "maybe later", "hmm",
+    "aaj mausam kaisa hai", "gaana bajao",
+]
+
+
+def _sample_regex(parsed, rng: random.Random) -> str:
+    """Generate one random string matched by a parsed regex (sre_parse tree)"""
+    out = []
+    for op, av in parsed:
+        if op == sre_constants.LITERAL:
+            out.append(chr(av))
+        elif op == sre_constants.NOT_LITERAL:
+            out.append('x')
+        elif op == sre_constants.ANY:
+            out.append(' ')
+        elif op == sre_constants.IN:
+            out.append(_sample_char_class(av, rng))
+        elif op == sre_constants.BRANCH:
+            out.append(_sample_regex(rng.choice(av[1]), rng))
+        elif op == sre_constants.SUBPATTERN:
+            out.append(_sample_regex(av[-1], rng))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, sub = av
+            if len(sub) == 1 and sub[0][0] == sre_constants.ANY:
+                # ".*" - drop in a few filler words rather than random characters
+                out.append(' ' + rng.choice(FILLER_WORDS) + ' ')
+                continue
+            high = min(high, low + 2)
+            out.extend(_sample_regex(sub, rng) for _ in range(rng.randint(low, high)))
+        # AT (anchors/boundaries), ASSERT and friends emit nothing
+    return ''.join(out)
+
+
+def _sample_char_class(items, rng: random.Random) -> str:
+    choices = []
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            choices.append(chr(av))
+        elif op == sre_constants.RANGE:
+            choices.append(chr(rng.randint(av[0], av[1])))
+        elif op == sre_constants.CATEGORY:
+            if av == sre_constants.CATEGORY_DIGIT:
+                choices.append(str(rng.randint(0, 9)))
+            elif av == sre_constants.CATEGORY_SPACE:
+                choices.append(' ')
+            else:
+                choices.append('a')
+    return rng.choice(choices) if choices else ''
+
+
+def build_training_corpus(samples_per_pattern: int = 24, seed: int = 13) -> List[Tuple[str, str, str]]:
+    """
+    Bootstrap (utterance, intent, group) triples from the regex patterns and KB intent keys
+
+    Pattern samples are relabelled with nlp_module.match_intent so the
+    corpus agrees with the matcher's priority order. The group is the source
+    the sample came from; held-out splits are made by group so calibration
+    measures generalization to unseen phrasings rather than near-duplicates.
+    """
+    from nlp_module import INTENT_PATTERNS, match_intent
+    from knowledge_base import BANKING_KNOWLEDGE
+
+    rng = random.Random(seed)
+    corpus = []
+    for pattern_list in INTENT_PATTERNS.values():
+        for pattern in pattern_list:
+            parsed = sre_parse.parse(pattern)
+            for _ in range(samples_per_pattern):
+                core = re.sub(r'\s+', ' ', _sample_regex(parsed, rng)).strip()
+                text = (rng.choice(CONTEXT_PREFIXES) + core + rng.choice(CONTEXT_SUFFIXES)).strip()
+                label = match_intent(text.lower())
+                if label != 'unknown':
+                    corpus.append((text, label, pattern))
+
+    # Every knowledge-base topic is a class, even where patterns are thin
+    for intent in BANKING_KNOWLEDGE:
+        phrase = intent.replace('_', ' ')
+        for template in ('{}', 'tell me about {}', '{} please', 'i need {}', 'help with {}', 'what about {}'):
+            corpus.append((template.format(phrase), intent, 'kb:' + intent))
+
+    for text in UNKNOWN_UTTERANCES:
+        corpus.append((text, 'unknown', text))
+        for _ in range(3):
+            corpus.append((rng.choice(CONTEXT_PREFIXES) + text, 'unknown', text))
+
+    return list(dict.fromkeys(corpus))
+
+
+# ==================== TRAINING ====================
+
+def _to_sparse(texts: List[str], n_features: int):
+    """Flatten feature lists into (indices, row ids, per-row scale) arrays"""
+    indices, rows, scale = [], [], []
+    for row, text in enumerate(texts):
+        features = extract_features(text, n_features)
+        indices.extend(features)
+        rows.extend([row] * len(features))
+        scale.append(1.0 / np.sqrt(len(features)) if features else 0.0)
+    return np.array(indices, dtype=np.int64), np.array(rows, dtype=np.int64), np.array(scale, dtype=np.float64)
+
+
+def _forward(weights, bias, sparse, n_rows: int):
+    indices, rows, scale = sparse
+    logits = np.zeros((n_rows, weights.shape[1]))
+    for c in range(weights.shape[1]):
+        logits[:, c] = np.bincount(rows, weights=weights[indices, c], minlength=n_rows)
+    return logits * scale[:, None] + bias
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _fit(pairs: List[Tuple[str, str]], label_index: Dict[str, int], n_features: int, epochs: int,
+         learning_rate: float, l2: float):
+    """Full-batch Adam on the softmax cross-entropy; returns (weights, bias, train accuracy)"""
+    sparse = _to_sparse([text for text, _ in pairs], n_features)
+    y = np.array([label_index[label] for _, label in pairs])
+    n_rows, n_classes = len(pairs), len(label_index)
+    targets = np.eye(n_classes)[y]
+
+    weights = np.zeros((n_features, n_classes))
+    bias = np.zeros(n_classes)
+    m_w, v_w = np.zeros_like(weights), np.zeros_like(weights)
+    m_b, v_b = np.zeros_like(bias), np.zeros_like(bias)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    indices, rows, scale = sparse
+
+    for step in range(1, epochs + 1):
+        proba = _softmax(_forward(weights, bias, sparse, n_rows))
+        grad_logits = (proba - targets) / n_rows
+        weighted = grad_logits[rows] * scale[rows, None]
+        grad_w = np.zeros_like(weights)
+        for c in range(n_classes):
+            grad_w[:, c] = np.bincount(indices, weights=weighted[:, c], minlength=n_features)
+        grad_w += l2 * weights
+        grad_b = grad_logits.sum(axis=0)
+
+        m_w = beta1 * m_w + (1 - beta1) * grad_w
+        v_w = beta2 * v_w + (1 - beta2) * grad_w ** 2
+        m_b = beta1 * m_b + (1 - beta1) * grad_b
+        v_b = beta2 * v_b + (1 - beta2) * grad_b ** 2
+        correction1, correction2 = 1 - beta1 ** step, 1 - beta2 ** step
+        weights -= learning_rate * (m_w / correction1) / (np.sqrt(v_w / correction2) + eps)
+        bias -= learning_rate * (m_b / correction1) / (np.sqrt(v_b / correction2) + eps)
+
+    return weights, bias, float((proba.argmax(axis=1) == y).mean())
+
+
+def train_classifier(corpus: List[Tuple[str, str, str]], n_features: int = N_FEATURES, epochs: int = 300,
+                     learning_rate: float = 0.05, l2: float = 1e-5, holdout: float = 0.15,
+                     seed: int = 13) -> Tuple[IntentClassifier, Dict[str, Any]]:
+    """
+    Fit softmax regression, calibrating its temperature on held-out groups
+
+    A first model trained without the held-out groups picks the temperature
+    that minimizes held-out negative log-likelihood; the shipped model is
+    then refit on the full corpus and keeps that temperature.
+    Returns the model and a dict of training metrics.
+    """
+    rng = random.Random(seed)
+    labels = sorted({label for _, label, _ in corpus})
+    label_index = {label: i for i, label in enumerate(labels)}
+
+    groups = sorted({group for _, _, group in corpus})
+    rng.shuffle(groups)
+    heldout_groups = set(groups[:int(len(groups) * holdout)])
+    train = [(text, label) for text, label, group in corpus if group not in heldout_groups]
+    heldout = [(text, label) for text, label, group in corpus if group in heldout_groups]
+
+    temperature = 1.0
+    heldout_accuracy = None
+    if heldout:
+        weights, bias, _ = _fit(train, label_index, n_features, epochs, learning_rate, l2)
+        held_sparse = _to_sparse([text for text, _ in heldout], n_features)
+        y_held = np.array([label_index[label] for _, label in heldout])
+        held_logits = _forward(weights, bias, held_sparse, len(heldout))
+        best_nll = float('inf')
+        for candidate in np.arange(0.1, 5.01, 0.05):
+            proba = _softmax(held_logits / candidate)
+            nll = -np.log(proba[np.arange(len(heldout)), y_held] + 1e-12).mean()
+            if nll < best_nll:
+                best_nll, temperature = nll, float(candidate)
+        heldout_accuracy = float((held_logits.argmax(axis=1) == y_held).mean())
+
+    all_pairs = [(text, label) for text, label, _ in corpus]
+    weights, bias, train_accuracy = _fit(all_pairs, label_index, n_features, epochs, learning_rate, l2)
+
+    model = IntentClassifier(weights.astype(np.float32), bias.astype(np.float32), labels, temperature)
+    report = {
+        'samples': len(corpus),
+        'intents': len(labels),
+        'train_accuracy': round(train_accuracy, 4),
+        'heldout_accuracy': round(heldout_accuracy, 4) if heldout_accuracy is not None else None,
+        'temperature': round(temperature, 2),
+    }
+    return model, report
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Train or query the offline intent classifier")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = subparsers.add_parser('train', help='bootstrap a corpus and train a model')
+    train_parser.add_argument('--output', default=MODEL_PATH, help='where to write the .npz model')
+    train_parser.add_argument('--samples-per-pattern', type=int, default=24)
+    train_parser.add_argument('--epochs', type=int, default=300)
+    train_parser.add_argument('--seed', type=int, default=13)
+
+    predict_parser = subparsers.add_parser('predict', help='classify utterances with a trained model')
+    predict_parser.add_argument('texts', nargs='+')
+    predict_parser.add_argument('--model', default=MODEL_PATH)
+
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        parser.error("NumPy is required: pip install numpy")
+
+    if args.command == 'train':
+        corpus = build_training_corpus(args.samples_per_pattern, args.seed)
+        print(f"Bootstrapped {len(corpus)} labelled utterances")
+        start = time.perf_counter()
+        model, report = train_classifier(corpus, epochs=args.epochs, seed=args.seed)
+        print(f"Trained in {time.perf_counter() - start:.1f}s: {report}")
+        model.save(args.output)
+        print(f"Model saved to: {args.output}")
+    else:
+        model = IntentClassifier.load(args.model)
+        for text in args.texts:
+            start = time.perf_counter()
+            intent, confidence = model.predict(text)
+            elapsed_us = (time.perf_counter() - start) * 1e6
+            print(f"{text!r}: {intent} ({confidence:.3f}) in {elapsed_us:.0f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Knowledge Base Search Index for TalkToBank
+Two indexes over every BANKING_KNOWLEDGE entry (topic name, response and
+quick tips), built by knowledge_base on the first search and rebuilt when
+the knowledge store is reloaded. Queries the intent patterns do not
+recognise are answered from the best-scoring entry instead of the generic
+help text, without a round trip to the LLM.
+
+- BM25Index: keyword inverted index (exact terms, sub-millisecond)
+- NgramVectorIndex: hashed character n-gram vectors in one dense NumPy
+  matrix, for paraphrases and misspellings that share word pieces rather
+  than whole words; a query is one (sparse) vector-matrix product plus top-k
+"""
+import math
+import zlib
+import heapq
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from entity_extractor import fold_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logger.warning("NumPy not available. Knowledge base vector search disabled.")
+
+# Must be a power of two; character n-grams are hashed into this many buckets
+VECTOR_FEATURES = 2 ** 12
+CHAR_NGRAM_SIZES = (3, 4, 5)
+
+# Function words that carry no topic; everything else is indexed
+STOPWORDS = frozenset("""
+a about also am an and any are as at be by can could do does for from get give got has have here how
+i if in into is it its just know like me much my need now of on or our please s should so some t tell
+than that the their them then there these this to today us very want was we what when where which who
+will with would you your
+""".split())
+
+
+def _stem(token: str) -> str:
+    """Light suffix folding so "blocking"/"blocked"/"blocks" share one term"""
+    if len(token) > 5 and token.endswith('ing'):
+        return token[:-3]
+    if len(token) > 4 and token.endswith('ed'):
+        return token[:-2]
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def index_terms(text: str) -> List[str]:
+    """Folded, stemmed content words of a text"""
+    return [_stem(token) for token in tokenize(fold_text(text))
+            if token not in STOPWORDS and not token[0].isdigit()]
+
+
+def knowledge_documents(knowledge: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """One searchable document per KB intent: topic name + response + quick tips"""
+    return {
+        intent: ' '.join([intent.replace('_', ' '), entry['response']] + list(entry.get('quick_tips', [])))
+        for intent, entry in knowledge.items()
+    }
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of documents, with term -> postings lists"""
+
+    def __init__(self, documents: Dict[str, str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = list(documents)
+        self._lengths: List[int] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_index, doc_id in enumerate(self.doc_ids):
+            counts = Counter(index_terms(documents[doc_id]))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((doc_index, tf))
+
+        total_docs = len(self.doc_ids)
+        average_length = (sum(self._lengths) / total_docs) if total_docs else 0.0
+        # Per-document length normalization, folded into one factor at build time
+        self._norms = [k1 * (1 - b + b * length / average_length) for length in self._lengths] if total_docs else []
+        self._idf = {
+            term: math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    @classmethod
+    def from_knowledge(cls, knowledge: Dict[str, Dict[str, Any]], **params) -> 'BM25Index':
+        return cls(knowledge_documents(knowledge), **params)
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        """Best (doc_id, score) pairs for the query, highest first; [] if nothing matches"""
+        scores: Dict[int, float] = {}
+        for term in set(index_terms(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for doc_index, tf in postings:
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * tf * (self.k1 + 1) / (tf + self._norms[doc_index])
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self.doc_ids[doc_index], score) for doc_index, score in best]
+
+    def best_match(self, query: str, min_score: float) -> Optional[Tuple[str, float]]:
+        """Top (doc_id, score) if it clears min_score"""
+        results = self.search(query, top_k=1)
+        if results and results[0][1] >= min_score:
+            return results[0]
+        return None
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+
+def ngram_buckets(text: str, n_features: int = VECTOR_FEATURES) -> List[int]:
+    """
+    Hash the character n-grams of each content word into bucket ids (with repeats)
+    crc32 is used instead of hash() so bucket ids are stable across processes.
+    """
+    mask = n_features - 1
+    buckets = []
+    for term in index_terms(text):
+        padded = '<' + term + '>'
+        for size in CHAR_NGRAM_SIZES:
+            for start in range(len(padded) - size + 1):
+                buckets.append(zlib.crc32(padded[start:start + size].encode('utf-8')) & mask)
+    return buckets
+
+
+class NgramVectorIndex:
+    """TF-IDF weighted, L2-normalized hashed n-gram vectors; cosine similarity search"""
+
+    def __init__(self, documents: Dict[str, str], n_features: int = VECTOR_FEATURES):
+        self.n_features = n_features
+        self.doc_ids: List[str] = list(documents)
+        matrix = np.zeros((len(self.doc_ids), n_features), dtype=np.float32)
+        for row, doc_id in enumerate(self.doc_ids):
+            matrix[row] = self._term_weights(documents[doc_id])
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        self._idf = (np.log((1 + len(self.doc_ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        matrix *= self._idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        # Stored feature-major: a query touches only the rows of its few non-zero
+        # buckets instead of streaming the whole matrix through memory
+        self._matrix_t = np.ascontiguousarray(matrix.T)
+
+    @classmethod
+    def from_knowledge(cls, knowledge: Dict[str, Dict[str, Any]], **params) -> 'NgramVectorIndex':
+        return cls(knowledge_documents(knowledge), **params)
+
+    def _term_weights(self, text: str):
+        """Sublinear (log) bucket counts of a text"""
+        buckets = ngram_buckets(text, self.n_features)
+        return np.log1p(np.bincount(buckets, minlength=self.n_features).astype(np.float32))
+
+    def vectorize(self, text: str):
+        """Unit query vector (all zeros when the text has no content words)"""
+        vector = self._term_weights(text) * self._idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        """Best (doc_id, cosine) pairs for the query, highest first"""
+        vector = self.vectorize(query)
+        active = np.flatnonzero(vector)
+        if not len(active) or not self.doc_ids:
+            return []
+        scores = vector[active] @ self._matrix_t[active]
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.doc_ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def best_match(self, query: str, min_score: float) -> Optional[Tuple[str, float]]:
+        """Top (doc_id, cosine) if it clears min_score"""
+        results = self.search(query, top_k=1)
+        if results and results[0][1] >= min_score:
+            return results[0]
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix_t.nbytes
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+
+if __name__ == '__main__':
+    from knowledge_base import BANKING_KNOWLEDGE
+
+    keyword_index = BM25Index.from_knowledge(BANKING_KNOWLEDGE)
+    vector_index = NgramVectorIndex.from_knowledge(BANKING_KNOWLEDGE) if NUMPY_AVAILABLE else None
+    for query in ["how do I stop payment on a cheque", "what documents for opening account",
+                  "my card got stolen", "bounced cheque penalty", "what's the weather like today"]:
+        print(f"{query!r}")
+        print(f"  bm25:   {[(doc, round(score, 2)) for doc, score in keyword_index.search(query)]}")
+        if vector_index:
+            print(f"  vector: {[(doc, round(score, 3)) for doc, score in vector_index.search(query)]}")
@@ -0,0 +1,246 @@
+"""
+Knowledge Base Store for TalkToBank
+Knowledge base content lives in data files, not in code:
+
+- data/knowledge_base.json: the English entries, edited by hand
+- data/kb_translations.json.gz: their Hindi/Marathi translations (kb_translations.py)
+
+`python kb_store.py publish` compiles both into the published store
+(data/knowledge/): one pack file per language holding every entry as one
+line of JSON, plus manifest.json mapping (language, intent) to a byte range
+in its pack.
+
+At runtime the manifest is read on first access, every pack it names is
+memory-mapped read-only right away and an entry is parsed only when it is
+first asked for. A mapping outlives its file, so a worker several versions
+behind keeps serving after publish removes the packs it uses. Mapped
+pages live in the OS page cache, so every worker process serving the same
+pack shares one copy. Workers check the manifest every KB_RELOAD_SECONDS
+and swap to a newly published store atomically: a request sees either the
+old store or the new one, never a mix, and nothing needs restarting.
+"""
+import os
+import json
+import mmap
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+KB_SOURCE_PATH = os.getenv('KB_SOURCE_PATH', os.path.join(_DATA_DIR, 'knowledge_base.json'))
+KB_DIR = os.getenv('KB_DIR', os.path.join(_DATA_DIR, 'knowledge'))
+KB_RELOAD_SECONDS = float(os.getenv('KB_RELOAD_SECONDS', '30'))
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def load_source(path: str = KB_SOURCE_PATH) -> Dict[str, Dict[str, Any]]:
+    """English entries ({intent: {'response', 'quick_tips'}}) from the editable source file"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['entries']
+
+
+# ==================== PUBLISH ====================
+
+def _write_atomic(path: str, data: bytes):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def _read_manifest(kb_dir: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(kb_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def publish(knowledge_by_lang: Dict[str, Dict[str, Dict[str, Any]]], kb_dir: str = KB_DIR) -> Dict[str, Any]:
+    """
+    Write one pack per language and switch the manifest to them
+    Packs are named by content hash and never rewritten; packs referenced by
+    neither the new nor the previous manifest are removed. A store maps all
+    its packs when it opens, so workers still on an older version keep
+    reading them through their mappings.
+    """
+    os.makedirs(kb_dir, exist_ok=True)
+    previous = _read_manifest(kb_dir)
+    manifest = {'version': (previous or {}).get('version', 0) + 1, 'languages': {}}
+    for lang, entries in knowledge_by_lang.items():
+        pack = bytearray()
+        offsets = {}
+        for intent, entry in entries.items():
+            line = json.dumps({'response': entry['response'], 'quick_tips': list(entry.get('quick_tips', []))},
+                              ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            offsets[intent] = [len(pack), len(line)]
+            pack += line + b'\n'
+        pack_name = f"{lang}-{hashlib.sha256(pack).hexdigest()[:12]}.pack"
+        pack_path = os.path.join(kb_dir, pack_name)
+        if not os.path.exists(pack_path):
+            _write_atomic(pack_path, bytes(pack))
+        manifest['languages'][lang] = {'pack': pack_name, 'entries': offsets}
+    _write_atomic(os.path.join(kb_dir, MANIFEST_NAME),
+                  json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+
+    keep = {info['pack'] for m in (manifest, previous) if m for info in m['languages'].values()}
+    for name in os.listdir(kb_dir):
+        if name.endswith('.pack') and name not in keep:
+            os.remove(os.path.join(kb_dir, name))
+    return manifest
+
+
+def publish_from_source(source_path: str = KB_SOURCE_PATH, kb_dir: str = KB_DIR) -> Dict[str, Any]:
+    """Publish the English source plus every translation still matching it"""
+    from kb_translations import KB_TRANSLATIONS_PATH, load_translations
+
+    english = load_source(source_path)
+    knowledge_by_lang = {'en': english}
+    for lang, entries in load_translations(english, KB_TRANSLATIONS_PATH).items():
+        knowledge_by_lang[lang] = {
+            intent: {'response': response, 'quick_tips': tips}
+            for intent, (response, tips) in entries.items()
+        }
+    return publish(knowledge_by_lang, kb_dir)
+
+
+# ==================== STORE ====================
+
+class KnowledgeStore:
+    """One published version of the knowledge base: manifest in memory, its packs memory-mapped when opened"""
+
+    def __init__(self, kb_dir: str = KB_DIR):
+        self.kb_dir = kb_dir
+        manifest = _read_manifest(kb_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No knowledge base published in {kb_dir}")
+        self.version = manifest['version']
+        self._languages = manifest['languages']
+        # Mapped now rather than on first use: a later publish may delete these files
+        self._maps: Dict[str, mmap.mmap] = {
+            lang: self._map_pack(info['pack']) for lang, info in self._languages.items() if info['entries']
+        }
+        self._entries: Dict[tuple, Dict[str, Any]] = {}
+
+    def _map_pack(self, pack_name: str) -> mmap.mmap:
+        with open(os.path.join(self.kb_dir, pack_name), 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def languages(self) -> List[str]:
+        return list(self._languages)
+
+    def intents(self, lang: str = 'en') -> List[str]:
+        return list(self._languages.get(lang, {}).get('entries', {}))
+
+    def has(self, intent: str, lang: str = 'en') -> bool:
+        return intent in self._languages.get(lang, {}).get('entries', {})
+
+    def get(self, intent: str, lang: str = 'en') -> Optional[Dict[str, Any]]:
+        """The entry ({'response', 'quick_tips'}) for intent in lang, or None"""
+        entry = self._entries.get((lang, intent))
+        if entry is None:
+            span = self._languages.get(lang, {}).get('entries', {}).get(intent)
+            if span is None:
+                return None
+            offset, length = span
+            entry = json.loads(self._maps[lang][offset:offset + length])
+            self._entries[(lang, intent)] = entry
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'languages': {lang: len(info['entries']) for lang, info in self._languages.items()},
+            'parsed_entries': len(self._entries),
+            'mapped_bytes': sum(len(pack) for pack in list(self._maps.values())),
+        }
+
+
+_store: Optional[KnowledgeStore] = None
+_store_stamp = None
+_next_check = 0.0
+_store_lock = threading.Lock()
+
+
+def _manifest_stamp(kb_dir: str):
+    try:
+        stat = os.stat(os.path.join(kb_dir, MANIFEST_NAME))
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    except OSError:
+        return None
+
+
+def reload_store(force: bool = False) -> bool:
+    """Swap in the published store if the manifest changed (or always, with force); True if swapped"""
+    global _store, _store_stamp, _next_check
+    with _store_lock:
+        _next_check = time.monotonic() + KB_RELOAD_SECONDS
+        stamp = _manifest_stamp(KB_DIR)
+        if _store is not None and stamp == _store_stamp and not force:
+            return False
+        if stamp is None and _store is None:
+            logger.warning(f"No published knowledge base in {KB_DIR}; publishing {KB_SOURCE_PATH}")
+            publish_from_source(KB_SOURCE_PATH, KB_DIR)
+            stamp = _manifest_stamp(KB_DIR)
+        try:
+            store = KnowledgeStore(KB_DIR)
+        except (OSError, ValueError, KeyError) as e:
+            if _store is None:
+                raise
+            logger.error(f"Keeping knowledge base v{_store.version}; reload failed: {str(e)}")
+            return False
+        previous, _store, _store_stamp = _store, store, stamp
+    if previous is not None:
+        metrics.increment('knowledge_store.reloads')
+        logger.info(f"Knowledge base v{previous.version} -> v{store.version}")
+    return True
+
+
+def get_store() -> KnowledgeStore:
+    """The current store; opened on first use and re-checked every KB_RELOAD_SECONDS"""
+    if _store is None or time.monotonic() >= _next_check:
+        reload_store()
+    return _store
+
+
+def get_store_stats() -> Dict[str, Any]:
+    """Stats of the current store for /api/metrics (without opening it)"""
+    return _store.get_stats() if _store is not None else {'loaded': False}
+
+
+metrics.register_provider('knowledge_store', get_store_stats)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Publish and inspect the knowledge base store")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    publish_parser = subparsers.add_parser('publish', help='compile the source and translations into the store')
+    publish_parser.add_argument('--source', default=KB_SOURCE_PATH, help='English source JSON')
+    publish_parser.add_argument('--kb-dir', default=KB_DIR, help='published store directory')
+
+    status_parser = subparsers.add_parser('status', help='published version and entries per language')
+    status_parser.add_argument('--kb-dir', default=KB_DIR, help='published store directory')
+
+    args = parser.parse_args()
+
+    if args.command == 'publish':
+        manifest = publish_from_source(args.source, args.kb_dir)
+        print(f"Published knowledge base v{manifest['version']} to: {args.kb_dir}")
+
+    store = KnowledgeStore(args.kb_dir)
+    print(f"v{store.version}: " + ', '.join(f"{lang} {len(store.intents(lang))} entries" for lang in store.languages))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Pre-translated Knowledge Base for TalkToBank
+The knowledge base source (data/knowledge_base.json) is written in English.
+This module builds Hindi/Marathi variants of every entry offline and stores
+them in one gzipped JSON artifact (data/kb_translations.json.gz), which
+`python kb_store.py publish` compiles into the published store next to the
+English entries, so get_response(intent, 'hi') does no translation work per
+request.
+
+Every translated entry records a hash of the English text it came from;
+when an English entry changes, its stale translations are left out of the
+store (the English text is served) until the next build.
+
+Usage:
+    python kb_translations.py build [--lang hi mr] [--force]   # LLM-translate new/changed entries
+    python kb_translations.py export reviewed.json              # editable JSON for review
+    python kb_translations.py import reviewed.json              # merge reviewed translations
+    python kb_translations.py status
+    python kb_store.py publish                                  # then put the result live
+"""
+import os
+import gzip
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSLATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'kb_translations.json.gz')
+KB_TRANSLATIONS_PATH = os.getenv('KB_TRANSLATIONS_PATH', DEFAULT_TRANSLATIONS_PATH)
+ARTIFACT_VERSION = 1
+
+# Languages the artifact is built for: code -> name used in the translation prompt
+TRANSLATION_LANGUAGES = {'hi': 'Hindi', 'mr': 'Marathi'}
+
+TRANSLATION_PROMPT = (
+    "Translate the banking assistant text below from English to {language}. "
+    "Keep the markdown (**bold**, bullets •, line breaks), emojis, numbers, ₹ amounts, "
+    "phone numbers, email addresses, app names and banking acronyms (UPI, EMI, FD, RD, SIP, "
+    "NEFT, RTGS, IMPS, IFSC, TDS, PAN, KYC, ATM, PIN) exactly as they are. "
+    "Reply with the translation only."
+)
+
+
+def source_hash(entry: Dict[str, Any]) -> str:
+    """Fingerprint of an English entry's response and tips"""
+    text = '\x1f'.join([entry['response']] + list(entry.get('quick_tips', [])))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def read_artifact(path: str = KB_TRANSLATIONS_PATH) -> Dict[str, Any]:
+    """Raw artifact contents ({'version', 'languages': {lang: {intent: entry}}}); empty if missing"""
+    if not os.path.exists(path):
+        return {'version': ARTIFACT_VERSION, 'languages': {}}
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_artifact(artifact: Dict[str, Any], path: str = KB_TRANSLATIONS_PATH):
+    """Write the artifact atomically (readers never see a half-written file)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    artifact['version'] = ARTIFACT_VERSION
+    temp_path = f"{path}.tmp"
+    # mtime=0 keeps the gzip bytes identical for identical content
+    with open(temp_path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+            f.write(json.dumps(artifact, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    os.replace(temp_path, path)
+
+
+def load_translations(knowledge: Dict[str, Dict[str, Any]],
+                      path: str = KB_TRANSLATIONS_PATH) -> Dict[str, Dict[str, Tuple[str, List[str]]]]:
+    """
+    {lang: {intent: (response, tips)}} for every entry still matching its English source
+    Missing or unreadable artifacts give an empty mapping (English everywhere).
+    """
+    try:
+        artifact = read_artifact(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"KB translations unavailable ({str(e)}); serving English")
+        return {}
+
+    translations: Dict[str, Dict[str, Tuple[str, List[str]]]] = {}
+    stale = 0
+    for lang, entries in artifact.get('languages', {}).items():
+        localized = {}
+        for intent, entry in entries.items():
+            if intent not in knowledge or entry.get('source_hash') != source_hash(knowledge[intent]):
+                stale += 1
+                continue
+            localized[intent] = (entry['response'], list(entry.get('tips', [])))
+        translations[lang] = localized
+    if stale:
+        logger.warning(f"Ignoring {stale} stale KB translations; run: python kb_translations.py build")
+    return translations
+
+
+def coverage(knowledge: Dict[str, Dict[str, Any]], artifact: Dict[str, Any],
+             languages: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    """Per language: which intents are translated, stale or missing"""
+    report = {}
+    for lang in languages:
+        entries = artifact.get('languages', {}).get(lang, {})
+        status = {'translated': [], 'stale': [], 'missing': []}
+        for intent, entry in knowledge.items():
+            if intent not in entries:
+                status['missing'].append(intent)
+            elif entries[intent].get('source_hash') != source_hash(entry):
+                status['stale'].append(intent)
+            else:
+                status['translated'].append(intent)
+        report[lang] = status
+    return report
+
+
+# ==================== BUILD ====================
+
+def translate_text(text: str, lang: str, timeout: Optional[float] = None) -> str:
+    """One LLM translation call (through llm_client's retries and circuit breaker)"""
+    import llm_client
+    return llm_client.chat_completion(
+        [
+            {"role": "system", "content": TRANSLATION_PROMPT.format(language=TRANSLATION_LANGUAGES[lang])},
+            {"role": "user", "content": text},
+        ],
+        temperature=0,
+        timeout=timeout,
+    )
+
+
+def translate_entry(entry: Dict[str, Any], lang: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Translate an English entry's response and tips"""
+    tips = list(entry.get('quick_tips', []))
+    translated_tips = []
+    if tips:
+        # One call for all tips; fall back to one call per tip if the line count drifts
+        translated_tips = [line.strip() for line in translate_text('\n'.join(tips), lang, timeout).splitlines() if line.strip()]
+        if len(translated_tips) != len(tips):
+            translated_tips = [translate_text(tip, lang, timeout) for tip in tips]
+    return {
+        'source_hash': source_hash(entry),
+        'response': translate_text(entry['response'], lang, timeout),
+        'tips': translated_tips,
+    }
+
+
+def build(knowledge: Dict[str, Dict[str, Any]], languages: List[str], path: str = KB_TRANSLATIONS_PATH,
+          force: bool = False, timeout: Optional[float] = None) -> Dict[str, int]:
+    """
+    Translate every missing or stale entry (all of them with `force`)
+    The artifact is rewritten after each entry, so an interrupted build resumes where it stopped.
+    """
+    artifact = read_artifact(path)
+    status = coverage(knowledge, artifact, languages)
+    counts = {'translated': 0, 'kept': 0}
+    for lang in languages:
+        entries = artifact.setdefault('languages', {}).setdefault(lang, {})
+        todo = list(knowledge) if force else status[lang]['missing'] + status[lang]['stale']
+        counts['kept'] += len(knowledge) - len(todo)
+        for intent in todo:
+            entries[intent] = translate_entry(knowledge[intent], lang, timeout)
+            write_artifact(artifact, path)
+            counts['translated'] += 1
+            print(f"  [{lang}] {intent}")
+    return counts
+
+
+def import_reviewed(knowledge: Dict[str, Dict[str, Any]], reviewed: Dict[str, Dict[str, Dict[str, Any]]],
+                    path: str = KB_TRANSLATIONS_PATH) -> int:
+    """
+    Merge reviewed translations ({lang: {intent: {'response', 'tips'}}}) into the artifact
+    They are stamped with the current English source hash.
+    """
+    artifact = read_artifact(path)
+    imported = 0
+    for lang, entries in reviewed.items():
+        target = artifact.setdefault('languages', {}).setdefault(lang, {})
+        for intent, entry in entries.items():
+            if intent not in knowledge:
+                logger.warning(f"Skipping translation for unknown intent {intent!r}")
+                continue
+            tips = list(entry.get('tips', []))
+            if len(tips) != len(knowledge[intent].get('quick_tips', [])):
+                raise ValueError(f"{lang}/{intent}: expected {len(knowledge[intent].get('quick_tips', []))} tips, got {len(tips)}")
+            target[intent] = {'source_hash': source_hash(knowledge[intent]), 'response': entry['response'], 'tips': tips}
+            imported += 1
+    write_artifact(artifact, path)
+    return imported
+
+
+def main():
+    import argparse
+    from kb_store import load_source
+
+    BANKING_KNOWLEDGE = load_source()
+
+    parser = argparse.ArgumentParser(description="Build and maintain the pre-translated knowledge base artifact")
+    parser.add_argument('--artifact', default=KB_TRANSLATIONS_PATH, help='the .json.gz artifact')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='LLM-translate new or changed entries')
+    build_parser.add_argument('--lang', nargs='+', default=list(TRANSLATION_LANGUAGES), choices=list(TRANSLATION_LANGUAGES))
+    build_parser.add_argument('--force', action='store_true', help='retranslate every entry')
+    build_parser.add_argument('--timeout', type=float, default=60.0, help='seconds per LLM call')
+
+    export_parser = subparsers.add_parser('export', help='write translations as editable JSON')
+    export_parser.add_argument('output')
+
+    import_parser = subparsers.add_parser('import', help='merge reviewed translations from JSON')
+    import_parser.add_argument('input')
+
+    subparsers.add_parser('status', help='translated / stale / missing entries per language')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        import llm_client
+        if not llm_client.is_available('chat'):
+            parser.error("the LLM is not available (set OPENAI_API_KEY)")
+        counts = build(BANKING_KNOWLEDGE, args.lang, args.artifact, force=args.force, timeout=args.timeout)
+        print(f"Translated {counts['translated']} entries, kept {counts['kept']} up to date: {args.artifact}")
+    elif args.command == 'export':
+        languages = read_artifact(args.artifact).get('languages', {})
+        reviewed = {
+            lang: {intent: {'response': entry['response'], 'tips': entry.get('tips', [])} for intent, entry in entries.items()}
+            for lang, entries in languages.items()
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reviewed, f, ensure_ascii=False, indent=2)
+        print(f"Exported to: {args.output}")
+    elif args.command == 'import':
+        with open(args.input, encoding='utf-8') as f:
+            imported = import_reviewed(BANKING_KNOWLEDGE, json.load(f), args.artifact)
+        print(f"Imported {imported} translations into: {args.artifact}")
+
+    report = coverage(BANKING_KNOWLEDGE, read_artifact(args.artifact), list(TRANSLATION_LANGUAGES))
+    for lang, status in report.items():
+        print(f"{lang}: {len(status['translated'])}/{len(BANKING_KNOWLEDGE)} translated, "
+              f"{len(status['stale'])} stale, {len(status['missing'])} missing")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,27 +2,38 @@
 Multilingual Support Module for TalkToBank
 Supports English, Hindi, Marathi, and Hinglish
 """
+import os
 import re
+import json
 import logging
-from typing import Dict, Any, Optional
+import unicodedata
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional
+
+from entity_extractor import fold_text, tokenize
 
 logger = logging.getLogger(__name__)
 
-# Language detection patterns
-LANGUAGE_PATTERNS = {
-    'hindi': [
-        r'[अ-ह]',  # Devanagari script
-        r'\b(क्या|कैसे|कितना|बैलेंस|ट्रांसफर|लेनदेन|खाता)\b',
-    ],
-    'marathi': [
-        r'[अ-ह]',  # Devanagari script (shared with Hindi)
-        r'\b(काय|कसे|किती|शिल्लक|हस्तांतरण|व्यवहार|खाते)\b',
-    ],
-    'hinglish': [
-        r'\b(kyunki|kyun|kya|kaise|kitna|balance|transfer|transaction)\b',
-        r'\b(mere|tumhara|apka|hoga|hoga|kar|do|lo)\b',
-    ]
-}
+# Romanized Hindi -> English lexicon used by normalize_hinglish_to_english
+HINGLISH_LEXICON_PATH = os.getenv(
+    'HINGLISH_LEXICON_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'hinglish_lexicon.json')
+)
+# Hindi/Marathi -> English lexicon used by normalize_devanagari_to_english
+DEVANAGARI_LEXICON_PATH = os.getenv(
+    'DEVANAGARI_LEXICON_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'devanagari_lexicon.json')
+)
+_LATIN_WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+# Devanagari letters and signs, without the danda punctuation (U+0964/U+0965)
+_DEVANAGARI_WORD_RE = re.compile(r'[\u0900-\u0963\u0966-\u097F]+')
+_DANDA_RE = re.compile(r'\s*[\u0964\u0965]+')
+# Where a translated utterance splits into clauses for verb reordering; a comma or
+# point between digits is part of a number ("1,50,000", "1.5"), not a boundary
+_CLAUSE_BOUNDARY_RE = re.compile(r'(\s*(?:[;?!]|(?<!\d)[,.]|[,.](?!\d))\s*|\s+(?:and|then|or|but)\s+)')
+# Cheap test for a possible boundary; most utterances are a single clause
+_CLAUSE_HINT_RE = re.compile(r'[,;.?!]|\s(?:and|then|or|but)\s')
+_SPACES_RE = re.compile(r'\s{2,}')
 
 # Translation mappings for common banking terms
 BANKING_TRANSLATIONS = {
@@ -59,6 +70,10 @@ RESPONSE_TEMPLATES = {
         'transfer_success': "Successfully transferred ₹{amount:,.2f} to {recipient}.",
         'transactions': "Here are your last {count} transactions.",
         'no_transactions': "You have no recent transactions.",
+        'loan_details': "Your loan amount is ₹{amount:,.2f} with an interest rate of {interest_rate}% per annum. Due date: {due_date}.",
+        'no_loans': "You have no active loans.",
+        'reminder_set': "Reminder set: {message}",
+        'reminder_set_due': "Reminder set: {message} on {due_date}",
         'clarification': "I didn't understand. Could you please clarify?",
         'error': "Sorry, I encountered an error. Please try again.",
     },
@@ -67,6 +82,10 @@ RESPONSE_TEMPLATES = {
         'transfer_success': "₹{amount:,.2f} {recipient} को सफलतापूर्वक ट्रांसफर किया गया।",
         'transactions': "यहां आपके अंतिम {count} लेनदेन हैं।",
         'no_transactions': "आपके पास कोई हालिया लेनदेन नहीं है।",
+        'loan_details': "आपकी लोन राशि ₹{amount:,.2f} है, ब्याज दर {interest_rate}% प्रति वर्ष। देय तिथि: {due_date}।",
+        'no_loans': "आपका कोई सक्रिय लोन नहीं है।",
+        'reminder_set': "रिमाइंडर सेट किया गया: {message}",
+        'reminder_set_due': "रिमाइंडर सेट किया गया: {message}, {due_date}",
         'clarification': "मैं समझ नहीं पाया। कृपया स्पष्ट करें?",
         'error': "क्षमा करें, एक त्रुटि हुई। कृपया पुनः प्रयास करें।",
     },
@@ -75,49 +94,243 @@ RESPONSE_TEMPLATES = {
         'transfer_success': "₹{amount:,.2f} {recipient} ला यशस्वीरित्या हस्तांतरित केले.",
         'transactions': "येथे तुमचे शेवटचे {count} व्यवहार आहेत.",
         'no_transactions': "तुमच्याकडे कोणतेही अलीकडील व्यवहार नाहीत.",
+        'loan_details': "तुमची कर्ज रक्कम ₹{amount:,.2f} आहे, व्याज दर {interest_rate}% प्रति वर्ष. देय तारीख: {due_date}.",
+        'no_loans': "तुमचे कोणतेही सक्रिय कर्ज नाही.",
+        'reminder_set': "रिमाइंडर सेट केले: {message}",
+        'reminder_set_due': "रिमाइंडर सेट केले: {message}, {due_date}",
         'clarification': "मला समजले नाही. कृपया स्पष्ट करा?",
         'error': "क्षमा करा, एक त्रुटी आली. कृपया पुन्हा प्रयत्न करा.",
     }
 }
 
 
-def detect_language(text: str) -> str:
+# Devanagari -> Latin transliteration for words the lexicon doesn't know (mostly names)
+DEVANAGARI_CONSONANTS = {
+    'क': 'k', 'ख': 'kh', 'ग': 'g', 'घ': 'gh', 'ङ': 'n', 'च': 'ch', 'छ': 'chh', 'ज': 'j', 'झ': 'jh',
+    'ञ': 'n', 'ट': 't', 'ठ': 'th', 'ड': 'd', 'ढ': 'dh', 'ण': 'n', 'त': 't', 'थ': 'th', 'द': 'd',
+    'ध': 'dh', 'न': 'n', 'प': 'p', 'फ': 'ph', 'ब': 'b', 'भ': 'bh', 'म': 'm', 'य': 'y', 'र': 'r',
+    'ल': 'l', 'ळ': 'l', 'व': 'v', 'श': 'sh', 'ष': 'sh', 'स': 's', 'ह': 'h',
+}
+# Consonant + nukta (़) forms, for Perso-Arabic and English sounds
+DEVANAGARI_NUKTA_CONSONANTS = {'क': 'q', 'ख': 'kh', 'ग': 'g', 'ज': 'z', 'ड': 'r', 'ढ': 'rh', 'फ': 'f', 'य': 'y'}
+DEVANAGARI_VOWELS = {
+    'अ': 'a', 'आ': 'a', 'इ': 'i', 'ई': 'i', 'उ': 'u', 'ऊ': 'u', 'ऋ': 'ri',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au', 'ऍ': 'e', 'ऑ': 'o',
+}
+DEVANAGARI_VOWEL_SIGNS = {
+    'ा': 'a', 'ि': 'i', 'ी': 'i', 'ु': 'u', 'ू': 'u', 'ृ': 'ri',
+    'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au', 'ॅ': 'e', 'ॉ': 'o',
+}
+DEVANAGARI_MODIFIERS = {'ं': 'n', 'ँ': 'n', 'ः': 'h'}
+_VIRAMA = '\u094d'
+_NUKTA = '\u093c'
+
+# Script identification: Unicode blocks are 128-codepoint aligned, so
+# `ord(ch) >> 7` maps a character to its block in one shift. Supporting a
+# new script is one entry here plus its languages in SCRIPT_LANGUAGES.
+SCRIPT_BLOCKS = MappingProxyType({
+    0x0900 >> 7: 'devanagari',
+    0x0980 >> 7: 'bengali',
+    0x0A80 >> 7: 'gujarati',
+    0x0B80 >> 7: 'tamil',
+})
+# Candidate languages per script; the first is the default when no lexicon word decides
+SCRIPT_LANGUAGES = MappingProxyType({
+    'devanagari': ('hi', 'mr'),
+    'bengali': ('bn',),
+    'gujarati': ('gu',),
+    'tamil': ('ta',),
+})
+
+# Weighted language-ID lexicon: word -> (language, weight). Grammatical words
+# that only one language uses weigh 2, content words 1; words both Hindi and
+# Marathi use (पैसे, बँक) are left out.
+_HINDI_WORDS = {
+    'है': 2, 'हैं': 2, 'था': 2, 'थी': 2, 'का': 2, 'की': 2, 'के': 2, 'में': 2, 'को': 2, 'से': 2, 'मेरा': 2,
+    'मेरी': 2, 'मेरे': 2, 'मुझे': 2, 'आपका': 2, 'आपकी': 2, 'आपके': 2, 'क्या': 2, 'कैसे': 2, 'कितना': 2,
+    'कितनी': 2, 'कितने': 2, 'कहाँ': 2, 'कहां': 2, 'कब': 2, 'नहीं': 2, 'चाहिए': 2, 'करो': 2, 'करें': 2,
+    'करना': 2, 'करनी': 2, 'दिखाओ': 2, 'दिखाएं': 2, 'दिखाइए': 2, 'बताओ': 2, 'बताइए': 2, 'भेजो': 2, 'और': 2,
+    'लेनदेन': 1, 'बैलेंस': 1, 'ट्रांसफर': 1, 'खाता': 1, 'पिछले': 1, 'अंतिम': 1, 'बारे': 1, 'बहुत': 1,
+    'शुक्रिया': 1, 'मदद': 1, 'सकते': 1, 'लिए': 1, 'वाला': 1, 'गया': 1, 'दो': 1, 'लोन': 1, 'कोई': 1,
+}
+_MARATHI_WORDS = {
+    'आहे': 2, 'आहेत': 2, 'होते': 2, 'माझे': 2, 'माझा': 2, 'माझी': 2, 'माझ्या': 2, 'मला': 2, 'तुमचे': 2,
+    'तुमचा': 2, 'तुमची': 2, 'तुमच्या': 2, 'तुम्ही': 2, 'काय': 2, 'कसे': 2, 'कशी': 2, 'किती': 2, 'कुठे': 2,
+    'कधी': 2, 'नाही': 2, 'हवे': 2, 'हवा': 2, 'हवी': 2, 'करा': 2, 'करू': 2, 'दाखवा': 2, 'सांगा': 2,
+    'पाठवा': 2, 'द्या': 2, 'आणि': 2, 'मध्ये': 2, 'बद्दल': 2, 'करायचे': 2, 'करायचा': 2, 'करायची': 2,
+    'शिल्लक': 1, 'हस्तांतरण': 1, 'व्यवहार': 1, 'खाते': 1, 'खात्यात': 1, 'शेवटचे': 1, 'मागील': 1,
+    'कर्ज': 1, 'व्याज': 1, 'आभारी': 1, 'मदत': 1, 'शकता': 1, 'झाली': 1, 'लावा': 1, 'उद्या': 1,
+}
+LANGUAGE_LEXICON = MappingProxyType({
+    **{word: ('hi', float(weight)) for word, weight in _HINDI_WORDS.items()},
+    **{word: ('mr', float(weight)) for word, weight in _MARATHI_WORDS.items()},
+})
+HINGLISH_INDICATORS = frozenset(['kyunki', 'kyun', 'kya', 'kaise', 'kitna', 'mere', 'tumhara', 'apka', 'hoga', 'kar', 'do', 'lo'])
+
+
+def _build_script_table():
     """
-    Detect language from text
-    Returns: 'en', 'hi', 'mr', or 'hinglish'
+    str.translate table collapsing every codepoint below the last registered
+    block to a one-letter script tag (or deleting it), so counting scripts is
+    one C-level translate plus a str.count per script
     """
-    text_lower = text.lower()
+    tags = {'latin': 'a'}
+    tags.update({script: chr(ord('b') + i) for i, script in enumerate(sorted(set(SCRIPT_BLOCKS.values())))})
+    table = {}
+    for codepoint in range((max(SCRIPT_BLOCKS) + 1) << 7):
+        ch = chr(codepoint)
+        if codepoint < 128:
+            table[codepoint] = tags['latin'] if ch.isalpha() else None
+        else:
+            script = SCRIPT_BLOCKS.get(codepoint >> 7)
+            table[codepoint] = tags[script] if script is not None else None
+    return table, tags
+
+
+_SCRIPT_TABLE, _SCRIPT_TAGS = _build_script_table()
+
+
+def _block_class(blocks) -> str:
+    """Regex character class covering whole 128-codepoint blocks"""
+    return '[' + ''.join(f'\\u{block << 7:04x}-\\u{(block << 7) + 127:04x}' for block in blocks) + ']'
+
+
+# The first registered-script character names the script; characters counted
+# only when another registered script is present too, which is rare
+_SCRIPT_CHAR_RE = re.compile(_block_class(SCRIPT_BLOCKS))
+_OTHER_SCRIPT_RES = {
+    script: re.compile(_block_class(block for block, name in SCRIPT_BLOCKS.items() if name != script))
+    for script in set(SCRIPT_BLOCKS.values())
+}
+_LATIN_LETTER_RE = re.compile('[a-z]')
+
+
+def count_scripts(text: str) -> Dict[str, int]:
+    """
+    Characters per script in one pass over the codepoints
+    ASCII letters count as 'latin'; characters of unregistered scripts are ignored.
+    """
+    tagged = text.translate(_SCRIPT_TABLE)
+    if not tagged.isascii():
+        # Codepoints past the table (symbols, emoji) pass through untranslated
+        tagged = tagged.encode('ascii', 'ignore').decode('ascii')
+    return {script: tagged.count(tag) for script, tag in _SCRIPT_TAGS.items() if tag in tagged}
+
+
+class AnalyzedText:
+    """
+    One lowercase + tokenize + script pass over an utterance
     
-    # Check for Devanagari script (Hindi/Marathi)
-    if re.search(r'[अ-ह]', text):
-        # Try to distinguish Hindi vs Marathi (improved heuristic)
-        hindi_indicators = ['क्या', 'कैसे', 'कितना', 'बैलेंस', 'ट्रांसफर', 'लेनदेन', 'खाता', 'मेरा', 'आपका', 'दिखाएं', 'बताओ']
-        marathi_indicators = ['काय', 'कसे', 'किती', 'शिल्लक', 'हस्तांतरण', 'व्यवहार', 'खाते', 'माझे', 'तुमचे', 'दाखवा', 'सांगा', 'माझी', 'तुमची']
-        
-        hindi_count = sum(1 for word in hindi_indicators if word in text_lower)
-        marathi_count = sum(1 for word in marathi_indicators if word in text_lower)
-        
-        # If Marathi indicators found, prioritize Marathi
-        if marathi_count > 0:
-            if marathi_count >= hindi_count:
-                return 'mr'
-        # If only Hindi indicators found, return Hindi
-        if hindi_count > 0:
-            return 'hi'
-        # Default to Hindi if Devanagari but no clear indicators (most common)
-        return 'hi'
-    
-    # Check for Hinglish patterns
-    hinglish_patterns = [
-        r'\b(kyunki|kyun|kya|kaise|kitna)\b',
-        r'\b(mere|tumhara|apka|hoga|kar|do|lo)\b',
-    ]
-    for pattern in hinglish_patterns:
-        if re.search(pattern, text_lower):
-            return 'hinglish'
+    Built once per request and handed to detect_language,
+    normalize_hinglish_to_english and nlp_module.detect_intent (down to
+    entity extraction), which would otherwise each lowercase and re-scan
+    the raw string. `tokens` come from the entity extractor's tokenizer so
+    one token list serves every stage. Language scores and the cache-key
+    form are computed on first use.
+    
+    `folded` marks text that is already in fold_text() form - the output of
+    the Hinglish and Devanagari translators, built from a folded utterance -
+    so the translated text is not lowercased and scanned a second time.
+    """
+    
+    __slots__ = ('text', 'lower', 'tokens', 'script', '_script_counts', '_language_scores', '_language', '_utterance')
     
-    # Default to English
-    return 'en'
+    def __init__(self, text: str, folded: bool = False):
+        self.text = text
+        # Lowercased, stripped, Devanagari digits folded to ASCII
+        self.lower = text if folded else fold_text(text)
+        # Numbers, Latin words and Devanagari runs
+        self.tokens = tokenize(self.lower)
+        self._script_counts = None
+        if self.lower.isascii():
+            # No other script possible; skip the per-script count
+            self.script = 'latin' if any(map(str.isalpha, self.tokens)) else 'none'
+        else:
+            # Any Indic letters decide the script (Latin words in them are usually loanwords)
+            first = _SCRIPT_CHAR_RE.search(self.lower)
+            if first is None:
+                self.script = 'latin' if _LATIN_LETTER_RE.search(self.lower) else 'none'
+            else:
+                self.script = SCRIPT_BLOCKS[ord(first.group()) >> 7]
+                if _OTHER_SCRIPT_RES[self.script].search(self.lower):
+                    # Mixed scripts: the one with most characters
+                    indic = [(count, script) for script, count in self.script_counts.items() if script != 'latin']
+                    self.script = max(indic)[1]
+        self._language_scores = None
+        self._language = None
+        self._utterance = None
+    
+    @property
+    def script_counts(self) -> Dict[str, int]:
+        """Characters per script (see count_scripts)"""
+        if self._script_counts is None:
+            self._script_counts = count_scripts(self.lower)
+        return self._script_counts
+    
+    @property
+    def language_scores(self) -> Dict[str, float]:
+        """Weighted LANGUAGE_LEXICON hits per language, plus Hinglish indicator hits"""
+        if self._language_scores is None:
+            scores: Dict[str, float] = {}
+            lookup = LANGUAGE_LEXICON.get
+            for token in self.tokens:
+                entry = lookup(token)
+                if entry is not None:
+                    scores[entry[0]] = scores.get(entry[0], 0.0) + entry[1]
+            scores['hinglish'] = float(len(HINGLISH_INDICATORS.intersection(self.tokens)))
+            self._language_scores = scores
+        return self._language_scores
+    
+    @property
+    def language(self) -> str:
+        """
+        Language code from the script and lexicon scores
+        'en', 'hinglish', 'hi' or 'mr' (or the language of another registered script)
+        """
+        if self._language is None:
+            if self.script in SCRIPT_LANGUAGES:
+                candidates = SCRIPT_LANGUAGES[self.script]
+                if len(candidates) == 1:
+                    self._language = candidates[0]
+                else:
+                    scores = self.language_scores
+                    # No lexicon evidence: the script's default (Hindi for Devanagari). A tie goes
+                    # to the later candidate (Marathi), as the substring detector did: Marathi
+                    # shares most Hindi indicators but has few of its own
+                    best, best_score = candidates[0], 0.0
+                    for lang in candidates:
+                        score = scores.get(lang, 0.0)
+                        if score > 0 and score >= best_score:
+                            best, best_score = lang, score
+                    self._language = best
+            elif HINGLISH_INDICATORS.isdisjoint(self.tokens):
+                self._language = 'en'
+            else:
+                self._language = 'hinglish'
+        return self._language
+    
+    @property
+    def utterance(self) -> str:
+        """Lowercased, whitespace-collapsed, without trailing punctuation (the intent cache key)"""
+        if self._utterance is None:
+            self._utterance = ' '.join(self.lower.split()).rstrip('?.!,;: ')
+        return self._utterance
+    
+    def __str__(self) -> str:
+        return self.text
+
+
+def analyze_text(text) -> AnalyzedText:
+    """Return text as an AnalyzedText, analyzing it only if it isn't one already"""
+    return text if isinstance(text, AnalyzedText) else AnalyzedText(text)
+
+
+def detect_language(text) -> str:
+    """
+    Detect language from text (a string or an AnalyzedText)
+    Returns: 'en', 'hi', 'mr', or 'hinglish'
+    """
+    return analyze_text(text).language
 
 
 def translate_banking_term(term: str, target_lang: str) -> str:
@@ -139,34 +352,262 @@ def get_response_template(key: str, lang: str = 'en') -> str:
     return RESPONSE_TEMPLATES['en'].get(key, '')
 
 
-def normalize_hinglish_to_english(text: str) -> str:
-    """
-    Convert Hinglish text to English for processing
-    """
-    # Common Hinglish to English mappings
-    mappings = {
-        'kyunki': 'because',
-        'kyun': 'why',
-        'kya': 'what',
-        'kaise': 'how',
-        'kitna': 'how much',
-        'mere': 'my',
-        'tumhara': 'your',
-        'apka': 'your',
-        'hoga': 'will be',
-        'kar': 'do',
-        'do': 'give',
-        'lo': 'take',
-        'balance': 'balance',
-        'transfer': 'transfer',
-        'transaction': 'transaction',
-    }
+def transliterate_devanagari(word: str) -> str:
+    """
+    Romanize one Devanagari word ("रोहन" -> "rohan", "प्रिया" -> "priya")
+    Consonants carry an inherent 'a' unless a vowel sign or virama follows;
+    the word-final one is dropped after a single consonant (schwa deletion).
+    """
+    out = []
+    inherent = False
+    conjunct = False
+    previous = None
+    for ch in word:
+        if ch in DEVANAGARI_CONSONANTS:
+            if inherent:
+                out.append('a')
+            conjunct = previous == _VIRAMA
+            out.append(DEVANAGARI_CONSONANTS[ch])
+            inherent = True
+        elif ch == _NUKTA:
+            if previous in DEVANAGARI_NUKTA_CONSONANTS and out:
+                out[-1] = DEVANAGARI_NUKTA_CONSONANTS[previous]
+            continue
+        elif ch in DEVANAGARI_VOWEL_SIGNS:
+            out.append(DEVANAGARI_VOWEL_SIGNS[ch])
+            inherent = False
+        elif ch == _VIRAMA:
+            inherent = False
+        else:
+            if inherent:
+                out.append('a')
+                inherent = False
+            out.append(DEVANAGARI_MODIFIERS.get(ch) or DEVANAGARI_VOWELS.get(ch, ''))
+        previous = ch
+    if inherent and (len(out) == 1 or conjunct):
+        # "न" -> "na", "नरेंद्र" -> "narendra"
+        out.append('a')
+    return ''.join(out)
+
+
+class TranslationLexicon:
+    """
+    Word/phrase -> English lexicon applied token by token
+    
+    Single-word entries are one dict lookup per token; multi-word entries
+    ("kar do", "yaad dilana") are only tried at words that start one, longest
+    first. Cost per token is bounded by the longest phrase, not the lexicon size.
+    Words are matched by `word_re`; subclasses can rewrite words the lexicon
+    doesn't know via translate_unknown().
+    
+    `ambiguous` entries are also everyday English words ("do", "me", "main");
+    they are only translated when at least MIN_CONTEXT unambiguous entries in
+    the same text show it really is Hinglish, so "remind me to do the bill
+    payment" passes through untouched.
+    """
+    
+    word_re = _LATIN_WORD_RE
+    MIN_CONTEXT = 2
+    
+    def __init__(self, entries: Dict[str, str], ambiguous: Optional[List[str]] = None):
+        self.entries = {key.lower(): value for key, value in entries.items()}
+        self.ambiguous = frozenset(word.lower() for word in (ambiguous or ()))
+        # First word of each multi-word entry -> longest phrase starting with it
+        self.phrase_starts: Dict[str, int] = {}
+        for key in self.entries:
+            words = key.split()
+            if len(words) > 1:
+                self.phrase_starts[words[0]] = max(self.phrase_starts.get(words[0], 0), len(words))
+    
+    @classmethod
+    def load(cls, path: str) -> 'TranslationLexicon':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['entries'], data.get('ambiguous'))
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def translate_unknown(self, token: str) -> Optional[str]:
+        """Replacement for a word with no entry, or None to keep it as is"""
+        return None
+    
+    def translate(self, text: str, lowered: bool = False) -> str:
+        """Lowercase text (unless `lowered`) and replace known words/phrases; everything else passes through"""
+        if not lowered:
+            text = text.lower()
+        words = list(self.word_re.finditer(text))
+        if not words:
+            return text
+        
+        entries = self.entries
+        phrase_starts = self.phrase_starts
+        # (start, end, replacement, ambiguous) of every rewrite, applied after the walk
+        spans = []
+        i = 0
+        count = len(words)
+        while i < count:
+            word = words[i]
+            token = word.group(0)
+            replacement = None
+            span_end = i
+            longest = phrase_starts.get(token)
+            if longest:
+                # Longest phrase first; phrase words must be separated by whitespace only
+                for length in range(min(longest, count - i), 1, -1):
+                    last = i + length - 1
+                    if any(text[words[j].end():words[j + 1].start()].strip() for j in range(i, last)):
+                        continue
+                    phrase = ' '.join(words[j].group(0) for j in range(i, last + 1))
+                    if phrase in entries:
+                        replacement, span_end = entries[phrase], last
+                        break
+            if replacement is None:
+                replacement = entries.get(token)
+                if replacement is None:
+                    replacement = self.translate_unknown(token)
+                    if replacement is None:
+                        i += 1
+                        continue
+            
+            spans.append((word.start(), words[span_end].end(), replacement,
+                          span_end == i and token in self.ambiguous))
+            i = span_end + 1
+        
+        if self.ambiguous and sum(1 for span in spans if not span[3]) < self.MIN_CONTEXT:
+            spans = [span for span in spans if not span[3]]
+        pieces = []
+        position = 0
+        for start, end, replacement, _ in spans:
+            pieces.append(text[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(text[position:])
+        # Dropped tokens leave double spaces behind
+        return _SPACES_RE.sub(' ', ''.join(pieces)).strip()
+
+
+class DevanagariLexicon(TranslationLexicon):
+    """
+    Hindi/Marathi -> English lexical translation onto the intent vocabulary
+    
+    Known words and phrases are replaced, Marathi case endings are split off
+    words that aren't entries ("रोहनला" -> "rohan ko", "एफडीवर" -> "fd on"),
+    and anything left is transliterated. Hindi and Marathi put the verb last,
+    so a clause-final verb is moved to the front ("my last transactions show"
+    -> "show my last transactions") to fit the English patterns.
+    """
+    
+    word_re = _DEVANAGARI_WORD_RE
+    # Leading words that stay ahead of a fronted verb ("i need ...")
+    SUBJECTS = frozenset(['i', 'we', 'you'])
+    
+    def __init__(self, entries: Dict[str, str], suffixes: Optional[Dict[str, str]] = None,
+                 verbs: Optional[List[str]] = None):
+        # NFC so decomposed and precomposed nukta letters (ज़ / ज़) compare equal
+        super().__init__({unicodedata.normalize('NFC', key): value for key, value in entries.items()})
+        # Longest ending first so "च्या" wins over "चा"
+        self.suffixes = sorted((suffixes or {}).items(), key=lambda item: -len(item[0]))
+        self.verbs = frozenset(verbs or [])
+        self.longest_verb = max((len(verb.split()) for verb in self.verbs), default=0)
+    
+    @classmethod
+    def load(cls, path: str) -> 'DevanagariLexicon':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['entries'], data.get('suffixes'), data.get('verbs'))
     
-    text_lower = text.lower()
-    for hinglish, english in mappings.items():
-        text_lower = text_lower.replace(hinglish, english)
+    def translate_unknown(self, token: str) -> Optional[str]:
+        for suffix, meaning in self.suffixes:
+            if token.endswith(suffix) and len(token) > len(suffix) + 1:
+                stem = token[:-len(suffix)]
+                translated = self.entries.get(stem)
+                if translated is None:
+                    translated = transliterate_devanagari(stem)
+                return f"{translated} {meaning}" if meaning else translated
+        return transliterate_devanagari(token)
     
-    return text_lower
+    def _front_verb(self, clause: str) -> str:
+        """Move a clause-final verb in front of everything but a leading subject"""
+        words = clause.split()
+        for length in range(min(self.longest_verb, len(words) - 1), 0, -1):
+            verb = words[-length:]
+            if ' '.join(verb) in self.verbs:
+                rest = words[:-length]
+                lead = 0
+                while lead < len(rest) - 1 and rest[lead] in self.SUBJECTS:
+                    lead += 1
+                return ' '.join(rest[:lead] + verb + rest[lead:])
+        return clause
+    
+    def translate(self, text: str, lowered: bool = False) -> str:
+        """Translate to English word order; Latin words and numbers pass through"""
+        text = unicodedata.normalize('NFC', text if lowered else text.lower())
+        if '\u0964' in text or '\u0965' in text:
+            text = _DANDA_RE.sub('.', text)
+        translated = super().translate(text, lowered=True)
+        if not self.verbs:
+            return translated
+        if not _CLAUSE_HINT_RE.search(translated):
+            return self._front_verb(translated)
+        parts = _CLAUSE_BOUNDARY_RE.split(translated)
+        # Even indexes are clauses, odd ones the separators between them
+        parts[::2] = [self._front_verb(clause) for clause in parts[::2]]
+        return ''.join(parts)
+
+
+_hinglish_lexicon: Optional[TranslationLexicon] = None
+_devanagari_lexicon: Optional[DevanagariLexicon] = None
+
+
+def get_hinglish_lexicon() -> TranslationLexicon:
+    """Load the lexicon on first use (HINGLISH_LEXICON_PATH)"""
+    global _hinglish_lexicon
+    if _hinglish_lexicon is None:
+        try:
+            _hinglish_lexicon = TranslationLexicon.load(HINGLISH_LEXICON_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Hinglish lexicon unavailable ({str(e)}); normalization disabled")
+            _hinglish_lexicon = TranslationLexicon({})
+    return _hinglish_lexicon
+
+
+def get_devanagari_lexicon() -> DevanagariLexicon:
+    """Load the lexicon on first use (DEVANAGARI_LEXICON_PATH)"""
+    global _devanagari_lexicon
+    if _devanagari_lexicon is None:
+        try:
+            _devanagari_lexicon = DevanagariLexicon.load(DEVANAGARI_LEXICON_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Devanagari lexicon unavailable ({str(e)}); falling back to transliteration only")
+            _devanagari_lexicon = DevanagariLexicon({})
+    return _devanagari_lexicon
+
+
+def normalize_hinglish_to_english(text) -> str:
+    """
+    Convert Hinglish text (a string or an AnalyzedText) to English for processing
+    One tokenizing pass with a dict lookup per word (whole words only, so
+    "do" inside "download" is left alone).
+    """
+    if isinstance(text, AnalyzedText):
+        if text.script != 'latin':
+            return text.lower
+        return get_hinglish_lexicon().translate(text.lower, lowered=True)
+    return get_hinglish_lexicon().translate(text)
+
+
+def normalize_devanagari_to_english(text) -> str:
+    """
+    Translate Hindi/Marathi text (a string or an AnalyzedText) onto the
+    English intent vocabulary, so one English pattern set and classifier
+    serve every language
+    """
+    if isinstance(text, AnalyzedText):
+        if text.script != 'devanagari':
+            return text.lower
+        return get_devanagari_lexicon().translate(text.lower, lowered=True)
+    return get_devanagari_lexicon().translate(fold_text(text), lowered=True)
 
 
 if __name__ == '__main__':
@@ -183,5 +624,7 @@ if __name__ == '__main__':
         lang = detect_language(text)
         print(f"Text: {text}")
         print(f"Detected Language: {lang}")
+        if lang in ('hi', 'mr'):
+            print(f"English: {normalize_devanagari_to_english(text)}")
         print()
 
@@ -0,0 +1,299 @@
+"""
+Shared OpenAI Client Layer
+Every OpenAI call in the backend goes through here so it gets:
+- a per-call deadline (the caller's thread is released when it expires)
+- bounded retries with exponential backoff and full jitter
+- a circuit breaker per service that trips to the local fallbacks when
+  error rates or latencies spike
+- metrics for calls, retries, timeouts and every breaker state transition
+"""
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Try to import OpenAI, but make it optional
+try:
+    import openai
+    OPENAI_AVAILABLE = True
+    openai.api_key = os.getenv('OPENAI_API_KEY', '')
+except ImportError:
+    OPENAI_AVAILABLE = False
+    logger.warning("OpenAI not available. LLM features disabled.")
+
+# Configuration
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '8'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '2'))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv('LLM_BACKOFF_BASE_SECONDS', '0.2'))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+BREAKER_WINDOW = int(os.getenv('LLM_BREAKER_WINDOW', '20'))
+BREAKER_MIN_CALLS = int(os.getenv('LLM_BREAKER_MIN_CALLS', '5'))
+BREAKER_FAILURE_RATE = float(os.getenv('LLM_BREAKER_FAILURE_RATE', '0.5'))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv('LLM_BREAKER_SLOW_CALL_SECONDS', '4'))
+BREAKER_SLOW_CALL_RATE = float(os.getenv('LLM_BREAKER_SLOW_CALL_RATE', '0.5'))
+BREAKER_OPEN_SECONDS = float(os.getenv('LLM_BREAKER_OPEN_SECONDS', '30'))
+# Whisper uploads whole recordings, so transcription gets its own budget, slow-call threshold and threads
+TRANSCRIBE_TIMEOUT_SECONDS = float(os.getenv('TRANSCRIBE_TIMEOUT_SECONDS', '30'))
+TRANSCRIBE_BREAKER_SLOW_CALL_SECONDS = float(os.getenv('TRANSCRIBE_BREAKER_SLOW_CALL_SECONDS', '15'))
+TRANSCRIBE_MAX_CONCURRENCY = int(os.getenv('TRANSCRIBE_MAX_CONCURRENCY', '4'))
+
+# OpenAI SDK errors worth retrying (matched by name so the SDK stays optional)
+RETRYABLE_ERRORS = {'Timeout', 'APIConnectionError', 'RateLimitError', 'ServiceUnavailableError', 'APIError', 'TryAgain'}
+
+# Calls run here so a hung upstream can only ever hold these threads, never the Flask workers;
+# one pool per service, so slow uploads can't queue chat calls behind them (or the reverse)
+_executors = {
+    'chat': ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix='llm-chat'),
+    'transcribe': ThreadPoolExecutor(max_workers=TRANSCRIBE_MAX_CONCURRENCY, thread_name_prefix='llm-transcribe'),
+}
+# Budget per call when the caller gives none
+_default_timeouts = {
+    'chat': LLM_TIMEOUT_SECONDS,
+    'transcribe': TRANSCRIBE_TIMEOUT_SECONDS,
+}
+
+
+class LLMUnavailableError(Exception):
+    """Raised when no LLM call was attempted: SDK missing, no API key, or circuit open"""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open -> half-open circuit breaker over a rolling window of calls
+
+    The breaker opens when, over the last `window` calls (and at least
+    `min_calls`), the failure rate or the slow-call rate reaches its
+    threshold. After `open_seconds` a single probe call is let through
+    (half-open): success closes the breaker, failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, window: int = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate: float = BREAKER_FAILURE_RATE, slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+                 slow_call_rate: float = BREAKER_SLOW_CALL_RATE, open_seconds: float = BREAKER_OPEN_SECONDS):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)  # (failed, slow) per call
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _transition(self, new_state: str):
+        """Change state; caller holds the lock"""
+        if new_state == self.state:
+            return
+        logger.warning(f"LLM circuit '{self.name}': {self.state} -> {new_state}")
+        metrics.increment(f'llm.{self.name}.breaker.{self.state}_to_{new_state}')
+        self.state = new_state
+        if new_state == self.OPEN:
+            self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._probe_in_flight = False
+
+    def is_open(self) -> bool:
+        """True while the breaker is rejecting calls (open and still cooling down)"""
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self._opened_at < self.open_seconds
+
+    def allow_request(self) -> bool:
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    return False
+                self._transition(self.HALF_OPEN)
+            # Half-open: allow exactly one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def release(self):
+        """A call allow_request() let through never reached the service: free the half-open probe slot"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record(self, failed: bool, latency: float):
+        """Record the outcome of a call that allow_request() let through"""
+        with self._lock:
+            slow = latency >= self.slow_call_seconds
+            if self.state == self.HALF_OPEN:
+                self._transition(self.OPEN if failed or slow else self.CLOSED)
+                return
+            if self.state != self.CLOSED:
+                return
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, s in self._outcomes if s)
+            if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+                self._transition(self.OPEN)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'window_calls': len(self._outcomes),
+                'window_failures': sum(1 for f, _ in self._outcomes if f),
+                'window_slow_calls': sum(1 for _, s in self._outcomes if s),
+            }
+
+
+_breakers = {
+    'chat': CircuitBreaker('chat'),
+    'transcribe': CircuitBreaker('transcribe', slow_call_seconds=TRANSCRIBE_BREAKER_SLOW_CALL_SECONDS),
+}
+
+
+def is_available(service: str = 'chat') -> bool:
+    """
+    True if the SDK and API key are present and the service's circuit isn't open
+    Callers use this to go straight to their local fallback.
+    """
+    if not (OPENAI_AVAILABLE and openai.api_key):
+        return False
+    return not _breakers[service].is_open()
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (FutureTimeoutError, TimeoutError)):
+        return True
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+def call_with_resilience(service: str, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    Run fn(*args, **kwargs) against the named service with deadline, retries and breaker
+
+    `timeout` is the total budget in seconds across all attempts and backoff
+    sleeps (default: the service's own). Time spent waiting for a free
+    thread counts against the budget but not against the breaker: latency is
+    measured from when the call starts, and a call that never left the queue
+    is dropped without being recorded. Raises LLMUnavailableError if the circuit rejects the call, or
+    the last error once retries or time run out.
+    """
+    if not (OPENAI_AVAILABLE and openai.api_key):
+        raise LLMUnavailableError("OpenAI API not available or API key not set")
+    breaker = _breakers[service]
+    executor = _executors[service]
+    deadline = time.monotonic() + (timeout if timeout is not None else _default_timeouts[service])
+    attempt = 0
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            # Spent budget: no request goes out, and the service did nothing wrong, so the breaker is untouched
+            metrics.increment(f'llm.{service}.budget_exhausted')
+            raise TimeoutError(f"LLM call '{service}' has no time left in its budget")
+        if not breaker.allow_request():
+            metrics.increment(f'llm.{service}.rejected')
+            raise LLMUnavailableError(f"LLM circuit '{service}' is open")
+
+        started = []
+
+        def _timed():
+            started.append(time.monotonic())
+            return fn(*args, **kwargs)
+
+        metrics.increment(f'llm.{service}.calls')
+        submitted = time.monotonic()
+        future = executor.submit(_timed)
+        try:
+            result = future.result(timeout=remaining)
+        except Exception as e:
+            if isinstance(e, FutureTimeoutError) and future.cancel():
+                # Every thread was busy until the deadline: nothing was sent, so the breaker is untouched
+                breaker.release()
+                metrics.increment(f'llm.{service}.queue_timeouts')
+                raise TimeoutError(f"LLM call '{service}' waited its whole budget for a free thread")
+            latency = time.monotonic() - (started[0] if started else submitted)
+            breaker.record(failed=True, latency=latency)
+            if isinstance(e, FutureTimeoutError):
+                metrics.increment(f'llm.{service}.timeouts')
+                e = TimeoutError(f"LLM call '{service}' exceeded its deadline")
+            else:
+                metrics.increment(f'llm.{service}.failures')
+
+            attempt += 1
+            if attempt > LLM_MAX_RETRIES or not _is_retryable(e):
+                raise e
+            # Exponential backoff with full jitter, never sleeping past the deadline
+            backoff = random.uniform(0, LLM_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+            if time.monotonic() + backoff >= deadline:
+                raise e
+            metrics.increment(f'llm.{service}.retries')
+            logger.warning(f"LLM call '{service}' failed ({str(e)}), retry {attempt}/{LLM_MAX_RETRIES}")
+            time.sleep(backoff)
+            continue
+
+        breaker.record(failed=False, latency=time.monotonic() - started[0])
+        metrics.increment(f'llm.{service}.successes')
+        return result
+
+
+def chat_completion(messages: List[Dict[str, str]], model: str = "gpt-3.5-turbo",
+                    timeout: Optional[float] = None, **kwargs) -> str:
+    """
+    ChatCompletion through the resilience layer
+    Returns the stripped content of the first choice.
+    """
+    def _create():
+        # request_timeout lets the SDK give up too, so abandoned attempts free their thread
+        response = openai.ChatCompletion.create(
+            model=model,
+            messages=messages,
+            request_timeout=timeout if timeout is not None else LLM_TIMEOUT_SECONDS,
+            **kwargs
+        )
+        return response.choices[0].message.content.strip()
+
+    return call_with_resilience('chat', _create, timeout=timeout)
+
+
+def transcribe_audio(audio_path: str, language: Optional[str] = None, timeout: Optional[float] = None) -> str:
+    """
+    Whisper transcription through the resilience layer
+    The file is re-opened on every attempt so retries upload the full audio.
+    """
+    def _transcribe():
+        with open(audio_path, 'rb') as audio_file:
+            params = {
+                "model": "whisper-1",
+                "file": audio_file
+            }
+            # Add language if specified (Whisper supports: en, hi, mr, etc.)
+            if language:
+                params["language"] = language
+            transcript = openai.Audio.transcribe(**params)
+        return transcript.get('text', '')
+
+    return call_with_resilience('transcribe', _transcribe, timeout=timeout)
+
+
+def get_llm_stats() -> Dict[str, Any]:
+    """Circuit breaker state per service"""
+    return {service: breaker.stats() for service, breaker in _breakers.items()}
+
+
+metrics.register_provider('llm_breakers', get_llm_stats)
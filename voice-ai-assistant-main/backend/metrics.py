@@ -0,0 +1,50 @@
+"""
+Lightweight in-process metrics registry
+Modules bump named counters or register a stats provider; /api/metrics reports a snapshot
+"""
+import threading
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_counters: Dict[str, int] = defaultdict(int)
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+_lock = threading.Lock()
+
+
+def increment(name: str, amount: int = 1):
+    """Increase a named counter"""
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name: str) -> int:
+    """Current value of a named counter (0 if never incremented)"""
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def register_provider(name: str, provider: Callable[[], Dict[str, Any]]):
+    """Register a callable whose dict result is included in every snapshot under `name`"""
+    _providers[name] = provider
+
+
+def snapshot() -> Dict[str, Any]:
+    """Collect counters and provider stats into one JSON-serializable dict"""
+    with _lock:
+        result: Dict[str, Any] = {'counters': dict(_counters)}
+    for name, provider in list(_providers.items()):
+        try:
+            result[name] = provider()
+        except Exception as e:
+            logger.warning(f"Metrics provider {name} failed: {str(e)}")
+            result[name] = {'error': str(e)}
+    return result
+
+
+def reset():
+    """Zero all counters (providers are left registered)"""
+    with _lock:
+        _counters.clear()
@@ -1,324 +1,376 @@
 import re
 import os
-from typing import Dict, Any
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Hashable, List, Optional
 import logging
 
+import metrics
+import llm_client
+from ttl_cache import TTLCache
+from intent_classifier import get_default_classifier
+from language_support import AnalyzedText, detect_language
+from entity_extractor import extract_entities as _extract_entities
+
 logger = logging.getLogger(__name__)
 
-# Try to import OpenAI, but make it optional
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-    openai.api_key = os.getenv('OPENAI_API_KEY', '')
-except ImportError:
-    OPENAI_AVAILABLE = False
-    logger.warning("OpenAI not available. Using pattern-based NLP only.")
 
+# Intent cache: most traffic is a handful of phrasings, so repeat lookups skip
+# pattern matching and, more importantly, the LLM round trip
+INTENT_CACHE_SIZE = int(os.getenv('INTENT_CACHE_SIZE', '2048'))
+INTENT_CACHE_TTL = float(os.getenv('INTENT_CACHE_TTL', '900'))
+_intent_cache = TTLCache(maxsize=INTENT_CACHE_SIZE, ttl=INTENT_CACHE_TTL)
 
-def detect_intent_with_patterns(text: str) -> Dict[str, Any]:
-    """
-    Pattern-based intent detection (fallback method)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Offline classifier (models/intent_classifier.npz), loaded once at startup
+_classifier = get_default_classifier()
+
+# Local (patterns + classifier) results below this confidence escalate to the LLM
+INTENT_ESCALATION_THRESHOLD = float(os.getenv('INTENT_ESCALATION_THRESHOLD', '0.65'))
+# Confidence of a pattern hit when exactly one intent matches; split across
+# intents when several match
+PATTERN_MATCH_CONFIDENCE = 0.9
+
+# Overall time budget for detect_intent; a slower LLM answer is abandoned and
+# the local result returned instead
+INTENT_DEADLINE_MS = float(os.getenv('INTENT_DEADLINE_MS', '1500'))
+# When to start the LLM call before local detection has finished:
+#   'off'       - only after local detection decides to escalate
+#   'unmatched' - speculatively, for utterances no pattern matches
+#   'always'    - speculatively, for every uncached utterance
+# Speculation trades LLM calls for latency: a call started for an utterance the classifier
+# then resolves confidently is still paid for (speculative_* under intent_escalation)
+INTENT_SPECULATION = os.getenv('INTENT_SPECULATION', 'off')
+INTENT_LLM_WORKERS = int(os.getenv('INTENT_LLM_WORKERS', '4'))
+# LLM calls running or queued at once; beyond this an utterance keeps its local result
+INTENT_LLM_MAX_INFLIGHT = int(os.getenv('INTENT_LLM_MAX_INFLIGHT', str(INTENT_LLM_WORKERS * 2)))
+_llm_executor = ThreadPoolExecutor(max_workers=INTENT_LLM_WORKERS, thread_name_prefix='intent-llm')
+_llm_slots = threading.BoundedSemaphore(INTENT_LLM_MAX_INFLIGHT)
+
+
+# Clause boundaries for compound requests: list punctuation and conjunctions
+# (English, Hinglish, Hindi, Marathi); split_clauses keeps a piece only if it has an intent
+_CLAUSE_SPLIT_RE = re.compile(
+    r'\s*[,;]\s*|\s+(?:and\s+then|and\s+also|and|then|also|plus|aur|ani|fir|phir|और|तथा|फिर|आणि|मग)\s+',
+    re.IGNORECASE
+)
+MAX_CLAUSES = int(os.getenv('MAX_CLAUSES', '4'))
+# Pieces matching none of these - or only small talk - never form a clause of their own
+_NON_CLAUSE_INTENTS = frozenset(['unknown', 'greeting', 'thank_you'])
+
+
+# Intent patterns - Comprehensive banking/financial knowledge base
+# Dict order is the matching priority: the first intent with a matching pattern wins
+INTENT_PATTERNS = {
+    'greeting': [
+        r'^(hi|hello|hey|greetings|good\s+(morning|afternoon|evening))\b',
+        r'\b(hi|hello|hey)\s+(there|assistant|bot)\b',
+    ],
+    'help': [
+        r'^(help|what\s+can\s+you\s+do|how\s+can\s+you\s+help)\b',
+        r'\b(show|tell)\s+(me\s+)?(features|capabilities|options)\b',
+        r'\bwhat\s+(are|is)\s+(your|the)\s+(features|services)\b',
+        r'^(i\s+)?need\s+(some\s+)?help$',
+    ],
+    'thank_you': [
+        r'\b(thank|thanks|thankyou|thx)\b',
+        r'\bappreciate\s+it\b',
+        r'\bthat\s+helps?\b',
+    ],
+    'check_balance': [
+        r'\b(check|show|what|what\'s|whats|tell me)\b.*(balance|amount)',
+        r'\bbalance\b',
+        r'how much.*\b(have|got|do i have)\b',
+        r'\bmy\s+(account|bank)\s+balance\b',
+        r'\bcurrent\s+balance\b',
+    ],
+    'transfer_funds': [
+        r'\b(transfer|send|pay|give)\b.*\b(money|rupees|₹|\d+)\b',
+        r'\bsend\s+₹?\d+',
+        r'\btransfer.*to\b',
+        r'\bmake\s+a\s+payment\b',
+        r'\bpay\s+someone\b',
+    ],
+    'transaction_history': [
+        r'\b(show|display|get|view|check|see)\b.*(?:my\s+)?(?:last|recent)?\s*(?:transaction|history|statement|payment)',
+        r'\b(show|display|get|view|check|see)\s+(?:me\s+)?(?:my\s+)?(?:last|recent)\s+\d+\s+(?:transaction|payment)',
+        r'\blast\s+(?:my\s+)?\d+\s+(?:transaction|payment)',
+        r'\brecent\s+(?:transaction|payment)',
+        r'\bmy\s+(bank\s+)?statement\b',
+        r'\btransaction\s+(?:history|details|list)\b',
+        r'\bcheck\s+(?:my\s+)?(?:last|recent)\s+\d+\s+transaction',
+    ],
+    'loan_details': [
+        r'\b(loan|emi|debt)\b',
+        r'\binterest\s+rate\b',
+        r'\bdue\s+date\b',
+        r'\bhome\s+loan\b',
+        r'\bpersonal\s+loan\b',
+        r'\bloan\s+balance\b',
+    ],
+    'set_reminder': [
+        r'\b(remind|reminder|alert)\b',
+        r'\bremind\s+me\b',
+        r'\bset\s+reminder\b',
+    ],
+    # Credit Card related
+    'credit_card_info': [
+        r'\bcredit\s+card\b',
+        r'\bcard\s+(limit|balance|statement)\b',
+        r'\boutstanding\s+(amount|balance)\b',
+        r'\bcard\s+payment\s+due\b',
+        r'\bminimum\s+payment\b',
+    ],
+    # Fixed Deposit / Investment
+    'investment_info': [
+        r'\bfixed\s+deposit\b',
+        r'\bfd\s+(rate|interest)\b',
+        r'\brecurring\s+deposit\b',
+        r'\brd\s+account\b',
+        r'\bmutual\s+fund\b',
+        r'\binvestment\s+(portfolio|return)\b',
+    ],
+    # Account opening/management
+    'account_services': [
+        r'\bopen\s+(my\s+|a\s+)?(new\s+)?account\b',
+        r'\bclose\s+(my\s+)?account\b',
+        r'\baccount\s+type\b',
+        r'\bsavings\s+account\b',
+        r'\bcurrent\s+account\b',
+        r'\bupdate\s+(my\s+)?(mobile|email|address)\b',
+    ],
+    # Debit/ATM card services
+    'card_services': [
+        r'\bdebit\s+card\b',
+        r'\batm\s+card\b',
+        r'\bcard\s+(block|lost|stolen)\b',
+        r'\brequest\s+(new\s+)?card\b',
+        r'\bcard\s+pin\b',
+        r'\batm\s+location\b',
+    ],
+    # Cheque services
+    'cheque_services': [
+        r'\bcheque\s+book\b',
+        r'\brequest\s+cheque\b',
+        r'\bcheque\s+status\b',
+        r'\bstop\s+cheque\b',
+        r'\bcheque\s+bounce\b',
+    ],
+    # Interest rates
+    'interest_rates': [
+        r'\binterest\s+rate\b',
+        r'\bsavings\s+(account\s+)?interest\b',
+        r'\bfd\s+rate\b',
+        r'\bloan\s+(interest\s+)?rate\b',
+        r'\bcurrent\s+rate\b',
+    ],
+    # Tax related
+    'tax_info': [
+        r'\btax\b',
+        r'\btds\b',
+        r'\bform\s+16\b',
+        r'\bform\s+26as\b',
+        r'\binterest\s+certificate\b',
+        r'\btax\s+saving\b',
+    ],
+    # Insurance
+    'insurance_info': [
+        r'\binsurance\b',
+        r'\blife\s+insurance\b',
+        r'\bhealth\s+insurance\b',
+        r'\binsurance\s+policy\b',
+        r'\bpremium\s+payment\b',
+    ],
+    # UPI/Digital payments
+    'digital_payment': [
+        r'\bupi\b',
+        r'\bupi\s+id\b',
+        r'\bqr\s+code\b',
+        r'\bdigital\s+payment\b',
+        r'\bphone\s+pay\b',
+        r'\bgoogle\s+pay\b',
+    ],
+    # NEFT/RTGS/IMPS
+    'bank_transfer': [
+        r'\bneft\b',
+        r'\brtgs\b',
+        r'\bimps\b',
+        r'\bifsc\s+code\b',
+        r'\bbeneficiary\b',
+    ],
+    # Bill payments
+    'bill_payment': [
+        r'\b(pay|payment)\s+(bill|bills)\b',
+        r'\belectricity\s+bill\b',
+        r'\bwater\s+bill\b',
+        r'\bgas\s+bill\b',
+        r'\bmobile\s+recharge\b',
+        r'\bdth\s+recharge\b',
+    ],
+    # Account statements
+    'statement_request': [
+        r'\b(account|bank)\s+statement\b',
+        r'\be-?statement\b',
+        r'\bdownload\s+statement\b',
+        r'\bmonthly\s+statement\b',
+    ],
+    # Financial advice
+    'financial_advice': [
+        r'\bfinancial\s+(advice|planning|help)\b',
+        r'\bbudget\b',
+        r'\bsav(e|ing)\s+(money|plan)\b',
+        r'\binvestment\s+advice\b',
+        r'\bretirement\s+planning\b',
+    ],
+    # Account balance inquiry variants
+    'balance_inquiry': [
+        r'\bmin(imum)?\s+balance\b',
+        r'\baverage\s+balance\b',
+        r'\bavailable\s+balance\b',
+        r'\btotal\s+balance\b',
+    ],
+    # Branch/Bank info
+    'branch_info': [
+        r'\bbranch\s+(location|near|address)\b',
+        r'\bnearest\s+branch\b',
+        r'\bbank\s+(hours|timing)\b',
+        r'\bcustomer\s+(care|service|support)\b',
+    ],
+    # Forex/Currency
+    'forex_info': [
+        r'\bforeign\s+exchange\b',
+        r'\bforex\b',
+        r'\bcurrency\s+(exchange|rate)\b',
+        r'\bexchange\s+rate\b',
+        r'\btravel\s+card\b',
+    ],
+    # Complaints/Disputes
+    'complaint_dispute': [
+        r'\bcomplaint\b',
+        r'\bdispute\s+(transaction|charge)\b',
+        r'\bunauthorized\s+(transaction|charge)\b',
+        r'\bfraud\b',
+        r'\breport\s+(issue|problem)\b',
+    ],
+}
+
+
+# Built once at import time and shared by every request: one regex per intent, in priority order.
+# (A single regex with one lookahead branch per intent was measured slower: re can't use its
+# literal-prefix search inside lookaheads, so it scans the text once per branch regardless.)
+_INTENT_REGEXES = [
+    (intent, re.compile('|'.join(f'(?:{pattern})' for pattern in pattern_list)))
+    for intent, pattern_list in INTENT_PATTERNS.items()
+]
+
+
+def match_intent(text: str) -> str:
     """
-    text = text.lower().strip()
+    Return the highest-priority intent whose patterns match the text, or 'unknown'
     
-    # Intent patterns - Comprehensive banking/financial knowledge base
-    patterns = {
-        'greeting': [
-            r'^(hi|hello|hey|greetings|good\s+(morning|afternoon|evening))\b',
-            r'\b(hi|hello|hey)\s+(there|assistant|bot)\b',
-        ],
-        'help': [
-            r'^(help|what\s+can\s+you\s+do|how\s+can\s+you\s+help)\b',
-            r'\b(show|tell)\s+(me\s+)?(features|capabilities|options)\b',
-            r'\bwhat\s+(are|is)\s+(your|the)\s+(features|services)\b',
-        ],
-        'thank_you': [
-            r'\b(thank|thanks|thankyou|thx)\b',
-            r'\bappreciate\s+it\b',
-            r'\bthat\s+helps?\b',
-        ],
-        'check_balance': [
-            r'\b(check|show|what|what\'s|whats|tell me)\b.*(balance|amount)',
-            r'\bbalance\b',
-            r'how much.*\b(have|got|do i have)\b',
-            r'\bmy\s+(account|bank)\s+balance\b',
-            r'\bcurrent\s+balance\b',
-        ],
-        'transfer_funds': [
-            r'\b(transfer|send|pay|give)\b.*\b(money|rupees|₹|\d+)\b',
-            r'\bsend\s+₹?\d+',
-            r'\btransfer.*to\b',
-            r'\bmake\s+a\s+payment\b',
-            r'\bpay\s+someone\b',
-            # Marathi/Hindi patterns for transfer
-            r'हस्तांतरण',  # transfer (Marathi)
-            r'ट्रांसफर',  # transfer (Hindi transliteration)
-            r'भेज',  # send (Hindi)
-            r'पाठव',  # send (Marathi)
-        ],
-        'transaction_history': [
-            r'\b(show|display|get|view|check|see)\b.*(?:my\s+)?(?:last|recent)?\s*(?:transaction|history|statement|payment)',
-            r'\b(show|display|get|view|check|see)\s+(?:me\s+)?(?:my\s+)?(?:last|recent)\s+\d+\s+(?:transaction|payment)',
-            r'\blast\s+(?:my\s+)?\d+\s+(?:transaction|payment)',
-            r'\brecent\s+(?:transaction|payment)',
-            r'\bmy\s+(bank\s+)?statement\b',
-            r'\btransaction\s+(?:history|details|list)\b',
-            r'\bcheck\s+(?:my\s+)?(?:last|recent)\s+\d+\s+transaction',
-            # Marathi/Hindi patterns for transactions
-            r'व्यवहार',  # transactions (Marathi)
-            r'लेनदेन',  # transactions (Hindi)
-            r'दाखवा',  # show (Marathi)
-            r'दिखाएं',  # show (Hindi)
-            r'बताओ',  # tell (Hindi)
-            r'शेवटचे',  # last (Marathi)
-            r'अंतिम',  # last (Hindi)
-            r'पिछले',  # recent (Hindi)
-            r'माझे.*व्यवहार',  # my transactions (Marathi)
-            r'मेरे.*लेनदेन',  # my transactions (Hindi)
-        ],
-        'loan_details': [
-            r'\b(loan|emi|debt)\b',
-            r'\binterest\s+rate\b',
-            r'\bdue\s+date\b',
-            r'\bhome\s+loan\b',
-            r'\bpersonal\s+loan\b',
-            r'\bloan\s+balance\b',
-        ],
-        'set_reminder': [
-            r'\b(remind|reminder|alert)\b',
-            r'\bremind\s+me\b',
-            r'\bset\s+reminder\b',
-        ],
-        # Credit Card related
-        'credit_card_info': [
-            r'\bcredit\s+card\b',
-            r'\bcard\s+(limit|balance|statement)\b',
-            r'\boutstanding\s+(amount|balance)\b',
-            r'\bcard\s+payment\s+due\b',
-            r'\bminimum\s+payment\b',
-        ],
-        # Fixed Deposit / Investment
-        'investment_info': [
-            r'\bfixed\s+deposit\b',
-            r'\bfd\s+(rate|interest)\b',
-            r'\brecurring\s+deposit\b',
-            r'\brd\s+account\b',
-            r'\bmutual\s+fund\b',
-            r'\binvestment\s+(portfolio|return)\b',
-        ],
-        # Account opening/management
-        'account_services': [
-            r'\bopen\s+(new\s+)?account\b',
-            r'\bclose\s+account\b',
-            r'\baccount\s+type\b',
-            r'\bsavings\s+account\b',
-            r'\bcurrent\s+account\b',
-            r'\bupdate\s+(my\s+)?(mobile|email|address)\b',
-        ],
-        # Debit/ATM card services
-        'card_services': [
-            r'\bdebit\s+card\b',
-            r'\batm\s+card\b',
-            r'\bcard\s+(block|lost|stolen)\b',
-            r'\brequest\s+(new\s+)?card\b',
-            r'\bcard\s+pin\b',
-            r'\batm\s+location\b',
-        ],
-        # Cheque services
-        'cheque_services': [
-            r'\bcheque\s+book\b',
-            r'\brequest\s+cheque\b',
-            r'\bcheque\s+status\b',
-            r'\bstop\s+cheque\b',
-            r'\bcheque\s+bounce\b',
-        ],
-        # Interest rates
-        'interest_rates': [
-            r'\binterest\s+rate\b',
-            r'\bsavings\s+(account\s+)?interest\b',
-            r'\bfd\s+rate\b',
-            r'\bloan\s+(interest\s+)?rate\b',
-            r'\bcurrent\s+rate\b',
-        ],
-        # Tax related
-        'tax_info': [
-            r'\btax\b',
-            r'\btds\b',
-            r'\bform\s+16\b',
-            r'\bform\s+26as\b',
-            r'\binterest\s+certificate\b',
-            r'\btax\s+saving\b',
-        ],
-        # Insurance
-        'insurance_info': [
-            r'\binsurance\b',
-            r'\blife\s+insurance\b',
-            r'\bhealth\s+insurance\b',
-            r'\binsurance\s+policy\b',
-            r'\bpremium\s+payment\b',
-        ],
-        # UPI/Digital payments
-        'digital_payment': [
-            r'\bupi\b',
-            r'\bupi\s+id\b',
-            r'\bqr\s+code\b',
-            r'\bdigital\s+payment\b',
-            r'\bphone\s+pay\b',
-            r'\bgoogle\s+pay\b',
-        ],
-        # NEFT/RTGS/IMPS
-        'bank_transfer': [
-            r'\bneft\b',
-            r'\brtgs\b',
-            r'\bimps\b',
-            r'\bifsc\s+code\b',
-            r'\bbeneficiary\b',
-        ],
-        # Bill payments
-        'bill_payment': [
-            r'\b(pay|payment)\s+(bill|bills)\b',
-            r'\belectricity\s+bill\b',
-            r'\bwater\s+bill\b',
-            r'\bgas\s+bill\b',
-            r'\bmobile\s+recharge\b',
-            r'\bdth\s+recharge\b',
-        ],
-        # Account statements
-        'statement_request': [
-            r'\b(account|bank)\s+statement\b',
-            r'\be-?statement\b',
-            r'\bdownload\s+statement\b',
-            r'\bmonthly\s+statement\b',
-        ],
-        # Financial advice
-        'financial_advice': [
-            r'\bfinancial\s+(advice|planning|help)\b',
-            r'\bbudget\b',
-            r'\bsaving\s+(money|plan)\b',
-            r'\binvestment\s+advice\b',
-            r'\bretirement\s+planning\b',
-        ],
-        # Account balance inquiry variants
-        'balance_inquiry': [
-            r'\bmin(imum)?\s+balance\b',
-            r'\baverage\s+balance\b',
-            r'\bavailable\s+balance\b',
-            r'\btotal\s+balance\b',
-        ],
-        # Branch/Bank info
-        'branch_info': [
-            r'\bbranch\s+(location|near|address)\b',
-            r'\bnearest\s+branch\b',
-            r'\bbank\s+(hours|timing)\b',
-            r'\bcustomer\s+(care|service|support)\b',
-        ],
-        # Forex/Currency
-        'forex_info': [
-            r'\bforeign\s+exchange\b',
-            r'\bforex\b',
-            r'\bcurrency\s+(exchange|rate)\b',
-            r'\btravel\s+card\b',
-        ],
-        # Complaints/Disputes
-        'complaint_dispute': [
-            r'\bcomplaint\b',
-            r'\bdispute\s+(transaction|charge)\b',
-            r'\bunauthorized\s+(transaction|charge)\b',
-            r'\bfraud\b',
-            r'\breport\s+(issue|problem)\b',
-        ],
-    }
+    Expects text that is already lowercased and stripped. Stops at the first
+    matching intent; use match_intents() when the competing ones matter too.
+    """
+    for intent, regex in _INTENT_REGEXES:
+        if regex.search(text):
+            return intent
+    return 'unknown'
+
+
+def match_intents(text: str) -> List[str]:
+    """
+    Return every intent whose patterns match the text, in priority order
     
+    Expects text that is already lowercased and stripped.
+    """
+    return [intent for intent, regex in _INTENT_REGEXES if regex.search(text)]
+
+
+def _pattern_confidence(matched_intents: List[str]) -> float:
+    """One matching intent is strong evidence; each extra competing intent dilutes it"""
+    if not matched_intents:
+        return 0.0
+    return PATTERN_MATCH_CONFIDENCE / len(matched_intents)
+
+
+def _lowered(text) -> str:
+    """Lowercased, stripped form of a string, or an AnalyzedText's cache-key form"""
+    if isinstance(text, AnalyzedText):
+        return text.utterance
+    return text.lower().strip()
+
+
+def detect_intent_with_patterns(text) -> Dict[str, Any]:
+    """
+    Pattern-based intent detection (fallback method)
+    """
     # Detect intent
-    detected_intent = 'unknown'
-    for intent, pattern_list in patterns.items():
-        for pattern in pattern_list:
-            if re.search(pattern, text):
-                detected_intent = intent
-                break
-        if detected_intent != 'unknown':
-            break
-    
-    # Extract entities
-    entities = {}
-    
-    # Extract amount (for transfers)
-    amount_match = re.search(r'₹?\s*(\d+(?:,\d+)*(?:\.\d+)?)', text)
-    if amount_match:
-        amount_str = amount_match.group(1).replace(',', '')
-        try:
-            entities['amount'] = float(amount_str)
-        except ValueError:
-            pass
-    
-    # Extract recipient name (for transfers)
-    # Look for "to [name]" or "send [name]"
-    recipient_patterns = [
-        r'\bto\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
-        r'\bsend\s+(?:₹?\d+\s+)?to\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
-    ]
-    for pattern in recipient_patterns:
-        recipient_match = re.search(pattern, text, re.IGNORECASE)
-        if recipient_match:
-            entities['recipient'] = recipient_match.group(1).title()
-            break
-    
-    # Extract transaction limit
-    limit_patterns = [
-        r'\b(?:last|recent)\s+(?:my\s+)?(\d+)\s+(?:transaction|payment|statement)',
-        r'\b(?:last|recent)\s+(\d+)',
-        r'\b(\d+)\s+(?:transaction|payment|statement)',
-        r'\bshow\s+(?:me\s+)?(?:my\s+)?(?:last\s+)?(\d+)\s+(?:transaction|payment)',
-    ]
-    for pattern in limit_patterns:
-        limit_match = re.search(pattern, text, re.IGNORECASE)
-        if limit_match:
-            try:
-                entities['limit'] = int(limit_match.group(1))
-                break
-            except (ValueError, IndexError):
-                pass
-    
-    # Extract account type
-    if 'savings' in text:
-        entities['account_type'] = 'savings'
-    elif 'current' in text or 'checking' in text:
-        entities['account_type'] = 'current'
-    
-    # Extract reminder message
-    if detected_intent == 'set_reminder':
-        reminder_patterns = [
-            r'remind\s+me\s+to\s+(.+?)(?:\s+(?:on|by|next|tomorrow)|\s*$)',
-            r'reminder\s+(?:to\s+)?(.+?)(?:\s+(?:on|by|next|tomorrow)|\s*$)',
-        ]
-        for pattern in reminder_patterns:
-            reminder_match = re.search(pattern, text, re.IGNORECASE)
-            if reminder_match:
-                entities['message'] = reminder_match.group(1).strip()
-                break
-        
-        # Extract due date
-        date_patterns = [
-            r'(?:on|by)\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
-            r'(?:on|by)\s+(\d{1,2}(?:st|nd|rd|th)?)',
-            r'(tomorrow|next\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday))',
-        ]
-        for pattern in date_patterns:
-            date_match = re.search(pattern, text, re.IGNORECASE)
-            if date_match:
-                entities['due_date'] = date_match.group(1)
-                break
+    matched_intents = match_intents(_lowered(text))
+    detected_intent = matched_intents[0] if matched_intents else 'unknown'
     
     return {
         'intent': detected_intent,
-        'entities': entities,
-        'confidence': 0.8 if detected_intent != 'unknown' else 0.3
+        'entities': extract_entities(text, detected_intent),
+        'confidence': round(_pattern_confidence(matched_intents), 4),
+        'source': 'patterns',
+        'matched_intents': matched_intents
     }
 
 
-def detect_intent_with_openai(text: str) -> Dict[str, Any]:
+def detect_intent_locally(text) -> Dict[str, Any]:
+    """
+    Cheap local intent detection: patterns, cross-checked by the offline classifier
+    
+    The pattern winner is kept whenever a pattern matches (preserving the
+    priority order); its confidence is the mean of the pattern evidence and
+    the classifier's probability for that same intent, so agreement scores
+    high and ambiguity or disagreement scores low. With no pattern match the
+    classifier's own prediction is used.
+    """
+    return _classify_pattern_result(text, detect_intent_with_patterns(text))
+
+
+def _classify_pattern_result(text, result: Dict[str, Any]) -> Dict[str, Any]:
+    """The classifier half of detect_intent_locally, for an existing pattern result"""
+    if _classifier is None:
+        return result
+    return _combine_with_classifier(text, result, _classifier.predict_proba(_lowered(text)))
+
+
+def _combine_with_classifier(text, result: Dict[str, Any], proba) -> Dict[str, Any]:
+    """Blend a pattern result with the classifier's probabilities (see detect_intent_locally)"""
+    if result['matched_intents']:
+        index = _classifier.label_index.get(result['intent'])
+        classifier_confidence = float(proba[index]) if index is not None else 0.0
+        confidence = (result['confidence'] + classifier_confidence) / 2
+    else:
+        best = int(proba.argmax())
+        result['intent'] = _classifier.labels[best]
+        result['entities'] = extract_entities(text, result['intent'])
+        confidence = float(proba[best])
+    
+    result['confidence'] = round(confidence, 4)
+    result['source'] = 'local'
+    return result
+
+
+def extract_entities(text, detected_intent: str) -> Dict[str, Any]:
+    """
+    Extract amount, recipient, limit, account type and reminder details from text
+    Delegates to the single-pass tokenizer in entity_extractor; an
+    AnalyzedText's tokens are reused instead of re-tokenizing.
+    """
+    if isinstance(text, AnalyzedText):
+        return _extract_entities(text.lower, detected_intent, tokens=text.tokens)
+    return _extract_entities(text, detected_intent)
+
+
+def detect_intent_with_openai(text: str, timeout: Optional[float] = None) -> Dict[str, Any]:
     """
     Use OpenAI GPT for more sophisticated intent detection
+    `timeout` is passed to the shared LLM client as the call's deadline.
     """
     try:
         prompt = f"""You are a banking assistant NLP system. Analyze the following user query and respond with a JSON object containing:
@@ -330,42 +382,371 @@ User query: "{text}"
 
 Response (JSON only):"""
 
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
+        result_text = llm_client.chat_completion(
             messages=[
                 {"role": "system", "content": "You are a JSON-only NLP parser for banking queries."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
-            max_tokens=200
+            max_tokens=200,
+            timeout=timeout
         )
         
-        result_text = response.choices[0].message.content.strip()
-        
         # Parse JSON response
         import json
         result = json.loads(result_text)
+        result['source'] = 'openai'
         
         return result
     
     except Exception as e:
         logger.error(f"OpenAI intent detection error: {str(e)}")
-        # Fall back to pattern-based detection
-        return detect_intent_with_patterns(text)
+        # Fall back to local detection
+        result = detect_intent_locally(text)
+        result['source'] = 'fallback'
+        return result
+
+
+def normalize_utterance(text) -> str:
+    """
+    Canonical form of an utterance used as the intent cache key
+    Lowercased, whitespace-collapsed and without trailing punctuation
+    """
+    if isinstance(text, AnalyzedText):
+        return text.utterance
+    return _WHITESPACE_RE.sub(' ', text.lower()).strip().rstrip('?.!,;: ')
+
+
+def _llm_enabled() -> bool:
+    return llm_client.is_available('chat')
 
 
-def detect_intent(text: str) -> Dict[str, Any]:
+def _should_speculate(pattern_result: Dict[str, Any]) -> bool:
+    """Decide, from the pattern result and before the classifier runs, whether to start the LLM call right away"""
+    if INTENT_SPECULATION == 'always':
+        return True
+    if INTENT_SPECULATION == 'unmatched':
+        # No pattern evidence usually means escalation
+        return not pattern_result['matched_intents']
+    return False
+
+
+def _cache_late_llm_result(cache_key: Hashable, future):
+    """Keep an LLM answer that missed its deadline so the next identical utterance benefits"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    if result.get('source') == 'openai':
+        metrics.increment('nlp.llm_late_results_cached')
+        _intent_cache.set(cache_key, {
+            'intent': result.get('intent', 'unknown'),
+            'confidence': result.get('confidence', 0.0),
+            'source': 'openai',
+        })
+
+
+def _submit_llm(utterance: str, deadline: float) -> Optional[Future]:
+    """
+    Start an LLM intent call, or return None when it cannot help: the
+    deadline has passed or INTENT_LLM_MAX_INFLIGHT calls are already out
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    if not _llm_slots.acquire(blocking=False):
+        metrics.increment('nlp.llm_escalations_shed')
+        return None
+    try:
+        future = _llm_executor.submit(detect_intent_with_openai, utterance, remaining)
+    except Exception:
+        _llm_slots.release()
+        raise
+    metrics.increment('nlp.llm_calls_submitted')
+    # Also runs when the future is cancelled, so a slot is never leaked
+    future.add_done_callback(lambda _: _llm_slots.release())
+    return future
+
+
+def _detect_intent_uncached(text, deadline: float, cache_key: Optional[Hashable] = None) -> Dict[str, Any]:
+    """
+    Run local detection, escalating to the LLM only when it is unsure
+    
+    An utterance escalates when the local confidence is below
+    INTENT_ESCALATION_THRESHOLD - typically no pattern matched and the
+    classifier is unsure, or several intents matched and the classifier
+    didn't settle it.
+    
+    Depending on INTENT_SPECULATION the LLM call may already be running
+    alongside local detection; it is cancelled (or its answer ignored) if the
+    local result turns out to be confident. The LLM answer is only waited for
+    until `deadline` (a time.monotonic() value); a call still queued by then
+    is cancelled, and when INTENT_LLM_MAX_INFLIGHT calls are already out the
+    local result is used without escalating.
+    """
+    utterance = normalize_utterance(text)
+    result = detect_intent_with_patterns(text)
+    llm_future = None
+    if _llm_enabled() and _should_speculate(result):
+        llm_future = _submit_llm(utterance, deadline)
+        if llm_future is not None:
+            metrics.increment('nlp.speculative_llm_calls')
+    
+    result = _classify_pattern_result(text, result)
+    metrics.increment('nlp.intent_decisions')
+    if result['confidence'] >= INTENT_ESCALATION_THRESHOLD:
+        metrics.increment('nlp.resolved_locally')
+        if llm_future is not None:
+            if llm_future.cancel():
+                metrics.increment('nlp.speculative_llm_cancelled')
+            else:
+                metrics.increment('nlp.speculative_llm_ignored')
+        return result
+    
+    reason = 'multi_match' if len(result['matched_intents']) > 1 else 'low_confidence'
+    metrics.increment('nlp.escalation_candidates')
+    metrics.increment(f'nlp.escalation_candidates.{reason}')
+    
+    if not _llm_enabled():
+        return result
+    
+    if llm_future is None:
+        llm_future = _submit_llm(utterance, deadline)
+        if llm_future is None:
+            result['source'] = 'fallback'
+            return result
+    metrics.increment('nlp.escalations')
+    try:
+        return llm_future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        metrics.increment('nlp.llm_deadline_exceeded')
+        logger.warning("OpenAI intent detection missed its deadline, using local result")
+        if llm_future.cancel():
+            # Still queued: never send it
+            metrics.increment('nlp.llm_cancelled')
+        elif cache_key is not None:
+            llm_future.add_done_callback(lambda future: _cache_late_llm_result(cache_key, future))
+    except Exception as e:
+        logger.warning(f"OpenAI detection failed, using local result: {str(e)}")
+    
+    result['source'] = 'fallback'
+    return result
+
+
+def detect_intent(text, lang: Optional[str] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
     """
     Main intent detection function
-    Uses OpenAI if available, otherwise falls back to pattern matching
+    Uses patterns + the offline classifier first and escalates to OpenAI
+    (if available) only for low-confidence or ambiguous utterances.
+    `text` is a string or an AnalyzedText (whose lowercased form is reused).
+    
+    Results are cached per (normalized text, language). Only the intent is
+    cached; entities are re-extracted from the current text on every hit so
+    cached results never leak amounts or names between requests.
+    
+    `timeout` (seconds, default INTENT_DEADLINE_MS) bounds the whole call:
+    an LLM answer that isn't back in time is dropped in favour of the local one.
+    """
+    if timeout is None:
+        timeout = INTENT_DEADLINE_MS / 1000.0
+    deadline = time.monotonic() + timeout
+    normalized = normalize_utterance(text)
+    if lang is None:
+        lang = detect_language(text)
+    key = (normalized, lang)
+    
+    cached = _intent_cache.get(key)
+    if cached is not None:
+        if cached['source'] == 'openai':
+            metrics.increment('nlp.llm_calls_saved')
+        return {
+            'intent': cached['intent'],
+            'entities': extract_entities(text if isinstance(text, AnalyzedText) else normalized, cached['intent']),
+            'confidence': cached['confidence'],
+            'source': cached['source'],
+            'cached': True
+        }
+    
+    result = _detect_intent_uncached(text if isinstance(text, AnalyzedText) else normalized, deadline, cache_key=key)
+    # Don't pin a degraded answer: a failed LLM call should be retried next time
+    if result.get('source') != 'fallback':
+        _intent_cache.set(key, {
+            'intent': result.get('intent', 'unknown'),
+            'confidence': result.get('confidence', 0.0),
+            'source': result.get('source', 'patterns'),
+        })
+    return result
+
+
+def detect_intents(texts: list, langs: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
     """
-    if OPENAI_AVAILABLE and openai.api_key:
-        try:
-            return detect_intent_with_openai(text)
-        except Exception as e:
-            logger.warning(f"OpenAI detection failed, using patterns: {str(e)}")
+    Batch intent detection for offline analytics (transcript / IVR log replay)
     
-    return detect_intent_with_patterns(text)
+    `texts` may mix strings and AnalyzedText objects.
+    Uses the local engines only - no LLM escalation - so throughput is bound
+    by CPU, not the network. Duplicate utterances are detected once, cached
+    intents are reused (peeked at, so the live cache's LRU order and hit
+    ratio are untouched, and batch results are not written back, so a bulk
+    replay can't evict the live traffic's hot entries), and the classifier
+    scores every remaining unique utterance in one vectorized pass.
+    Results are returned in input order.
+    """
+    if langs is None:
+        langs = [None] * len(texts)
+    keys = []
+    for text, lang in zip(texts, langs):
+        keys.append((normalize_utterance(text), lang if lang is not None else detect_language(text)))
+    
+    resolved = {}
+    pending = []
+    for key in dict.fromkeys(keys):
+        cached = _intent_cache.peek(key)
+        if cached is not None:
+            resolved[key] = cached
+        else:
+            pending.append(key)
+    
+    if pending:
+        results = [detect_intent_with_patterns(normalized) for normalized, _ in pending]
+        if _classifier is not None:
+            probas = _classifier.predict_proba_batch([normalized for normalized, _ in pending])
+            results = [_combine_with_classifier(normalized, result, proba)
+                       for (normalized, _), result, proba in zip(pending, results, probas)]
+        for key, result in zip(pending, results):
+            resolved[key] = result
+    metrics.increment('nlp.batch_utterances', len(keys))
+    
+    return [
+        {
+            'intent': resolved[key]['intent'],
+            'entities': extract_entities(key[0], resolved[key]['intent']),
+            'confidence': resolved[key]['confidence'],
+            'source': resolved[key]['source'],
+        }
+        for key in keys
+    ]
+
+
+def split_clauses(text: str) -> List[str]:
+    """
+    Split a compound utterance into clauses that each carry their own intent
+    
+    "check my balance and show my last 3 transactions" -> two clauses.
+    Pieces with no intent of their own ("rohan" in "send 500 to amit and
+    rohan", or a leading "hi,") are glued back onto a neighbouring
+    clause, so single-intent utterances always come back as one clause.
+    """
+    pieces = []
+    position = 0
+    for separator in _CLAUSE_SPLIT_RE.finditer(text):
+        pieces.append((text[position:separator.start()], separator.group(0)))
+        position = separator.end()
+    if not pieces:
+        return [text.strip()]
+    pieces.append((text[position:], ''))
+    
+    clauses: List[str] = []
+    pending = ''
+    for piece, separator in pieces:
+        has_intent = bool(piece.strip()) and match_intent(piece.lower().strip()) not in _NON_CLAUSE_INTENTS
+        if not has_intent or len(clauses) >= MAX_CLAUSES:
+            if clauses:
+                clauses[-1] += pending + piece
+                pending = separator
+            else:
+                pending += piece + separator
+            continue
+        # A leading fragment with no intent belongs to the first real clause
+        clauses.append(piece if clauses else pending + piece)
+        pending = separator
+    
+    if not clauses:
+        return [text.strip()]
+    return [clause.strip(' ,;') for clause in clauses]
+
+
+def detect_multi_intent(text, lang: Optional[str] = None, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Detect one intent per clause of a possibly compound utterance
+    
+    `text` is a string or an AnalyzedText. Returns detect_intent() results
+    in utterance order, each with its 'clause'; adjacent clauses with the
+    same intent and entities are merged, so a compound utterance can come
+    back as a single result. All clauses share one `timeout` budget, so a
+    compound utterance can't take longer to resolve than a single one.
+    """
+    raw_text = str(text)
+    clauses = split_clauses(raw_text)
+    if len(clauses) == 1:
+        result = detect_intent(text, lang=lang, timeout=timeout)
+        result['clause'] = raw_text
+        return [result]
+    
+    metrics.increment('nlp.multi_intent_utterances')
+    if lang is None:
+        lang = detect_language(text)
+    if timeout is None:
+        timeout = INTENT_DEADLINE_MS / 1000.0
+    deadline = time.monotonic() + timeout
+    results = []
+    for clause in clauses:
+        result = detect_intent(clause, lang=lang, timeout=max(0.0, deadline - time.monotonic()))
+        previous = results[-1] if results else None
+        if previous and previous['intent'] == result['intent'] and previous['entities'] == result['entities']:
+            # Two phrasings of the same request answer once
+            previous['clause'] += ' ' + clause
+            continue
+        result['clause'] = clause
+        results.append(result)
+    return results
+
+
+def clear_intent_cache():
+    """Drop every cached intent (benchmarks, model reloads)"""
+    _intent_cache.clear()
+
+
+def get_intent_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters for the intent cache"""
+    return _intent_cache.stats()
+
+
+def get_escalation_stats() -> Dict[str, Any]:
+    """
+    How often local detection was unsure and how often that reached the LLM
+    `llm_calls` is what the LLM was actually sent - escalations plus
+    speculative calls, less those cancelled before they left the queue -
+    so speculation's cost shows up next to the escalation rate.
+    """
+    decisions = metrics.get('nlp.intent_decisions')
+    candidates = metrics.get('nlp.escalation_candidates')
+    escalations = metrics.get('nlp.escalations')
+    cancelled = metrics.get('nlp.llm_cancelled')
+    speculative_cancelled = metrics.get('nlp.speculative_llm_cancelled')
+    llm_calls = metrics.get('nlp.llm_calls_submitted') - cancelled - speculative_cancelled
+    return {
+        'threshold': INTENT_ESCALATION_THRESHOLD,
+        'decisions': decisions,
+        'resolved_locally': metrics.get('nlp.resolved_locally'),
+        'escalation_candidates': candidates,
+        'low_confidence': metrics.get('nlp.escalation_candidates.low_confidence'),
+        'multi_match': metrics.get('nlp.escalation_candidates.multi_match'),
+        'escalations': escalations,
+        'shed': metrics.get('nlp.llm_escalations_shed'),
+        'cancelled': cancelled,
+        'speculation': INTENT_SPECULATION,
+        'speculative_calls': metrics.get('nlp.speculative_llm_calls'),
+        'speculative_cancelled': speculative_cancelled,
+        # Ran to completion although the local result was kept
+        'speculative_wasted': metrics.get('nlp.speculative_llm_ignored'),
+        'llm_calls': llm_calls,
+        'escalation_rate': round(escalations / decisions, 4) if decisions else 0.0,
+        'llm_call_rate': round(llm_calls / decisions, 4) if decisions else 0.0,
+        'candidate_rate': round(candidates / decisions, 4) if decisions else 0.0,
+    }
+
+
+metrics.register_provider('intent_cache', get_intent_cache_stats)
+metrics.register_provider('intent_escalation', get_escalation_stats)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,283 @@
+"""
+Concatenative Audio for Templated Responses
+Balance, transfer and transaction-count responses differ only in their
+numbers and names, so instead of a network TTS call per response they are
+spliced from short pre-rendered clips:
+
+- the fixed fragments of each template ("Your", "account balance is")
+- a spoken-number vocabulary in the Indian system: 0-99, the hundreds,
+  thousand / lakh / crore, rupees / paise
+- known field values: account types and payee names from the database
+
+Number clips are synthesized from the numerals themselves ("47", "300"),
+so each language's voice says them the way it natively would.
+
+At runtime a response text is matched back against its template, the
+clips for its units are concatenated (MPEG frames join like gTTS's own
+multi-part output) and the result is written to the audio store: no
+network call, a few milliseconds. If any clip is missing the response
+falls back to normal synthesis.
+
+Usage:
+    python phrase_audio.py build [--lang en hi mr] [--force] [--words NAME ...]
+    python phrase_audio.py status
+"""
+import os
+import re
+import string
+import logging
+import sqlite3
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import metrics
+from audio_store import get_audio_store
+from tts_module import audio_content_key, strip_id3, text_to_speech
+
+logger = logging.getLogger(__name__)
+
+PHRASE_AUDIO_DIR = os.getenv(
+    'PHRASE_AUDIO_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'phrase_audio')
+)
+
+PHRASE_LANGUAGES = ['en', 'hi', 'mr']
+# Templates whose every field can be spoken from clips
+SPLICE_TEMPLATES = ('balance', 'transfer_success', 'transactions')
+
+# Scale and currency words; everything numeric below 100 (and each hundred) is its own clip
+NUMBER_WORDS = {
+    'en': {'thousand': 'thousand', 'lakh': 'lakh', 'crore': 'crore',
+           'rupee': 'rupee', 'rupees': 'rupees', 'and': 'and', 'paise': 'paise'},
+    'hi': {'thousand': 'हज़ार', 'lakh': 'लाख', 'crore': 'करोड़',
+           'rupee': 'रुपया', 'rupees': 'रुपये', 'and': 'और', 'paise': 'पैसे'},
+    'mr': {'thousand': 'हजार', 'lakh': 'लाख', 'crore': 'कोटी',
+           'rupee': 'रुपया', 'rupees': 'रुपये', 'and': 'आणि', 'paise': 'पैसे'},
+}
+
+_AMOUNT_PATTERN = r'(-?[\d,]+(?:\.\d+)?)'
+_COUNT_PATTERN = r'(\d+)'
+_VALUE_PATTERN = r'(.+?)'
+
+
+def spoken_number(n: int, words: Dict[str, str]) -> List[str]:
+    """
+    Clip texts for a non-negative integer, Indian grouping
+    1234567 -> ['12', 'lakh', '34', 'thousand', '500', '67']
+    """
+    if n == 0:
+        return ['0']
+    units: List[str] = []
+    crore, n = divmod(n, 10 ** 7)
+    if crore:
+        units += spoken_number(crore, words) + [words['crore']]
+    for scale, size in (('lakh', 10 ** 5), ('thousand', 10 ** 3)):
+        count, n = divmod(n, size)
+        if count:
+            units += [str(count), words[scale]]
+    hundreds, n = divmod(n, 100)
+    if hundreds:
+        units.append(str(hundreds * 100))
+    if n:
+        units.append(str(n))
+    return units
+
+
+def spoken_amount(text: str, words: Dict[str, str]) -> Optional[List[str]]:
+    """Clip texts for a rendered rupee amount ("12,34,567.50"); None for amounts that cannot be spoken"""
+    whole, _, fraction = text.replace(',', '').partition('.')
+    if not whole.isdigit():
+        return None
+    rupees = int(whole)
+    paise = int((fraction + '00')[:2]) if fraction.isdigit() else 0
+    units = spoken_number(rupees, words) + [words['rupee'] if rupees == 1 else words['rupees']]
+    if paise:
+        units += [words['and']] + spoken_number(paise, words) + [words['paise']]
+    return units
+
+
+def _literal_units(literal: str) -> List[str]:
+    """A template fragment as a clip text ('' fragments and bare punctuation are not spoken)"""
+    literal = literal.replace('₹', '').strip()
+    return [literal] if re.search(r'\w', literal) else []
+
+
+@lru_cache(maxsize=None)
+def _template_parts(key: str, lang: str) -> Optional[Tuple[Any, List[Tuple[str, Optional[str], str]]]]:
+    """(full-match regex, [(literal, field, kind)]) for a spliceable template in lang"""
+    from language_support import RESPONSE_TEMPLATES
+
+    source = RESPONSE_TEMPLATES.get(lang, {}).get(key)
+    if source is None:
+        return None
+    parts = []
+    pattern = ''
+    for literal, field, spec, _ in string.Formatter().parse(source):
+        pattern += re.escape(literal)
+        if field is None:
+            parts.append((literal, None, ''))
+            continue
+        if ',' in (spec or '') and spec.endswith('f'):
+            kind, field_pattern = 'amount', _AMOUNT_PATTERN
+        elif field == 'count':
+            kind, field_pattern = 'count', _COUNT_PATTERN
+        else:
+            kind, field_pattern = 'value', _VALUE_PATTERN
+        pattern += field_pattern
+        parts.append((literal, field, kind))
+    return re.compile(pattern + r'\Z'), parts
+
+
+def spoken_units(text: str, lang: str) -> Optional[List[str]]:
+    """Clip texts that speak a templated response, or None if text is not a spliceable template rendering"""
+    words = NUMBER_WORDS.get(lang)
+    if words is None:
+        return None
+    for key in SPLICE_TEMPLATES:
+        compiled = _template_parts(key, lang)
+        if compiled is None:
+            continue
+        pattern, parts = compiled
+        match = pattern.match(text)
+        if not match:
+            continue
+        units: List[str] = []
+        values = iter(match.groups())
+        for literal, field, kind in parts:
+            units += _literal_units(literal)
+            if field is None:
+                continue
+            value = next(values)
+            if kind == 'amount':
+                amount_units = spoken_amount(value, words)
+                if amount_units is None:
+                    return None
+                units += amount_units
+            elif kind == 'count':
+                units += spoken_number(int(value), words)
+            else:
+                units.append(value.strip().lower())
+        return units
+    return None
+
+
+def clip_path(text: str, lang: str, phrase_dir: str = PHRASE_AUDIO_DIR) -> str:
+    return os.path.join(phrase_dir, lang, audio_content_key(text, lang) + '.mp3')
+
+
+@lru_cache(maxsize=4096)
+def _clip_frames(text: str, lang: str, phrase_dir: str) -> bytes:
+    """MPEG frames of one clip (raises FileNotFoundError, which is not cached, for a missing clip)"""
+    with open(clip_path(text, lang, phrase_dir), 'rb') as f:
+        return strip_id3(f.read())
+
+
+def splice_response(text: str, lang: str, audio_dir: str, phrase_dir: str = PHRASE_AUDIO_DIR) -> Optional[str]:
+    """
+    Store filename of the spliced audio for a templated response
+    None when text is not a spliceable template or a clip for it is missing.
+    """
+    units = spoken_units(text, lang)
+    if units is None:
+        return None
+    store = get_audio_store(audio_dir)
+    filename = f"phrase_{audio_content_key(text, lang)}.mp3"
+    if store.lookup(filename) is not None:
+        metrics.increment('phrase_audio.hits')
+        return filename
+    try:
+        audio = b''.join(_clip_frames(unit, lang, phrase_dir) for unit in units)
+    except FileNotFoundError as e:
+        logger.info(f"No phrase clip for {os.path.basename(str(e.filename))}; using TTS")
+        metrics.increment('phrase_audio.misses')
+        return None
+    temp_path = store.temp_path(filename)
+    with open(temp_path, 'wb') as f:
+        f.write(audio)
+    store.put(filename, temp_path)
+    metrics.increment('phrase_audio.hits')
+    return filename
+
+
+# ==================== BUILD ====================
+
+def known_values(db_path: Optional[str] = None) -> List[str]:
+    """Account types and payee names from the database, as spoken_units() keys them"""
+    import banking_api
+
+    conn = sqlite3.connect(db_path or banking_api.DB_PATH)
+    try:
+        rows = conn.execute(
+            "SELECT account_type FROM accounts UNION SELECT recipient FROM transactions WHERE recipient IS NOT NULL"
+        ).fetchall()
+    finally:
+        conn.close()
+    return sorted({row[0].strip().lower() for row in rows if row[0] and row[0].strip()})
+
+
+def vocabulary(lang: str, values: List[str]) -> List[str]:
+    """Every clip text needed to splice the templates of one language"""
+    words = NUMBER_WORDS[lang]
+    clips = [str(n) for n in range(100)] + [str(n * 100) for n in range(1, 10)] + list(words.values())
+    for key in SPLICE_TEMPLATES:
+        compiled = _template_parts(key, lang)
+        if compiled is not None:
+            for literal, _, _ in compiled[1]:
+                clips += _literal_units(literal)
+    clips += [value.strip().lower() for value in values if value.strip()]
+    return list(dict.fromkeys(clips))
+
+
+def build(languages: List[str], values: List[str], phrase_dir: str = PHRASE_AUDIO_DIR, force: bool = False) -> dict:
+    """Synthesize every missing clip (all of them with `force`)"""
+    counts = {'synthesized': 0, 'kept': 0, 'failed': 0}
+    for lang in languages:
+        os.makedirs(os.path.join(phrase_dir, lang), exist_ok=True)
+        for text in vocabulary(lang, values):
+            path = clip_path(text, lang, phrase_dir)
+            if os.path.exists(path) and not force:
+                counts['kept'] += 1
+                continue
+            temp_path = f"{path}.tmp.mp3"
+            try:
+                text_to_speech(text, temp_path, lang=lang)
+                os.replace(temp_path, path)
+                counts['synthesized'] += 1
+                print(f"  [{lang}] {text!r}")
+            except Exception as e:
+                logger.error(f"Clip failed for [{lang}] {text!r}: {str(e)}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                counts['failed'] += 1
+    return counts
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-render clips for spliced template audio")
+    parser.add_argument('--phrase-dir', default=PHRASE_AUDIO_DIR, help='clip directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='synthesize missing clips')
+    build_parser.add_argument('--lang', nargs='+', default=PHRASE_LANGUAGES, choices=PHRASE_LANGUAGES)
+    build_parser.add_argument('--force', action='store_true', help='re-synthesize every clip')
+    build_parser.add_argument('--words', nargs='*', default=[], help='extra field values (e.g. payee names)')
+
+    subparsers.add_parser('status', help='ready / missing clips per language')
+
+    args = parser.parse_args()
+    values = known_values() + (getattr(args, 'words', None) or [])
+
+    if args.command == 'build':
+        counts = build(args.lang, values, args.phrase_dir, force=args.force)
+        print(f"Synthesized {counts['synthesized']}, kept {counts['kept']}, failed {counts['failed']}: {args.phrase_dir}")
+
+    for lang in PHRASE_LANGUAGES:
+        clips = vocabulary(lang, values)
+        ready = sum(os.path.exists(clip_path(text, lang, args.phrase_dir)) for text in clips)
+        print(f"{lang}: {ready}/{len(clips)} clips")
+
+
+if __name__ == '__main__':
+    main()
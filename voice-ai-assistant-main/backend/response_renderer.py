@@ -0,0 +1,123 @@
+"""
+Localized Response Renderer for TalkToBank
+Every template in language_support.RESPONSE_TEMPLATES is parsed once at
+import into literal pieces and per-field formatters, so rendering a
+response is a join over a handful of pieces with no format-string parsing.
+
+Amount fields written with a grouping spec ("{balance:,.2f}") are rendered
+with Indian digit grouping: ₹12,34,567.50 rather than ₹1,234,567.50.
+"""
+import logging
+import string
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from language_support import RESPONSE_TEMPLATES
+
+logger = logging.getLogger(__name__)
+
+_CONVERSIONS = {'r': repr, 's': str, 'a': ascii}
+
+
+@lru_cache(maxsize=4096)
+def format_inr(amount: float, decimals: int = 2) -> str:
+    """
+    Indian digit grouping: last three digits, then pairs
+    1234567.5 -> "12,34,567.50", 150000 -> "1,50,000.00"
+    """
+    text = f"{abs(amount):.{decimals}f}"
+    whole, point, fraction = text.partition('.')
+    if len(whole) > 3:
+        head, tail = whole[:-3], whole[-3:]
+        pairs = [head[max(0, end - 2):end] for end in range(len(head), 0, -2)]
+        whole = ','.join(reversed(pairs)) + ',' + tail
+    sign = '-' if amount < 0 and float(text) != 0 else ''
+    return f"{sign}{whole}{point}{fraction}"
+
+
+def _field_formatter(spec: str, conversion: Optional[str]) -> Callable[[Any], str]:
+    """Build the formatter for one replacement field, once, at compile time"""
+    if ',' in spec and spec.endswith('f'):
+        # "{amount:,.2f}" -> lakh/crore grouping with the same precision
+        precision = spec.rpartition('.')[2][:-1]
+        decimals = int(precision) if precision.isdigit() else 6
+        formatter = lambda value: format_inr(float(value), decimals)
+    elif spec:
+        formatter = lambda value: format(value, spec)
+    else:
+        formatter = str
+    if conversion:
+        convert = _CONVERSIONS[conversion]
+        return lambda value: formatter(convert(value))
+    return formatter
+
+
+class CompiledTemplate:
+    """A format string split into (literal, field, formatter) pieces"""
+
+    __slots__ = ('source', 'fields', '_pieces', '_tail')
+    
+    def __init__(self, source: str):
+        self.source = source
+        self._pieces: List[Tuple[str, str, Callable[[Any], str]]] = []
+        literal_run = ''
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            literal_run += literal
+            if field is None:
+                continue
+            if not field.isidentifier():
+                raise ValueError(f"Unsupported template field {field!r} in {source!r}")
+            self._pieces.append((literal_run, field, _field_formatter(spec or '', conversion)))
+            literal_run = ''
+        self._tail = literal_run
+        self.fields = tuple(field for _, field, _ in self._pieces)
+    
+    def render(self, values: Dict[str, Any]) -> str:
+        parts = []
+        for literal, field, formatter in self._pieces:
+            parts.append(literal)
+            parts.append(formatter(values[field]))
+        parts.append(self._tail)
+        return ''.join(parts)
+
+
+def compile_templates(templates: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, CompiledTemplate]]:
+    """Compile every template of every language"""
+    return {
+        lang: {key: CompiledTemplate(template) for key, template in lang_templates.items()}
+        for lang, lang_templates in templates.items()
+    }
+
+
+# Built once at import time and shared by every request
+_COMPILED = compile_templates(RESPONSE_TEMPLATES)
+
+
+def get_compiled_template(key: str, lang: str = 'en') -> Optional[CompiledTemplate]:
+    """Compiled template for the language, falling back to English"""
+    compiled = _COMPILED.get(lang, {}).get(key)
+    if compiled is None:
+        compiled = _COMPILED['en'].get(key)
+    return compiled
+
+
+def render(key: str, lang: str = 'en', **values) -> str:
+    """
+    Render a localized response (English if the language lacks the key)
+    Returns '' for an unknown key.
+    """
+    compiled = get_compiled_template(key, lang)
+    if compiled is None:
+        logger.warning(f"No response template {key!r}")
+        return ''
+    return compiled.render(values)
+
+
+if __name__ == '__main__':
+    # Test rendering
+    print(render('balance', 'en', account_type='savings', balance=1234567.5))
+    print(render('balance', 'hi', account_type='savings', balance=25430.5))
+    print(render('transfer_success', 'mr', amount=150000, recipient='Rohan'))
+    print(render('loan_details', 'en', amount=25000000, interest_rate=8.5, due_date='2026-11-05'))
+    print(render('reminder_set_due', 'hi', message='pay rent', due_date='tomorrow'))
+    print(render('clarification', 'ta'))
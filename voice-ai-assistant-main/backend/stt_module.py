@@ -2,6 +2,8 @@ import os
 import logging
 from typing import Optional
 
+import llm_client
+
 logger = logging.getLogger(__name__)
 
 # Try to import speech recognition libraries
@@ -12,14 +14,6 @@ except ImportError:
     SR_AVAILABLE = False
     logger.warning("SpeechRecognition not available")
 
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-    openai.api_key = os.getenv('OPENAI_API_KEY', '')
-except ImportError:
-    OPENAI_AVAILABLE = False
-    logger.warning("OpenAI Whisper not available")
-
 
 def speech_to_text_google(audio_path: str) -> str:
     """
@@ -58,22 +52,12 @@ def speech_to_text_whisper(audio_path: str, language: str = None) -> str:
         audio_path: Path to audio file
         language: Language code (en, hi, mr) or None for auto-detect
     """
-    if not OPENAI_AVAILABLE or not openai.api_key:
-        raise Exception("OpenAI API not available or API key not set")
+    if not llm_client.is_available('transcribe'):
+        raise Exception("OpenAI API not available, API key not set or circuit open")
     
     try:
-        with open(audio_path, 'rb') as audio_file:
-            params = {
-                "model": "whisper-1",
-                "file": audio_file
-            }
-            # Add language if specified (Whisper supports: en, hi, mr, etc.)
-            if language:
-                params["language"] = language
-            
-            transcript = openai.Audio.transcribe(**params)
-        
-        text = transcript.get('text', '')
+        # Deadline, retries and circuit breaking are handled by the shared client
+        text = llm_client.transcribe_audio(audio_path, language)
         logger.info(f"Transcribed text (Whisper): {text}")
         return text
     
@@ -105,7 +89,7 @@ def speech_to_text(audio_path: str, method: str = 'auto', language: str = None)
     
     elif method == 'auto':
         # Try Whisper first (more accurate, supports multilingual), fall back to Google
-        if OPENAI_AVAILABLE and openai.api_key:
+        if llm_client.is_available('transcribe'):
             try:
                 return speech_to_text_whisper(audio_path, language)
             except Exception as e:
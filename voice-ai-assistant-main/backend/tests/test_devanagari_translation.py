@@ -0,0 +1,36 @@
+import pytest
+
+from language_support import AnalyzedText, normalize_devanagari_to_english
+from nlp_module import detect_intent
+
+
+def translate(text):
+    return normalize_devanagari_to_english(AnalyzedText(text))
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("मेरा बैलेंस दिखाओ", "show my balance"),
+    ("रोहन को 1,50,000 भेजो", "send rohan ko 1,50,000"),
+    ("१.५ करोड़ ट्रांसफर करो", "transfer 1.5 crore"),
+])
+def test_translation_fronts_the_verb(text, expected):
+    assert translate(text) == expected
+
+
+@pytest.mark.parametrize('text, amount', [
+    # Digit separators must not be read as clause boundaries
+    ("रोहन को 1,50,000 भेजो", 150000.0),
+    ("रोहनला ₹1,500 पाठवा", 1500.0),
+    ("प्रिया को ₹2,500.50 भेजो", 2500.5),
+    ("२.५ लाख ट्रांसफर करो", 250000.0),
+    ("१.५ करोड़ ट्रांसफर करो", 15000000.0),
+])
+def test_indian_amounts_survive_translation(text, amount):
+    analyzed = AnalyzedText(text)
+    result = detect_intent(AnalyzedText(translate(text)), lang=analyzed.language, timeout=0)
+    assert result['intent'] == 'transfer_funds'
+    assert result['entities']['amount'] == amount
+
+
+def test_sentence_punctuation_still_splits_clauses():
+    assert translate("बैलेंस दिखाओ। लेनदेन दिखाओ") == "show balance. show transactions"
@@ -0,0 +1,60 @@
+import pytest
+
+from entity_extractor import extract_entities, parse_number, tokenize
+
+
+@pytest.mark.parametrize('token, expected', [
+    ("500", (500.0, '')),
+    ("5k", (5000.0, 'k')),
+    ("1,50,000", (150000.0, '')),
+    ("1.5", (1.5, '')),
+])
+def test_parse_number(token, expected):
+    assert parse_number(token) == expected
+
+
+def test_tokenize_keeps_grouped_amounts_whole():
+    assert '1,50,000' in tokenize("send ₹1,50,000 to rohan")
+
+
+@pytest.mark.parametrize('text, amount', [
+    ("transfer 500 to rohan", 500.0),
+    ("send 5k to priya sharma", 5000.0),
+    ("rohan ko 2 lakh bhejo", 200000.0),
+    ("transfer ₹1,50,000 to amit", 150000.0),
+    ("pay 1.5 crore to amit", 15000000.0),
+    ("१.५ करोड़ ट्रांसफर करो", 15000000.0),
+])
+def test_transfer_amounts(text, amount):
+    assert extract_entities(text, 'transfer_funds')['amount'] == amount
+
+
+@pytest.mark.parametrize('text, recipient', [
+    ("transfer 500 to rohan", "Rohan"),
+    ("send 5k to priya sharma", "Priya Sharma"),
+    ("rohan ko 2 lakh bhejo", "Rohan"),
+])
+def test_transfer_recipients(text, recipient):
+    assert extract_entities(text, 'transfer_funds')['recipient'] == recipient
+
+
+def test_transaction_limit():
+    assert extract_entities("show my last 3 transactions", 'transaction_history')['limit'] == 3
+
+
+def test_account_type():
+    assert extract_entities("check my current account balance", 'check_balance')['account_type'] == 'current'
+
+
+@pytest.mark.parametrize('text, message, due_date', [
+    ("remind me to pay rent on 5th", "pay rent", "5th"),
+    ("remind me to pay emi next monday", "pay emi", "next monday"),
+])
+def test_reminders(text, message, due_date):
+    entities = extract_entities(text, 'set_reminder')
+    assert (entities['message'], entities['due_date']) == (message, due_date)
+
+
+def test_precomputed_tokens_give_the_same_entities():
+    text = "send 5k to priya sharma"
+    assert extract_entities(text, 'transfer_funds', tokens=tokenize(text)) == extract_entities(text, 'transfer_funds')
@@ -0,0 +1,22 @@
+import pytest
+
+from language_support import normalize_hinglish_to_english
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("mera balance kya hai", "my balance what is"),
+    ("rohan ko 500 bhejo", "rohan ko 500 send"),
+    ("pichle 5 transactions dikhao", "last 5 transactions show"),
+])
+def test_hinglish_words_are_translated(text, expected):
+    assert normalize_hinglish_to_english(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    # Ambiguous lexicon entries ("do", "me", "main", ...) are also English words
+    "do not send money to rohan",
+    "remind me to do the electricity bill payment tomorrow",
+    "i want to go home",
+])
+def test_english_passes_through(text):
+    assert normalize_hinglish_to_english(text) == text
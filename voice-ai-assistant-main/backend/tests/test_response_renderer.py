@@ -0,0 +1,43 @@
+import pytest
+
+from response_renderer import CompiledTemplate, format_inr, render
+
+
+@pytest.mark.parametrize('amount, expected', [
+    (0, "0.00"),
+    (999, "999.00"),
+    (1000, "1,000.00"),
+    (150000, "1,50,000.00"),
+    (1234567.5, "12,34,567.50"),
+    (123456789012, "1,23,45,67,89,012.00"),
+    (-1234567.5, "-12,34,567.50"),
+    # Rounding can carry into a new group, and must not leave a "-0.00"
+    (99999.999, "1,00,000.00"),
+    (-0.001, "0.00"),
+])
+def test_format_inr_groups_lakhs_and_crores(amount, expected):
+    assert format_inr(amount) == expected
+
+
+def test_format_inr_precision():
+    assert format_inr(1500, 0) == "1,500"
+
+
+def test_grouping_spec_renders_indian_amounts():
+    assert render('balance', 'en', account_type='savings', balance=1234567.5) == \
+        "Your savings account balance is ₹12,34,567.50."
+    assert render('transfer_success', 'mr', amount=150000, recipient='Rohan').startswith("₹1,50,000.00 Rohan")
+
+
+def test_unknown_language_falls_back_to_english():
+    assert render('clarification', 'ta') == render('clarification', 'en')
+
+
+def test_unknown_key_renders_empty():
+    assert render('no_such_template') == ''
+
+
+def test_other_specs_and_conversions_match_str_format():
+    source = "{name!r} has {count:>5} items at {rate:.1f}%"
+    values = {'name': 'rohan', 'count': 7, 'rate': 8.25}
+    assert CompiledTemplate(source).render(values) == source.format(**values)
@@ -0,0 +1,84 @@
+"""
+Bounded LRU cache with per-entry TTL
+Thread-safe, with hit/miss/eviction counters for monitoring
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries also expire after a fixed time-to-live"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value and mark it recently used, or default on miss/expiry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def peek(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value without marking it recently used or counting a hit/miss"""
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return default
+        return entry[0]
+    
+    def set(self, key: Hashable, value: Any):
+        """Insert or refresh an entry, evicting the least recently used one when full"""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of size and counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
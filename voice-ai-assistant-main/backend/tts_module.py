@@ -1,9 +1,51 @@
 import os
+import re
+import json
+import hashlib
 import logging
-from typing import Optional
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import metrics
+from audio_store import AudioStore, get_audio_store
 
 logger = logging.getLogger(__name__)
 
+# Audio for fixed responses, synthesized ahead of time by audio_prerender.py
+PRERENDERED_AUDIO_DIR = os.getenv(
+    'PRERENDERED_AUDIO_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prerendered_audio')
+)
+
+# Synthesized audio is cached by content under this prefix (size limits: see audio_store)
+TTS_CACHE_PREFIX = 'tts_'
+
+DEFAULT_ELEVENLABS_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Rachel voice
+
+# Background synthesis: worker threads, and jobs that may wait for one before callers synthesize inline
+TTS_WORKERS = int(os.getenv('TTS_WORKERS', '4'))
+TTS_MAX_QUEUE = int(os.getenv('TTS_MAX_QUEUE', '256'))
+# Finished jobs remembered so their URLs resolve to the file actually written
+TTS_MAX_JOBS = 1000
+# Jobs are announced to every worker by marker files in this subdirectory of the audio folder; a job
+# still pending after TTS_PENDING_MAX_AGE_SECONDS is assumed lost with its worker
+PENDING_SUBDIR = 'pending'
+TTS_PENDING_MAX_AGE_SECONDS = float(os.getenv('TTS_PENDING_MAX_AGE_SECONDS', '300'))
+_PENDING_POLL_SECONDS = 0.1
+
+# Sentence-chunked streaming: chunks synthesized in parallel, fragments shorter than this ride with the next
+TTS_CHUNK_WORKERS = int(os.getenv('TTS_CHUNK_WORKERS', '3'))
+TTS_CHUNK_MIN_CHARS = int(os.getenv('TTS_CHUNK_MIN_CHARS', '40'))
+# How long a streamable response stays fetchable after it was last registered
+TTS_STREAM_TTL_SECONDS = float(os.getenv('TTS_STREAM_TTL_SECONDS', '3600'))
+# Registered streams live in this subdirectory of the audio folder, shared by every worker
+STREAMS_SUBDIR = 'streams'
+_STREAM_ID_RE = re.compile(r'[0-9a-f]{32}')
+
 # Try to import TTS libraries
 try:
     from gtts import gTTS
@@ -20,6 +62,21 @@ except ImportError:
     logger.warning("requests library not available")
 
 
+def audio_content_key(text: str, lang: str) -> str:
+    """Stable key for the audio of `text` spoken in `lang`; the same text always maps to the same file"""
+    return hashlib.sha256(f"{lang}\x1f{text}".encode('utf-8')).hexdigest()[:32]
+
+
+def get_prerendered_audio(text: str, lang: str = 'en') -> Optional[str]:
+    """Filename of the pre-synthesized audio for this exact text, if the prerender job produced one"""
+    filename = audio_content_key(text, lang) + '.mp3'
+    if os.path.isfile(os.path.join(PRERENDERED_AUDIO_DIR, filename)):
+        metrics.increment('tts.prerendered_hits')
+        return filename
+    metrics.increment('tts.prerendered_misses')
+    return None
+
+
 def text_to_speech_gtts(text: str, output_path: str, lang: str = 'en', **kwargs) -> bool:
     """
     Convert text to speech using Google Text-to-Speech (free)
@@ -67,7 +124,7 @@ def text_to_speech_elevenlabs(text: str, output_path: str, voice_id: Optional[st
     
     # Default voice ID (you can change this)
     if not voice_id:
-        voice_id = "21m00Tcm4TlvDq8ikWAM"  # Rachel voice
+        voice_id = DEFAULT_ELEVENLABS_VOICE_ID
     
     url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
     
@@ -146,6 +203,484 @@ def text_to_speech(text: str, output_path: str, method: str = 'auto', **kwargs)
         raise ValueError(f"Unknown method: {method}")
 
 
+# ==================== CONTENT-ADDRESSED CACHE ====================
+
+def normalize_tts_text(text: str) -> str:
+    """Canonical form for cache keys: NFC, whitespace runs collapsed (the spoken audio is the same)"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def resolve_engine(method: str = 'auto') -> str:
+    """The engine text_to_speech(method=...) would use first: 'elevenlabs' or 'gtts'"""
+    if method == 'auto':
+        return 'elevenlabs' if REQUESTS_AVAILABLE and os.getenv('ELEVENLABS_API_KEY', '') else 'gtts'
+    if method not in ('elevenlabs', 'gtts'):
+        raise ValueError(f"Unknown method: {method}")
+    return method
+
+
+def tts_cache_key(text: str, lang: str, engine: str, voice: str = '') -> str:
+    """Hash of everything that determines the audio: normalized text, language, engine and voice"""
+    material = '\x1f'.join([normalize_tts_text(text), lang, engine, voice])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+class TTSCache:
+    """
+    Content-addressed synthesis on top of an AudioStore
+    Files are named tts_<key>.mp3; the store decides where they live and when they are evicted.
+    """
+
+    def __init__(self, store: AudioStore):
+        self.store = store
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def filename_for(self, text: str, lang: str = 'en', method: str = 'auto', voice_id: Optional[str] = None) -> str:
+        """Filename synthesize() stores the audio under when its first-choice engine succeeds"""
+        engine = resolve_engine(method)
+        voice = (voice_id or DEFAULT_ELEVENLABS_VOICE_ID) if engine == 'elevenlabs' else ''
+        return f"{TTS_CACHE_PREFIX}{tts_cache_key(text, lang, engine, voice)}.mp3"
+
+    def cached(self, filename: str) -> bool:
+        """True (counted as a hit) if the file is already in the store"""
+        if self.store.lookup(filename) is None:
+            return False
+        with self._lock:
+            self.hits += 1
+        metrics.increment('tts.cache_hits')
+        return True
+
+    def synthesize(self, text: str, lang: str = 'en', method: str = 'auto', voice_id: Optional[str] = None) -> str:
+        """Filename of the audio for text, synthesizing it only on a cache miss"""
+        engine = resolve_engine(method)
+        if engine == 'elevenlabs':
+            try:
+                return self._synthesize(text, lang, 'elevenlabs', voice_id or DEFAULT_ELEVENLABS_VOICE_ID)
+            except Exception as e:
+                if method != 'auto':
+                    raise
+                logger.warning(f"ElevenLabs failed, falling back to gTTS: {str(e)}")
+        return self._synthesize(text, lang, 'gtts', '')
+
+    def _synthesize(self, text: str, lang: str, engine: str, voice: str) -> str:
+        filename = f"{TTS_CACHE_PREFIX}{tts_cache_key(text, lang, engine, voice)}.mp3"
+        while True:
+            if self.cached(filename):
+                return filename
+            with self._lock:
+                pending = self._inflight.get(filename)
+                if pending is None:
+                    # This caller synthesizes; concurrent requests for the same audio wait for it
+                    pending = self._inflight[filename] = threading.Event()
+                    break
+            # Hit once the other synthesis lands; if it failed this caller synthesizes instead
+            pending.wait()
+
+        try:
+            with self._lock:
+                self.misses += 1
+            metrics.increment('tts.cache_misses')
+            temp_path = self.store.temp_path(filename)
+            try:
+                if engine == 'elevenlabs':
+                    text_to_speech_elevenlabs(text, temp_path, voice_id=voice)
+                else:
+                    text_to_speech_gtts(text, temp_path, lang=lang)
+                self.store.put(filename, temp_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            return filename
+        finally:
+            with self._lock:
+                self._inflight.pop(filename).set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_caches: Dict[str, TTSCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_tts_cache(audio_dir: str) -> TTSCache:
+    """The cache over the audio store of a directory (one per directory per process)"""
+    key = os.path.abspath(audio_dir)
+    cache = _caches.get(key)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = _caches[key] = TTSCache(get_audio_store(audio_dir))
+    return cache
+
+
+def synthesize_cached(text: str, audio_dir: str, lang: str = 'en', method: str = 'auto',
+                      voice_id: Optional[str] = None) -> str:
+    """
+    Store filename of the audio for text in audio_dir's AudioStore, reusing earlier identical syntheses
+    Byte-identical requests (after whitespace normalization) skip the TTS call entirely.
+    """
+    if not text:
+        raise ValueError("Text cannot be empty")
+    return get_tts_cache(audio_dir).synthesize(text, lang=lang, method=method, voice_id=voice_id)
+
+
+def get_tts_cache_stats() -> Dict[str, Any]:
+    """Hit ratio of every TTS cache for /api/metrics (sizes are under audio_store)"""
+    return {directory: cache.get_stats() for directory, cache in list(_caches.items())}
+
+
+metrics.register_provider('tts_cache', get_tts_cache_stats)
+
+
+# ==================== BACKGROUND SYNTHESIS ====================
+
+def _synthesize_with_fallback(cache: 'TTSCache', text: str, lang: str, method: str = 'auto',
+                              voice_id: Optional[str] = None) -> str:
+    """cache.synthesize(), retried with the English voice when a Hindi/Marathi synthesis fails"""
+    try:
+        return cache.synthesize(text, lang=lang, method=method, voice_id=voice_id)
+    except Exception as e:
+        if lang == 'en':
+            raise
+        logger.warning(f"TTS error, using default: {str(e)}")
+        return cache.synthesize(text, lang='en', method=method, voice_id=voice_id)
+
+
+def _pending_path(audio_dir: str, filename: str) -> str:
+    return os.path.join(audio_dir, PENDING_SUBDIR, f"{filename}.json")
+
+
+def _write_pending(audio_dir: str, filename: str, state: Dict[str, str]):
+    """Record the state of the job producing filename where every worker can read it"""
+    path = _pending_path(audio_dir, filename)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not record TTS job state: {str(e)}")
+    _prune_dir(audio_dir, PENDING_SUBDIR, TTS_PENDING_MAX_AGE_SECONDS)
+
+
+def _read_pending(audio_dir: str, filename: str) -> Optional[Dict[str, str]]:
+    """State of the job producing filename, or None if there is none (or it went stale)"""
+    path = _pending_path(audio_dir, filename)
+    try:
+        if time.time() - os.path.getmtime(path) > TTS_PENDING_MAX_AGE_SECONDS:
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove_pending(audio_dir: str, filename: str):
+    try:
+        os.remove(_pending_path(audio_dir, filename))
+    except OSError:
+        pass
+
+
+class _SharedJob:
+    """A job running on another worker, followed through its marker file (the part of Future get_audio uses)"""
+
+    def __init__(self, audio_dir: str, filename: str):
+        self.audio_dir = audio_dir
+        self.filename = filename
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = _read_pending(self.audio_dir, self.filename)
+            if state is None:
+                return self.filename
+            if state['status'] == 'done':
+                return state['filename']
+            if state['status'] == 'failed':
+                raise RuntimeError(state.get('error', 'synthesis failed'))
+            if deadline is not None and time.monotonic() >= deadline:
+                raise FutureTimeoutError()
+            time.sleep(_PENDING_POLL_SECONDS if deadline is None
+                       else max(0.0, min(_PENDING_POLL_SECONDS, deadline - time.monotonic())))
+
+
+# (audio folder, subdirectory) -> when this process next removes expired stream or job files from it
+_next_prune: Dict[Tuple[str, str], float] = {}
+
+
+class SynthesisJobs:
+    """
+    Bounded worker pool that synthesizes into the TTS cache off the request path
+    submit() returns the cache filename at once; the audio endpoint waits on
+    get(filename) until the file exists, on any worker, since every job also
+    leaves a marker file in the audio folder while it runs. When TTS_MAX_QUEUE jobs are already
+    waiting, submit() synthesizes inline instead, so a TTS outage slows
+    requests down rather than queueing without bound.
+    """
+
+    def __init__(self, workers: int = TTS_WORKERS, max_queue: int = TTS_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: 'OrderedDict[str, Future]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.inline = 0
+        self._synthesis_seconds = 0.0
+        self._max_synthesis_seconds = 0.0
+
+    def submit(self, text: str, audio_dir: str, lang: str = 'en', method: str = 'auto',
+               voice_id: Optional[str] = None) -> str:
+        """Filename the audio of text will have; synthesized in the background unless already cached"""
+        if not text:
+            raise ValueError("Text cannot be empty")
+        cache = get_tts_cache(audio_dir)
+        filename = cache.filename_for(text, lang, method, voice_id)
+        if cache.cached(filename):
+            return filename
+        with self._lock:
+            job = self._jobs.get(filename)
+            if job is not None and not job.done():
+                return filename
+            if self.queued >= self.max_queue:
+                self.inline += 1
+                job = None
+            else:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tts-worker')
+                if (_read_pending(audio_dir, filename) or {}).get('status') == 'pending':
+                    # Another worker is already synthesizing it
+                    return filename
+                self.queued += 1
+                _write_pending(audio_dir, filename, {'status': 'pending'})
+                job = self._executor.submit(self._run, cache, audio_dir, filename, text, lang, method, voice_id)
+                self._jobs[filename] = job
+                self._jobs.move_to_end(filename)
+                while len(self._jobs) > TTS_MAX_JOBS and next(iter(self._jobs.values())).done():
+                    self._jobs.popitem(last=False)
+        if job is None:
+            metrics.increment('tts.jobs_inline')
+            return _synthesize_with_fallback(cache, text, lang, method, voice_id)
+        metrics.increment('tts.jobs_submitted')
+        return filename
+
+    def get(self, filename: str, audio_dir: str) -> Optional[Any]:
+        """
+        The job producing filename, if one was submitted by this or another worker
+        Its result(timeout) is the filename actually written: a local Future,
+        or a _SharedJob that follows another worker's marker file.
+        """
+        with self._lock:
+            job = self._jobs.get(filename)
+        if job is not None:
+            return job
+        if os.path.basename(filename) != filename or _read_pending(audio_dir, filename) is None:
+            return None
+        return _SharedJob(audio_dir, filename)
+
+    def _run(self, cache: 'TTSCache', audio_dir: str, requested: str, text: str, lang: str, method: str,
+             voice_id: Optional[str]) -> str:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        start = time.perf_counter()
+        try:
+            filename = _synthesize_with_fallback(cache, text, lang, method, voice_id)
+        except Exception as e:
+            logger.error(f"Background TTS failed: {str(e)}")
+            _write_pending(audio_dir, requested, {'status': 'failed', 'error': str(e)})
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.running -= 1
+                self._synthesis_seconds += elapsed
+                self._max_synthesis_seconds = max(self._max_synthesis_seconds, elapsed)
+        if filename == requested:
+            _remove_pending(audio_dir, requested)
+        else:
+            # The English fallback was written: point other workers at it
+            _write_pending(audio_dir, requested, {'status': 'done', 'filename': filename})
+        with self._lock:
+            self.completed += 1
+        return filename
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                'queue_depth': self.queued,
+                'running': self.running,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'completed': self.completed,
+                'failed': self.failed,
+                'inline': self.inline,
+                'avg_synthesis_ms': round(self._synthesis_seconds / finished * 1000, 1) if finished else 0.0,
+                'max_synthesis_ms': round(self._max_synthesis_seconds * 1000, 1),
+            }
+
+
+synthesis_jobs = SynthesisJobs()
+
+
+def submit_synthesis(text: str, audio_dir: str, lang: str = 'en', method: str = 'auto',
+                     voice_id: Optional[str] = None) -> str:
+    """Store filename for the audio of text, queued for background synthesis if not cached yet"""
+    return synthesis_jobs.submit(text, audio_dir, lang=lang, method=method, voice_id=voice_id)
+
+
+def get_synthesis_job(filename: str, audio_dir: str) -> Optional[Any]:
+    return synthesis_jobs.get(filename, audio_dir)
+
+
+metrics.register_provider('tts_jobs', synthesis_jobs.get_stats)
+
+
+# ==================== SENTENCE-CHUNKED STREAMING ====================
+
+# A standalone one- or two-digit number before a period ("2.") numbers the next list item rather
+# than ending a sentence, so the split goes before it
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?।])(?<!\b\d\.)(?<!\b\d\d\.)\s+|\s+(?=\d{1,2}\.\s)|\n+')
+# A period after these does not end the sentence ("Rs. 500", "e.g. FD")
+_ABBREVIATIONS = ('rs.', 'no.', 'mr.', 'mrs.', 'dr.', 'e.g.', 'i.e.', 'etc.', 'approx.', 'a/c.')
+
+_chunk_executor: Optional[ThreadPoolExecutor] = None
+_chunk_executor_lock = threading.Lock()
+
+
+
+def split_sentences(text: str, min_chars: int = TTS_CHUNK_MIN_CHARS) -> List[str]:
+    """
+    Speakable chunks of a response: sentences and lines, in order
+    Splitting is deterministic, so a sentence shared by two responses becomes
+    the same chunk (and the same cached audio) in both.
+    """
+    chunks: List[str] = []
+    for piece in _SENTENCE_BOUNDARY.split(text):
+        piece = piece.strip()
+        if not piece:
+            continue
+        if chunks and (len(chunks[-1]) < min_chars or chunks[-1].lower().endswith(_ABBREVIATIONS)):
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def _get_chunk_executor() -> ThreadPoolExecutor:
+    global _chunk_executor
+    if _chunk_executor is None:
+        with _chunk_executor_lock:
+            if _chunk_executor is None:
+                _chunk_executor = ThreadPoolExecutor(max_workers=TTS_CHUNK_WORKERS, thread_name_prefix='tts-chunk')
+    return _chunk_executor
+
+
+def iter_chunk_audio(text: str, audio_dir: str, lang: str = 'en', method: str = 'auto') -> Iterator[str]:
+    """
+    Store filenames of the sentence chunks of text, in speaking order
+    Every chunk is queued at once (first chunk first) and cached on its own,
+    so the first is yielded as soon as it is ready while later ones are
+    still being synthesized.
+    """
+    cache = get_tts_cache(audio_dir)
+    executor = _get_chunk_executor()
+    futures = [executor.submit(_synthesize_with_fallback, cache, chunk, lang, method)
+               for chunk in split_sentences(text)]
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        # Client went away: skip chunks that have not started
+        for future in futures:
+            future.cancel()
+
+
+def strip_id3(data: bytes) -> bytes:
+    """MPEG frames of an mp3 without its leading ID3v2 tag, so chunks can be concatenated into one stream"""
+    if len(data) >= 10 and data[:3] == b'ID3':
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return data[10 + size:]
+    return data
+
+
+def _stream_path(audio_dir: str, stream_id: str) -> str:
+    return os.path.join(audio_dir, STREAMS_SUBDIR, f"{stream_id}.json")
+
+
+def register_stream(text: str, audio_dir: str, lang: str = 'en') -> str:
+    """
+    Id under which the chunked audio of text can be streamed later (same text, same id)
+    The stream is a small file in the audio folder rather than process
+    memory, so whichever worker the audio request lands on can serve it.
+    """
+    stream_id = audio_content_key(text, lang)
+    path = _stream_path(audio_dir, stream_id)
+    try:
+        # Already registered (by any worker): the mtime is the registration time
+        os.utime(path)
+    except OSError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'text': text, 'lang': lang}, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    _prune_dir(audio_dir, STREAMS_SUBDIR, TTS_STREAM_TTL_SECONDS)
+    return stream_id
+
+
+def get_stream(stream_id: str, audio_dir: str) -> Optional[Tuple[str, str]]:
+    """(text, lang) of a registered stream, or None if it is unknown or expired"""
+    if not _STREAM_ID_RE.fullmatch(stream_id):
+        return None
+    path = _stream_path(audio_dir, stream_id)
+    try:
+        if time.time() - os.path.getmtime(path) > TTS_STREAM_TTL_SECONDS:
+            return None
+        with open(path, encoding='utf-8') as f:
+            stream = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return stream['text'], stream['lang']
+
+
+def _prune_dir(audio_dir: str, subdir: str, max_age: float):
+    """Delete files older than max_age from a subdirectory of the audio folder, at most every tenth of it per process"""
+    now = time.time()
+    if now < _next_prune.get((audio_dir, subdir), 0.0):
+        return
+    _next_prune[(audio_dir, subdir)] = now + max_age / 10
+    cutoff = now - max_age
+    try:
+        entries = list(os.scandir(os.path.join(audio_dir, subdir)))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
 if __name__ == '__main__':
     # Test the TTS module
     import sys